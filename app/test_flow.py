@@ -17,10 +17,15 @@ from pcu.core.topics import Topic
 from pcu.core.message import Message
 
 
-def attach_dummy_behaviors(system: PCUSystem):
-    """Monkey-patch simple print behaviors so we can visualize message flow."""
+def attach_dummy_behaviors(system: PCUSystem, verbose: bool = True):
+    """
+    Monkey-patch simple print behaviors so we can visualize message flow.
+    verbose=False keeps the behaviors but drops the prints (used by bench.pipeline).
+    """
 
     def wrap(node_name, func):
+        if not verbose:
+            return func
         def wrapper(msg: Message):
             print(f"[{node_name}] received {msg.topic.value} payload={msg.payload}")
             func(msg)
@@ -78,7 +83,8 @@ def attach_dummy_behaviors(system: PCUSystem):
     # --- InterfaceNode: delivers to user ---
     interface = system.nodes["interface"]
     def interface_logic(msg):
-        print(f"[Interface] Delivered guidance: {msg.payload['final_action']}")
+        if verbose:
+            print(f"[Interface] Delivered guidance: {msg.payload['final_action']}")
     interface.on_message = wrap("Interface", interface_logic)
 
 
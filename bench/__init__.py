@@ -0,0 +1 @@
+"""Micro- and system-level benchmarks for PCU. Run modules with `python -m bench.<name>`."""
@@ -0,0 +1,55 @@
+"""
+Run the benchmark suite and store the results as JSON under bench/results/.
+Each suite runs in a fresh process so its peak RSS is its own.
+
+    python -m bench [--suite bus --suite pipeline ...] [--users 100] [--streams 2]
+                    [--rate 1] [--seconds 60] [--compare bench/results/<older>.json]
+"""
+import argparse, sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.common import (COMPARED, DEFAULT_SUITES, SUITES, Workload, add_workload_args, compare, flatten,
+                          load_results, print_result, run_suite, save_results, workload_from)
+
+def run_isolated(name: str, workload: Workload) -> Dict[str, Any]:
+    """run_suite in a fresh spawned process."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(run_suite, name, workload).result()
+
+def print_summary(name: str, result: Dict[str, Any]) -> None:
+    if "latency" in result:
+        print_result(name, result)
+        return
+    metrics = {k: v for k, v in flatten(result).items() if k.endswith(COMPARED)}
+    print(f"{name}: " + "  ".join(f"{k} {v:,.1f}" for k, v in metrics.items()))
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_workload_args(ap)
+    ap.add_argument("--suite", action="append", choices=SUITES,
+                    help=f"suite to run (repeatable; default: {', '.join(DEFAULT_SUITES)})")
+    ap.add_argument("--out", type=Path, default=None, help="result file (default: bench/results/<time>-<commit>.json)")
+    ap.add_argument("--compare", type=Path, default=None, help="earlier result file to compare against")
+    args = ap.parse_args()
+    workload = workload_from(args)
+
+    results: Dict[str, Any] = {}
+    for name in args.suite or DEFAULT_SUITES:
+        results[name] = run_isolated(name, workload)
+        print_summary(name, results[name])
+    path = save_results(results, workload, args.out)
+    print(f"\nresults written to {path}")
+
+    if args.compare is not None:
+        rows = compare(load_results(args.compare), load_results(path))
+        print(f"\ncompared with {args.compare} (ratio = new / base):")
+        for key, base, new, ratio in rows:
+            print(f"  {key:<64} {base:>14,.1f} {new:>14,.1f}  {ratio:6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+InMemoryBus routing: publish a workload's samples and route them to `fanout`
+sink nodes, draining the queue once per sample tick (users x streams messages).
+Latency is publish -> handler, measured from Message.ts (monotonic ns).
+
+    python -m bench.bus [--users 100] [--streams 2] [--rate 1] [--seconds 60] [--fanout 4] [--batch-size N]
+                        [--sample-every N]
+
+--sample-every turns on router Instrumentation (timing one in N messages) to
+measure its overhead against the untimed router.
+"""
+import argparse, sys, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pcu.core.bus import InMemoryBus
+from pcu.core.instrumentation import Instrumentation
+from pcu.core.message import Message
+from pcu.core.node import Node
+from pcu.core.topics import NodeRole, Topic
+from bench.common import LatencyRecorder, Workload, add_workload_args, peak_rss_mb, print_result, workload_from
+
+class SinkNode(Node):
+    """Subscriber that only records how long each message waited."""
+    def __init__(self, name: str, bus: Any, recorder: LatencyRecorder) -> None:
+        super().__init__(name, NodeRole.OBSERVABILITY, bus)
+        self._record = recorder.record
+
+    @property
+    def inputs(self) -> List[Topic]:
+        return [Topic.RAW_SENSORS]
+
+    @property
+    def outputs(self) -> List[Topic]:
+        return []
+
+    def on_message(self, msg: Message) -> None:
+        self._record("publish->deliver", time.monotonic_ns() - msg.ts)
+
+def run(workload: Optional[Workload] = None, fanout: int = 4,
+        batch_size: Optional[int] = None, sample_every: Optional[int] = None) -> Dict[str, Any]:
+    workload = workload or Workload()
+    packets = list(workload.packets())
+    recorder = LatencyRecorder()
+    inst = None if sample_every is None else Instrumentation(sample_every, snapshot_interval=None)
+    bus = InMemoryBus(batch_size=batch_size, instrumentation=inst)
+    for i in range(fanout):
+        SinkNode(f"sink{i}", bus, recorder).start()
+
+    route_every = workload.users * workload.streams
+    publish = bus.publish
+    t0 = time.perf_counter()
+    for i, packet in enumerate(packets, 1):
+        publish(Message(Topic.RAW_SENSORS, packet))
+        if i % route_every == 0:
+            bus.route()
+    bus.route()
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "published": len(packets),
+        "delivered": recorder.count,
+        "fanout": fanout,
+        "batch_size": batch_size,
+        "sample_every": sample_every,
+        "elapsed_s": elapsed,
+        "published_per_sec": len(packets) / elapsed,
+        "msgs_per_sec": recorder.count / elapsed,
+        "latency": recorder.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_workload_args(ap)
+    ap.add_argument("--fanout", type=int, default=4, help="subscribers on RAW_SENSORS")
+    ap.add_argument("--batch-size", type=int, default=None)
+    ap.add_argument("--sample-every", type=int, default=None, help="enable router instrumentation")
+    args = ap.parse_args()
+    print_result("bus", run(workload_from(args), args.fanout, args.batch_size, args.sample_every))
+
+if __name__ == "__main__":
+    main()
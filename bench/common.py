@@ -0,0 +1,224 @@
+"""
+Shared pieces of the benchmark suite: the workload shape (samples come from
+pcu.workload), per-hop latency recording, peak RSS and the JSON result files.
+"""
+import argparse, json, platform, subprocess, sys, time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pcu.workload import GLUCOSE_STREAM, HR_STREAM, WorkloadConfig, generate
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Streams in the order --streams enables them.
+STREAMS = (HR_STREAM, GLUCOSE_STREAM)
+
+@dataclass
+class Workload:
+    """
+    Benchmark run shape: users x streams (watch.hr, then cgm.glucose), each
+    sampled every 1/rate_hz seconds for `seconds` of simulated time. Samples
+    come from pcu.workload.generate, with its seed semantics and noise outliers.
+    """
+    users: int = 100
+    streams: int = 2
+    rate_hz: float = 1.0
+    seconds: float = 60.0
+    seed: int = 7
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.streams <= len(STREAMS):
+            raise ValueError(f"streams must be 1..{len(STREAMS)} ({', '.join(STREAMS)})")
+
+    @property
+    def ticks(self) -> int:
+        """Samples per stream, as generate() counts them."""
+        return int(self.seconds // (1.0 / self.rate_hz))
+
+    @property
+    def samples(self) -> int:
+        return self.users * self.streams * self.ticks
+
+    def config(self) -> WorkloadConfig:
+        interval = 1.0 / self.rate_hz
+        return WorkloadConfig(users=self.users, duration=self.seconds, seed=self.seed,
+                              hr_interval=interval, glucose_interval=interval)
+
+    def packets(self) -> Iterator[Dict[str, Any]]:
+        """ingest_sensor_packet-shaped dicts in timestamp order, all streams interleaved."""
+        packets = generate(self.config())
+        if self.streams == len(STREAMS):
+            return packets
+        wanted = set(STREAMS[:self.streams])
+        return (p for p in packets if p["stream_id"] in wanted)
+
+class LatencyRecorder:
+    """Per-hop latency samples in nanoseconds, keyed by hop name."""
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[int]] = {}
+
+    def record(self, hop: str, ns: int) -> None:
+        bucket = self.samples.get(hop)
+        if bucket is None:
+            bucket = self.samples[hop] = []
+        bucket.append(ns)
+
+    @property
+    def count(self) -> int:
+        return sum(len(v) for v in self.samples.values())
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """hop -> {count, p50_us, p99_us, max_us}."""
+        out = {}
+        for hop, ns in sorted(self.samples.items()):
+            ns = sorted(ns)
+            out[hop] = {
+                "count": len(ns),
+                "p50_us": percentile(ns, 50) / 1e3,
+                "p99_us": percentile(ns, 99) / 1e3,
+                "max_us": ns[-1] / 1e3,
+            }
+        return out
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return float("nan")
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+def timed(recorder: LatencyRecorder, hop: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap func so each call's duration is recorded under hop."""
+    clock = time.perf_counter_ns
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        t0 = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            recorder.record(hop, clock() - t0)
+    return wrapper
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=Path(__file__).parent, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+def save_results(suites: Dict[str, Any], workload: Workload, path: Optional[Path] = None) -> Path:
+    """Write one run to bench/results/ (or path) and return the file written."""
+    env = environment()
+    if path is None:
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        path = RESULTS_DIR / f"{stamp}-{env['commit'] or 'nogit'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"env": env, "workload": asdict(workload), "suites": suites}, f, indent=2, sort_keys=True)
+    return path
+
+def load_results(path: Path) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def flatten(result: Any, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of a nested result as dotted keys."""
+    out: Dict[str, float] = {}
+    if isinstance(result, dict):
+        for k, v in result.items():
+            out.update(flatten(v, f"{prefix}.{k}" if prefix else str(k)))
+    elif isinstance(result, (int, float)) and not isinstance(result, bool):
+        out[prefix] = float(result)
+    return out
+
+# Metrics worth comparing across runs (by key suffix); counts and timings of
+# fixed-size work are left out.
+COMPARED = ("per_sec", "p50_us", "p99_us", "peak_rss_mb", "speedup")
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> List[Any]:
+    """(metric, base, new, new/base) for every compared metric present in both runs."""
+    a, b = flatten(base["suites"]), flatten(new["suites"])
+    rows = []
+    for key in sorted(a.keys() & b.keys()):
+        if not key.endswith(COMPARED):
+            continue
+        ratio = b[key] / a[key] if a[key] else float("nan")
+        rows.append((key, a[key], b[key], ratio))
+    return rows
+
+def add_workload_args(ap: argparse.ArgumentParser) -> None:
+    d = Workload()
+    ap.add_argument("--users", type=int, default=d.users)
+    ap.add_argument("--streams", type=int, default=d.streams, choices=range(1, len(STREAMS) + 1),
+                    help="1: watch.hr; 2: watch.hr and cgm.glucose")
+    ap.add_argument("--rate", type=float, default=d.rate_hz, help="samples per second per stream")
+    ap.add_argument("--seconds", type=float, default=d.seconds, help="simulated duration")
+    ap.add_argument("--seed", type=int, default=d.seed)
+
+def workload_from(args: argparse.Namespace) -> Workload:
+    return Workload(args.users, args.streams, args.rate, args.seconds, args.seed)
+
+def print_result(name: str, r: Dict[str, Any]) -> None:
+    """Throughput line plus one p50/p99 line per hop."""
+    print(f"{name}: {r['msgs_per_sec']:>12,.0f} msgs/s  ({r['elapsed_s']:.3f} s)"
+          + (f"  peak RSS {r['peak_rss_mb']:.1f} MiB" if r.get("peak_rss_mb") else ""))
+    for hop, s in r["latency"].items():
+        print(f"  {hop:<40} n={s['count']:<9,} p50 {s['p50_us']:9.1f} us  p99 {s['p99_us']:9.1f} us")
+
+SUITES = ["bus", "message", "pipeline", "orchestrator", "personicle", "kb_rules", "fusion", "priority", "sharded"]
+DEFAULT_SUITES = ["bus", "message", "pipeline", "orchestrator"]
+
+def run_suite(name: str, workload: Workload) -> Dict[str, Any]:
+    """Run one suite in this process; sized from the workload where the suite has no workload of its own."""
+    if name == "bus":
+        from bench import bus
+        result = bus.run(workload)
+    elif name == "message":
+        from bench import message
+        result = message.run(workload.samples)
+    elif name == "pipeline":
+        from bench import pipeline
+        result = pipeline.run(workload)
+    elif name == "orchestrator":
+        from bench import orchestrator
+        result = orchestrator.run(workload)
+    elif name == "personicle":
+        from bench import personicle
+        result = personicle.run(workload.samples)
+    elif name == "fusion":
+        from bench import fusion
+        result = fusion.run(workload)
+    elif name == "priority":
+        from bench import priority
+        result = priority.run()
+    elif name == "sharded":
+        from bench import sharded
+        result = sharded.run(workload)
+    elif name == "kb_rules":
+        from bench import kb_rules
+        result = kb_rules.run(states=workload.samples)
+    else:
+        raise ValueError(f"unknown suite {name!r}")
+    result.setdefault("peak_rss_mb", peak_rss_mb())
+    return result
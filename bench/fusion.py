@@ -0,0 +1,108 @@
+"""
+PCUSystem.compile(): routed vs fused delivery.
+
+chain: a linear relay RAW_SENSORS -> EVENTS -> STATE -> CONTEXT ->
+GUIDANCE_PLAN -> GUIDANCE_OUT, one node per topic, so every hop after the
+first qualifies for fusion. Reports ns per message through the whole chain.
+pipeline: bench.pipeline on the default graph, with and without compile().
+
+    python -m bench.fusion [--users 100] [--streams 2] [--rate 1] [--seconds 60]
+"""
+import argparse, sys, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pcu.core.message import Message
+from pcu.core.node import Node
+from pcu.core.topics import NodeRole, Topic
+from pcu.system import PCUSystem
+from bench import pipeline
+from bench.common import Workload, add_workload_args, peak_rss_mb, workload_from
+
+CHAIN = [Topic.RAW_SENSORS, Topic.EVENTS, Topic.STATE, Topic.CONTEXT, Topic.GUIDANCE_PLAN, Topic.GUIDANCE_OUT]
+
+class RelayNode(Node):
+    """Republishes each message's payload on the next topic of the chain."""
+    def __init__(self, name: str, bus: Any, inp: Topic, out: Optional[Topic]) -> None:
+        super().__init__(name, NodeRole.OBSERVABILITY, bus)
+        self._inp, self._out = inp, out
+        self.count = 0
+
+    @property
+    def inputs(self) -> List[Topic]:
+        return [self._inp]
+
+    @property
+    def outputs(self) -> List[Topic]:
+        return [self._out] if self._out is not None else []
+
+    def on_message(self, msg: Message) -> None:
+        self.count += 1
+        if self._out is not None:
+            self.bus.publish(Message(self._out, msg.payload))
+
+def run_chain(packets: List[Dict[str, Any]], tick_every: int, compiled: bool) -> Dict[str, Any]:
+    from pcu.core.bus import InMemoryBus
+    bus = InMemoryBus()
+    nodes = {}
+    for i, topic in enumerate(CHAIN):
+        nxt = CHAIN[i + 1] if i + 1 < len(CHAIN) else None
+        nodes[f"relay{i}"] = node = RelayNode(f"relay{i}", bus, topic, nxt)
+        node.start()
+    system = PCUSystem(bus=bus, nodes=nodes)
+    fused = system.compile() if compiled else {}
+
+    publish = bus.publish
+    t0 = time.perf_counter()
+    for i, packet in enumerate(packets, 1):
+        publish(Message(Topic.RAW_SENSORS, packet))
+        if i % tick_every == 0:
+            bus.route()
+    bus.route()
+    elapsed = time.perf_counter() - t0
+    assert nodes[f"relay{len(CHAIN) - 1}"].count == len(packets)
+    return {
+        "fused_topics": len(fused),
+        "elapsed_s": elapsed,
+        "msgs_per_sec": len(packets) / elapsed,
+        "ns_per_msg": elapsed * 1e9 / len(packets),
+    }
+
+def run(workload: Optional[Workload] = None) -> Dict[str, Any]:
+    workload = workload or Workload()
+    packets = list(workload.packets())
+    tick_every = workload.users * workload.streams
+    routed = run_chain(packets, tick_every, compiled=False)
+    fused = run_chain(packets, tick_every, compiled=True)
+    pipe_routed = pipeline.run(workload)
+    pipe_fused = pipeline.run(workload, compiled=True)
+    return {
+        "chain_hops": len(CHAIN),
+        "chain_routed": routed,
+        "chain_fused": fused,
+        "chain_speedup": routed["ns_per_msg"] / fused["ns_per_msg"],
+        "pipeline_routed_msgs_per_sec": pipe_routed["msgs_per_sec"],
+        "pipeline_fused_msgs_per_sec": pipe_fused["msgs_per_sec"],
+        "pipeline_routed_samples_per_sec": pipe_routed["samples_per_sec"],
+        "pipeline_fused_samples_per_sec": pipe_fused["samples_per_sec"],
+        "pipeline_speedup": pipe_fused["samples_per_sec"] / pipe_routed["samples_per_sec"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_workload_args(ap)
+    result = run(workload_from(ap.parse_args()))
+    for label in ("routed", "fused"):
+        r = result[f"chain_{label}"]
+        print(f"chain {label:6} {r['ns_per_msg']:10,.0f} ns/msg  {r['msgs_per_sec']:12,.0f} msgs/s"
+              f"  ({r['fused_topics']} fused topics)")
+    print(f"chain speedup    {result['chain_speedup']:.2f}x")
+    print(f"pipeline routed  {result['pipeline_routed_samples_per_sec']:12,.0f} samples/s")
+    print(f"pipeline fused   {result['pipeline_fused_samples_per_sec']:12,.0f} samples/s")
+    print(f"pipeline speedup {result['pipeline_speedup']:.2f}x")
+
+if __name__ == "__main__":
+    main()
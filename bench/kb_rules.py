@@ -0,0 +1,74 @@
+"""
+KnowledgeBase rule matching at scale: compiled RuleIndex vs a linear chain
+of `pattern in state_text` checks, both returning every matching rule.
+
+    python -m bench.kb_rules [--rules 1000] [--states 20000]
+"""
+import argparse, random, sys, time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from orche_skeleton import Condition, KnowledgeBase
+
+def make_rules(n: int, seed: int = 11) -> List[Any]:
+    rng = random.Random(seed)
+    words = ["glucose", "heart rate", "sleep", "stress", "meal", "activity", "insulin",
+             "hydration", "recovery", "fasting", "spike", "drop", "elevated", "variability"]
+    rules = list(KnowledgeBase.RULES)
+    while len(rules) < n:
+        phrase = f"{rng.choice(words)} {rng.choice(words)} code{len(rules):04d}"
+        rules.append((phrase, Condition.NONE, f"Knowledge: guidance for {phrase}."))
+    return rules
+
+def make_states(rules: List[Any], n: int, seed: int = 12) -> List[str]:
+    rng = random.Random(seed)
+    states = []
+    for _ in range(n):
+        hits = [rng.choice(rules)[0] for _ in range(rng.randint(0, 3))]
+        states.append("; ".join(hits + [f"glucose={rng.randint(60, 220)} mg/dL"]))
+    return states
+
+def run(rules: int = 1000, states: int = 20000) -> Dict[str, Any]:
+    rule_list = make_rules(rules)
+    texts = make_states(rule_list, states)
+    patterns = [p for p, _, _ in rule_list]
+
+    t0 = time.perf_counter()
+    kb = KnowledgeBase(rule_list)
+    compile_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    linear = [[i for i, p in enumerate(patterns) if p in text] for text in texts]
+    linear_s = time.perf_counter() - t0
+
+    match = kb.index.match
+    t0 = time.perf_counter()
+    indexed = [match(text) for text in texts]
+    indexed_s = time.perf_counter() - t0
+
+    if linear != indexed:
+        raise AssertionError("RuleIndex disagrees with the linear scan")
+    return {
+        "rules": rules,
+        "states": states,
+        "compile_s": compile_s,
+        "linear_us_per_state": linear_s / states * 1e6,
+        "indexed_us_per_state": indexed_s / states * 1e6,
+        "speedup": linear_s / indexed_s,
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rules", type=int, default=1000)
+    ap.add_argument("--states", type=int, default=20000)
+    args = ap.parse_args()
+    r = run(args.rules, args.states)
+    print(f"rules {r['rules']:,}  states {r['states']:,}  compile {r['compile_s'] * 1e3:.1f} ms")
+    print(f"linear chain  {r['linear_us_per_state']:8.1f} us/state")
+    print(f"RuleIndex     {r['indexed_us_per_state']:8.1f} us/state")
+    print(f"speedup  {r['speedup']:.1f}x  (identical matches)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Message envelope micro-benchmark: slotted pcu Message vs the previous
+frozen-dataclass envelope (uuid4 + time.time() + fresh provenance dict per message).
+
+    python -m bench.message [-n 1000000]
+"""
+import argparse, sys, timeit, tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict
+import time, uuid
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pcu.core.message import Message
+from pcu.core.topics import Topic
+
+@dataclass(frozen=True)
+class LegacyMessage:
+    """The envelope as it was before the slotted rewrite, kept for comparison."""
+    topic: Topic
+    payload: Dict[str, Any]
+    ts: float = field(default_factory=lambda: time.time())
+    correlation_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    provenance: Dict[str, Any] = field(default_factory=dict)
+
+def _bytes_per_message(cls, n: int = 100_000) -> float:
+    payload = {"value": 72}
+    tracemalloc.start()
+    keep = [cls(topic=Topic.RAW_SENSORS, payload=payload) for _ in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return size / n
+
+def run(n: int = 1_000_000) -> Dict[str, Any]:
+    payload = {"value": 72}
+    results: Dict[str, Any] = {"n": n}
+    for label, cls in (("legacy", LegacyMessage), ("slotted", Message)):
+        create = lambda: cls(topic=Topic.RAW_SENSORS, payload=payload)
+        secs = min(timeit.repeat(create, number=n, repeat=3))
+        results[label] = {
+            "ns_per_msg": secs / n * 1e9,
+            "msgs_per_sec": n / secs,
+            "bytes_per_msg": _bytes_per_message(cls),
+        }
+    results["speedup"] = results["legacy"]["ns_per_msg"] / results["slotted"]["ns_per_msg"]
+    return results
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, default=1_000_000, help="messages per timing run")
+    r = run(ap.parse_args().n)
+    for label in ("legacy", "slotted"):
+        s = r[label]
+        print(f"{label:8s} {s['ns_per_msg']:8.1f} ns/msg  {s['msgs_per_sec']:>12,.0f} msg/s  "
+              f"{s['bytes_per_msg']:6.0f} B/msg")
+    print(f"speedup  {r['speedup']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+orche_skeleton Orchestrator.handle_new_data over a workload (trace prints go
+to os.devnull but are still paid for). Each hop is one pipeline stage, timed
+per call; "handle_new_data" is the whole packet.
+
+    python -m bench.orchestrator [--users 100] [--streams 2] [--rate 1] [--seconds 60]
+"""
+import argparse, contextlib, os, sys, time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from orche_skeleton import (ContextualInferenceEngine, GuidanceGenerator, InterfaceLayer, KnowledgeBase,
+                            Orchestrator, PersonicleEngine, SensingLayer, StateEstimationModule)
+from pcu.workload import orchestrator_packet
+from bench.common import LatencyRecorder, Workload, add_workload_args, peak_rss_mb, print_result, timed, workload_from
+
+STAGES = [
+    ("sensing", "ingest"),
+    ("personicle", "extract"),
+    ("state_estimator", "update"),
+    ("knowledge", "retrieve"),
+    ("context_engine", "infer"),
+    ("guidance", "generate"),
+    ("interface", "deliver"),
+]
+
+def build(recorder: LatencyRecorder) -> Orchestrator:
+    orchestrator = Orchestrator(
+        SensingLayer(), PersonicleEngine(), StateEstimationModule(), KnowledgeBase(),
+        ContextualInferenceEngine(), GuidanceGenerator(), InterfaceLayer(),
+    )
+    for attr, method in STAGES:
+        stage = getattr(orchestrator, attr)
+        setattr(stage, method, timed(recorder, f"{type(stage).__name__}.{method}", getattr(stage, method)))
+    orchestrator.decide_next_step = timed(recorder, "Orchestrator.decide_next_step",
+                                          orchestrator.decide_next_step)
+    return orchestrator
+
+def run(workload: Optional[Workload] = None) -> Dict[str, Any]:
+    workload = workload or Workload()
+    packets = [orchestrator_packet(p) for p in workload.packets()]
+    stages = LatencyRecorder()
+    orchestrator = build(stages)
+    handle = timed(stages, "Orchestrator.handle_new_data", orchestrator.handle_new_data)
+
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        t0 = time.perf_counter()
+        for packet in packets:
+            handle(packet)
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "samples": len(packets),
+        "elapsed_s": elapsed,
+        "msgs_per_sec": len(packets) / elapsed,
+        "latency": stages.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_workload_args(ap)
+    print_result("orchestrator", run(workload_from(ap.parse_args())))
+
+if __name__ == "__main__":
+    main()
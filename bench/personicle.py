@@ -0,0 +1,73 @@
+"""
+PersonicleEngine.extract (one dict per sample) vs extract_batch (whole arrays).
+
+    python -m bench.personicle [-n 1000000]
+
+Samples alternate between HR-only and glucose-only readings and include
+values past the noise thresholds; the batch result is checked against the
+scalar path before timings are reported.
+"""
+import argparse, random, sys, time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orche_skeleton
+from orche_skeleton import PersonicleEngine, EVENT_LABELS
+
+NAN = float("nan")
+
+def make_samples(n: int, seed: int = 7) -> Tuple[List[Dict[str, float]], List[float], List[float]]:
+    rng = random.Random(seed)
+    packets, hr, glucose = [], [], []
+    for i in range(n):
+        if i % 2:
+            v = float(rng.randint(15, 210))
+            packets.append({"hr": v}); hr.append(v); glucose.append(NAN)
+        else:
+            v = float(rng.randint(10, 550))
+            packets.append({"glucose": v}); hr.append(NAN); glucose.append(v)
+    return packets, hr, glucose
+
+def run(n: int = 1_000_000) -> Dict[str, Any]:
+    packets, hr, glucose = make_samples(n)
+
+    scalar = PersonicleEngine()
+    t0 = time.perf_counter()
+    expected = [scalar.extract(p)["events"] for p in packets]
+    scalar_s = time.perf_counter() - t0
+
+    batch = PersonicleEngine()
+    if orche_skeleton.np is not None:
+        hr_in, glucose_in = orche_skeleton.np.array(hr), orche_skeleton.np.array(glucose)
+    else:
+        hr_in, glucose_in = hr, glucose
+    t0 = time.perf_counter()
+    out = batch.extract_batch(hr=hr_in, glucose=glucose_in)
+    batch_s = time.perf_counter() - t0
+
+    got = [EVENT_LABELS[c] for c in out["events"]]
+    if got != expected or batch.previous_glucose != scalar.previous_glucose:
+        raise AssertionError("extract_batch diverged from extract")
+    return {
+        "n": n,
+        "numpy": orche_skeleton.np is not None,
+        "scalar_s": scalar_s,
+        "batch_s": batch_s,
+        "scalar_samples_per_sec": n / scalar_s,
+        "batch_samples_per_sec": n / batch_s,
+        "speedup": scalar_s / batch_s,
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, default=1_000_000, help="number of samples")
+    r = run(ap.parse_args().n)
+    print(f"samples  {r['n']:,}  (numpy={'yes' if r['numpy'] else 'no, Python fallback'})")
+    print(f"extract        {r['scalar_s']:8.3f} s  {r['scalar_samples_per_sec']:>14,.0f} samples/s")
+    print(f"extract_batch  {r['batch_s']:8.3f} s  {r['batch_samples_per_sec']:>14,.0f} samples/s")
+    print(f"speedup  {r['speedup']:.1f}x  (results identical)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+End-to-end build_pcu_system pipeline with the app/test_flow behaviors wired
+in (quietly): ingest a workload through IngestionNode and tick the system once
+per sample tick. Each hop is "<topic> -> <node>", timed from publish
+(Message.ts) to the start of that node's handler. --compile fuses
+single-producer/single-consumer hops first (PCUSystem.compile).
+
+    python -m bench.pipeline [--users 100] [--streams 2] [--rate 1] [--seconds 60] [--compile]
+"""
+import argparse, sys, time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pcu.core.message import Message
+from pcu.system import PCUSystem, build_pcu_system
+from app.test_flow import attach_dummy_behaviors
+from bench.common import LatencyRecorder, Workload, add_workload_args, peak_rss_mb, print_result, workload_from
+
+def instrument(system: PCUSystem, recorder: LatencyRecorder) -> None:
+    """Wrap every node's on_message to record publish -> handler latency per hop."""
+    clock, record = time.monotonic_ns, recorder.record
+
+    def probe(name: str, handler: Callable[[Message], None]) -> Callable[[Message], None]:
+        def on_message(msg: Message) -> None:
+            record(f"{msg.topic.value} -> {name}", clock() - msg.ts)
+            handler(msg)
+        return on_message
+
+    for name, node in system.nodes.items():
+        node.on_message = probe(name, node.on_message)
+
+def run(workload: Optional[Workload] = None, compiled: bool = False) -> Dict[str, Any]:
+    workload = workload or Workload()
+    packets = list(workload.packets())
+    system = build_pcu_system()
+    system.start()
+    attach_dummy_behaviors(system, verbose=False)
+    recorder = LatencyRecorder()
+    instrument(system, recorder)
+    fused = system.compile() if compiled else {}
+
+    ingest = system.nodes["ingestion"].ingest_sensor_packet
+    tick_every = workload.users * workload.streams
+    t0 = time.perf_counter()
+    for i, packet in enumerate(packets, 1):
+        ingest(packet)
+        if i % tick_every == 0:
+            system.tick()
+    stats = system.tick()
+    elapsed = time.perf_counter() - t0
+    system.stop()
+
+    return {
+        "samples": len(packets),
+        "fused": sorted(t.value for t in fused),
+        "published": stats.enqueued,
+        "delivered": recorder.count,
+        "elapsed_s": elapsed,
+        "samples_per_sec": len(packets) / elapsed,
+        "msgs_per_sec": recorder.count / elapsed,
+        "queue_high_watermark": stats.high_watermark,
+        "latency": recorder.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_workload_args(ap)
+    ap.add_argument("--compile", action="store_true", help="fuse single-producer/single-consumer hops")
+    args = ap.parse_args()
+    print_result("pipeline", run(workload_from(args), compiled=args.compile))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Critical-path latency under background load: FIFO vs priority lanes.
+
+Each tick publishes `background` routine HR readings and as many AUDIT
+records (handled by a sink that does a little work per message), plus one
+low glucose reading marked Priority.CRITICAL at a random position. The
+reading travels RAW_SENSORS -> EVENTS -> STATE -> CONTEXT -> GUIDANCE_PLAN
+-> ORCH_PROPOSAL -> GUIDANCE_OUT through relay nodes. Latency runs from the
+start of the tick's route() (the backlog is already queued) to the
+GUIDANCE_OUT handler, i.e. the time the alarm spends behind other traffic.
+
+    python -m bench.priority [--ticks 200] [--background 2000] [--starvation-limit 32]
+"""
+import argparse, random, sys, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pcu.core.bus import InMemoryBus
+from pcu.core.message import Message
+from pcu.core.node import Node
+from pcu.core.queue import Priority, TOPIC_PRIORITY
+from pcu.core.topics import NodeRole, Topic
+from bench.common import LatencyRecorder, peak_rss_mb
+
+PATH = [Topic.RAW_SENSORS, Topic.EVENTS, Topic.STATE, Topic.CONTEXT,
+        Topic.GUIDANCE_PLAN, Topic.ORCH_PROPOSAL, Topic.GUIDANCE_OUT]
+
+class RelayNode(Node):
+    """Forwards glucose alarms one hop along PATH; the last hop records end-to-end latency."""
+    def __init__(self, name: str, bus: Any, hop: int, recorder: LatencyRecorder) -> None:
+        super().__init__(name, NodeRole.OBSERVABILITY, bus)
+        self.hop = hop
+        self._record = recorder.record
+
+    @property
+    def inputs(self) -> List[Topic]:
+        return [PATH[self.hop]]
+
+    @property
+    def outputs(self) -> List[Topic]:
+        return [PATH[self.hop + 1]] if self.hop + 1 < len(PATH) else []
+
+    def on_message(self, msg: Message) -> None:
+        p = msg.payload
+        if p.get("stream_id") != "cgm.glucose":
+            return
+        if self.hop + 1 < len(PATH):
+            self.bus.publish(Message(PATH[self.hop + 1], p))
+        else:
+            self._record("critical path", time.monotonic_ns() - p["published"])
+
+class BackgroundSink(Node):
+    """Routine consumer of HR and AUDIT traffic."""
+    def __init__(self, name: str, bus: Any, work: int) -> None:
+        super().__init__(name, NodeRole.OBSERVABILITY, bus)
+        self.work = range(work)
+        self.count = 0
+
+    @property
+    def inputs(self) -> List[Topic]:
+        return [Topic.RAW_SENSORS, Topic.AUDIT]
+
+    @property
+    def outputs(self) -> List[Topic]:
+        return []
+
+    def on_message(self, msg: Message) -> None:
+        for _ in self.work:
+            pass
+        self.count += 1
+
+def run_mode(priorities: Optional[Dict[Topic, int]], ticks: int, background: int,
+             starvation_limit: int, work: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    recorder = LatencyRecorder()
+    bus = InMemoryBus(priorities=priorities, starvation_limit=starvation_limit)
+    for hop in range(len(PATH)):
+        RelayNode(f"relay{hop}", bus, hop, recorder).start()
+    sink = BackgroundSink("sink", bus, work)
+    sink.start()
+
+    publish = bus.publish
+    t0 = time.perf_counter()
+    for tick in range(ticks):
+        alarm_at = rng.randrange(background)
+        alarm: Dict[str, Any] = {"user_id": "u0", "stream_id": "cgm.glucose", "value": 52.0}
+        for i in range(background):
+            if i == alarm_at:
+                publish(Message(Topic.RAW_SENSORS, alarm, priority=Priority.CRITICAL))
+            publish(Message(Topic.RAW_SENSORS, {"user_id": f"u{i}", "stream_id": "watch.hr", "value": 70.0}))
+            publish(Message(Topic.AUDIT, {"kind": "routine", "i": i}))
+        alarm["published"] = time.monotonic_ns()
+        bus.route()
+    elapsed = time.perf_counter() - t0
+    stats = recorder.summary()["critical path"]
+    return {
+        "alarms": stats["count"],
+        "critical_p50_us": stats["p50_us"],
+        "critical_p99_us": stats["p99_us"],
+        "background_msgs_per_sec": sink.count / elapsed,
+    }
+
+def run(ticks: int = 200, background: int = 2000, starvation_limit: int = 32,
+        work: int = 20, seed: int = 0) -> Dict[str, Any]:
+    fifo = run_mode(None, ticks, background, starvation_limit, work, seed)
+    lanes = run_mode(TOPIC_PRIORITY, ticks, background, starvation_limit, work, seed)
+    return {
+        "ticks": ticks,
+        "background_per_tick": 2 * background,
+        "fifo": fifo,
+        "lanes": lanes,
+        "critical_p99_speedup": fifo["critical_p99_us"] / lanes["critical_p99_us"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--ticks", type=int, default=200)
+    ap.add_argument("--background", type=int, default=2000, help="HR readings (and AUDIT records) per tick")
+    ap.add_argument("--starvation-limit", type=int, default=32)
+    ap.add_argument("--work", type=int, default=20, help="busy-loop iterations per background message")
+    args = ap.parse_args()
+    result = run(args.ticks, args.background, args.starvation_limit, args.work)
+    for mode in ("fifo", "lanes"):
+        r = result[mode]
+        print(f"{mode:5}  critical p50 {r['critical_p50_us']:10,.1f} us  p99 {r['critical_p99_us']:10,.1f} us"
+              f"  background {r['background_msgs_per_sec']:12,.0f} msgs/s")
+    print(f"critical p99 speedup {result['critical_p99_speedup']:.1f}x")
+
+if __name__ == "__main__":
+    main()
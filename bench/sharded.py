@@ -0,0 +1,67 @@
+"""
+ShardedRuntime throughput scaling: the same workload through 1..N worker
+processes. Workers are started and warmed up (graph built, one drain) before
+the clock starts; each run times ingest of every packet plus the final
+drain(), so it includes IPC and waits for the slowest shard. "speedup" is
+samples/sec relative to one worker; near-linear scaling needs as many free
+cores as workers.
+
+    python -m bench.sharded [--max-workers 4] [--batch-size 256] [--users 100] [--seconds 60]
+"""
+import argparse, os, sys, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pcu.system import ShardedRuntime
+from bench.common import Workload, add_workload_args, peak_rss_mb, workload_from
+
+def run_workers(workers: int, packets: List[Dict[str, Any]], batch_size: int) -> Dict[str, Any]:
+    runtime = ShardedRuntime(workers=workers, batch_size=batch_size)
+    runtime.start()
+    try:
+        runtime.drain()
+        ingest = runtime.ingest_sensor_packet
+        t0 = time.perf_counter()
+        for packet in packets:
+            ingest(packet)
+        runtime.drain()
+        elapsed = time.perf_counter() - t0
+    finally:
+        runtime.stop()
+    return {"elapsed_s": elapsed, "samples_per_sec": len(packets) / elapsed}
+
+def run(workload: Optional[Workload] = None, max_workers: Optional[int] = None,
+        batch_size: int = 256) -> Dict[str, Any]:
+    workload = workload or Workload()
+    packets = list(workload.packets())
+    max_workers = max_workers or os.cpu_count() or 1
+    runs = {}
+    for workers in range(1, max_workers + 1):
+        runs[str(workers)] = run_workers(workers, packets, batch_size)
+    base = runs["1"]["samples_per_sec"]
+    for r in runs.values():
+        r["speedup"] = r["samples_per_sec"] / base
+    return {
+        "samples": len(packets),
+        "cpus": os.cpu_count(),
+        "batch_size": batch_size,
+        "workers": runs,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_workload_args(ap)
+    ap.add_argument("--max-workers", type=int, default=None, help="default: os.cpu_count()")
+    ap.add_argument("--batch-size", type=int, default=256, help="packets per IPC batch")
+    args = ap.parse_args()
+    result = run(workload_from(args), args.max_workers, args.batch_size)
+    print(f"{result['samples']:,} samples, {result['cpus']} cpus")
+    for workers, r in result["workers"].items():
+        print(f"  workers {workers:>3}: {r['samples_per_sec']:12,.0f} samples/s  ({r['elapsed_s']:.3f} s)"
+              f"  speedup {r['speedup']:.2f}x")
+
+if __name__ == "__main__":
+    main()
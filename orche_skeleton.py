@@ -1,7 +1,43 @@
 # ================================================================
 # PCU Components (Services)
 # ================================================================
-import re
+import math
+from array import array
+from enum import IntFlag, auto
+
+from pcu.core.keyed_state import KeyedStateStore
+from pcu.core.rules import RuleIndex
+
+try:
+    import numpy as np
+except ImportError:  # optional: PersonicleEngine.extract_batch falls back to a Python loop
+    np = None
+
+# Event codes returned by PersonicleEngine.extract_batch; EVENT_LABELS[code] is the
+# string PersonicleEngine.extract reports for the same sample.
+EVENT_NORMAL, EVENT_WARNING, EVENT_EXERCISING, EVENT_NOISE = 0, 1, 2, 3
+EVENT_LABELS = ("normal", "warning", "exercising", "noise")
+
+# Users untouched for this long lose their spike-detection baseline.
+GLUCOSE_STATE_IDLE_TTL = 24 * 3600.0
+
+
+def _glucose_store():
+    """Per-user previous glucose (NaN until the first reading), keyed by data["user_id"]."""
+    return KeyedStateStore({"previous_glucose": math.nan}, idle_ttl=GLUCOSE_STATE_IDLE_TTL)
+
+
+def _per_sample(user_id):
+    """True when user_id is a column of ids (list, tuple, array or NumPy array), not one shared id."""
+    return isinstance(user_id, (list, tuple, array)) or getattr(user_id, "ndim", 0) > 0
+
+
+def _previous_or_none(store, user_id=None):
+    view = store.peek(user_id)
+    if view is None or math.isnan(view.previous_glucose):
+        return None
+    return view.previous_glucose
+
 
 class SensingLayer:
     def ingest(self, raw_data):
@@ -11,9 +47,14 @@ class SensingLayer:
 
 class PersonicleEngine:
     def __init__(self):
-        """Initialize PersonicleEngine with state tracking."""
-        self.previous_glucose = None  # Track previous glucose value for spike detection
-    
+        """Initialize PersonicleEngine with per-user state tracking."""
+        self.glucose_state = _glucose_store()  # Previous glucose per user for spike detection
+
+    @property
+    def previous_glucose(self):
+        """Previous glucose for samples without a user_id (single-user callers)."""
+        return _previous_or_none(self.glucose_state)
+
     def extract(self, sensed):
         """Convert sensed data into processed data and events. Performs noise filtering."""
         # Extract the actual sensed data
@@ -61,8 +102,8 @@ class PersonicleEngine:
             processed_data['glucose'] = glucose
             
             # Track glucose for spike detection (but don't judge here - that's StateEstimationModule's job)
-            # Update previous glucose value
-            self.previous_glucose = glucose
+            # Update this user's previous glucose value
+            self.glucose_state.get(sensed_data.get('user_id')).previous_glucose = glucose
         
         # Handle other data types
         for key, value in sensed_data.items():
@@ -79,174 +120,376 @@ class PersonicleEngine:
         
         return {"processed_data": processed_data, "events": event, "noise": False}
 
+    def extract_batch(self, hr=None, glucose=None, user_id=None):
+        """
+        Vectorized extract over whole sample arrays (NumPy masks when available).
+        hr / glucose are equal-length float sequences with NaN where a sample has no
+        reading of that kind; user_id is one id for the whole batch or one per sample.
+        Returns {"events": int8 codes (see EVENT_LABELS), "noise": bool mask}; each
+        sample gets the same verdict extract() would give, and each user's previous
+        glucose ends at their last non-noise glucose reading.
+        """
+        if hr is None and glucose is None:
+            raise ValueError("extract_batch needs hr and/or glucose")
+        if np is None:
+            return self._extract_batch_py(hr, glucose, user_id)
+
+        hr = None if hr is None else np.asarray(hr, dtype=np.float64)
+        glucose = None if glucose is None else np.asarray(glucose, dtype=np.float64)
+        n = len(hr) if hr is not None else len(glucose)
+        noise = np.zeros(n, dtype=bool)
+        events = np.full(n, EVENT_NORMAL, dtype=np.int8)
+
+        # NaN compares False everywhere, so missing readings never trip a rule.
+        if hr is not None:
+            noise |= (hr < 30) | (hr >= 180)
+            events[(hr >= 70) & (hr < 85)] = EVENT_WARNING
+            events[(hr >= 85) & (hr < 100)] = EVENT_EXERCISING
+        if glucose is not None:
+            noise |= (glucose < 20) | (glucose > 500)
+            kept = np.flatnonzero(~noise & ~np.isnan(glucose))
+            if not _per_sample(user_id):
+                if kept.size:
+                    self.glucose_state.get(user_id).previous_glucose = float(glucose[kept[-1]])
+            else:
+                for i in kept.tolist():
+                    self.glucose_state.get(user_id[i]).previous_glucose = float(glucose[i])
+        events[noise] = EVENT_NOISE
+        return {"events": events, "noise": noise}
+
+    def _extract_batch_py(self, hr, glucose, user_id):
+        """Pure-Python fallback for extract_batch when NumPy is not installed."""
+        n = len(hr) if hr is not None else len(glucose)
+        events = array("b", bytes(n))
+        noise = [False] * n
+        per_sample = _per_sample(user_id)
+        for i in range(n):
+            h = hr[i] if hr is not None else float("nan")
+            g = glucose[i] if glucose is not None else float("nan")
+            if h < 30 or h >= 180 or g < 20 or g > 500:
+                events[i] = EVENT_NOISE
+                noise[i] = True
+                continue
+            if 70 <= h < 85:
+                events[i] = EVENT_WARNING
+            elif 85 <= h < 100:
+                events[i] = EVENT_EXERCISING
+            if g == g:  # not NaN
+                user = user_id[i] if per_sample else user_id
+                self.glucose_state.get(user).previous_glucose = g
+        return {"events": events, "noise": noise}
+
+
+class Condition(IntFlag):
+    """Condition codes carried by StateRecord; several may be set at once."""
+    NONE = 0
+    HR_WARNING = auto()             # PersonicleEngine event "warning" (HR 70-85)
+    EXERCISING = auto()             # PersonicleEngine event "exercising" (HR 85-100)
+    HR_LOW = auto()
+    HR_HIGH = auto()
+    GLUCOSE_SPIKE = auto()          # rise of more than 20 mg/dL since the previous reading
+    GLUCOSE_SPIKE_INITIAL = auto()  # first reading already elevated (>140 mg/dL)
+    GLUCOSE_LOW = auto()
+    GLUCOSE_HIGH = auto()
+    NOISE = auto()
+
+
+_EVENT_CONDITIONS = {"warning": Condition.HR_WARNING, "exercising": Condition.EXERCISING}
+
+
+class StateRecord:
+    """
+    Typed output of StateEstimationModule: numeric readings plus condition codes.
+    Downstream stages decide on `conditions`; `text` renders the legacy state
+    string and is only built when something asks for it.
+    """
+    __slots__ = ("conditions", "events", "hr", "glucose", "spike", "processed_data")
+
+    def __init__(self, conditions=Condition.NONE, events="", hr=None, glucose=None,
+                 spike=None, processed_data=None):
+        self.conditions = conditions
+        self.events = events
+        self.hr = hr
+        self.glucose = glucose
+        self.spike = spike
+        self.processed_data = processed_data
+
+    @property
+    def text(self):
+        c = self.conditions
+        if c & Condition.NOISE:
+            return "noise"
+        if not isinstance(self.processed_data, dict):
+            return f"state({self.events})"
+        states = []
+        if c & Condition.HR_LOW:
+            states.append(f"heart rate too low, heart rate={self.hr}")
+        elif c & Condition.HR_HIGH:
+            states.append(f"heart rate too high, heart rate={self.hr}")
+        if c & Condition.GLUCOSE_SPIKE:
+            states.append(f"glucose spike, glucose={self.glucose} mg/dL, spike={self.spike:.1f} mg/dL")
+        elif c & Condition.GLUCOSE_SPIKE_INITIAL:
+            states.append(f"glucose spike, glucose={self.glucose} mg/dL, spike=initial elevated reading")
+        elif c & Condition.GLUCOSE_LOW:
+            states.append(f"glucose too low, glucose={self.glucose} mg/dL")
+        elif c & Condition.GLUCOSE_HIGH:
+            states.append(f"glucose too high, glucose={self.glucose} mg/dL")
+        # Combine states with events from PersonicleEngine
+        if not states:
+            return self.events if self.events else "normal"
+        parts = [self.events] + states if self.events and self.events != "normal" else states
+        return "; ".join(parts)
+
+    def __str__(self):
+        return self.text
+
 
 class StateEstimationModule:
     def __init__(self):
-        """Initialize StateEstimationModule with state tracking."""
-        self.previous_glucose = None  # Track previous glucose for spike detection
-    
+        """Initialize StateEstimationModule with per-user state tracking."""
+        self.glucose_state = _glucose_store()  # Previous glucose per user for spike detection
+
+    @property
+    def previous_glucose(self):
+        """Previous glucose for data without a user_id (single-user callers)."""
+        return _previous_or_none(self.glucose_state)
+
     def update(self, personicle_output):
         """Update physiological/behavioral/emotional state based on PersonicleEngine output."""
         # Check if it's noise
         if personicle_output.get('noise', False):
-            return {"state": "noise"}
+            return StateRecord(Condition.NOISE)
         
         # Extract processed data and events
         processed_data = personicle_output.get('processed_data', {})
         events = personicle_output.get('events', '')
+        record = StateRecord(events=events, processed_data=processed_data)
         
         if not isinstance(processed_data, dict):
-            return {"state": f"state({events})"}
+            return record
         
-        states = []
+        conditions = Condition.NONE
+        for event in events.split("; ") if events else ():
+            conditions |= _EVENT_CONDITIONS.get(event, Condition.NONE)
         
         # Judge heart rate states
         if 'hr' in processed_data:
-            hr = processed_data['hr']
+            hr = record.hr = processed_data['hr']
             if hr < 70:
-                states.append(f"heart rate too low, heart rate={hr}")
+                conditions |= Condition.HR_LOW
             elif hr >= 100:
-                states.append(f"heart rate too high, heart rate={hr}")
+                conditions |= Condition.HR_HIGH
             # Normal range [70, 100) is handled by PersonicleEngine events (exercising/warning)
         
         # Judge glucose states
         if 'glucose' in processed_data:
-            glucose = processed_data['glucose']
+            glucose = record.glucose = processed_data['glucose']
+            user_state = self.glucose_state.get(processed_data.get('user_id'))
+            previous_glucose = user_state.previous_glucose
             
-            # Track glucose for spike detection
-            if self.previous_glucose is not None:
-                glucose_change = glucose - self.previous_glucose
+            # Track glucose for spike detection (per user, so interleaved users don't mix)
+            if not math.isnan(previous_glucose):
+                glucose_change = glucose - previous_glucose
                 # Detect glucose spike (eating event)
                 if glucose_change > 20:
-                    states.append(f"glucose spike, glucose={glucose} mg/dL, spike={glucose_change:.1f} mg/dL")
+                    conditions |= Condition.GLUCOSE_SPIKE
+                    record.spike = glucose_change
                 elif glucose < 70:
-                    states.append(f"glucose too low, glucose={glucose} mg/dL")
+                    conditions |= Condition.GLUCOSE_LOW
                 elif glucose > 180:
-                    states.append(f"glucose too high, glucose={glucose} mg/dL")
+                    conditions |= Condition.GLUCOSE_HIGH
             else:
                 # First glucose reading
                 if glucose < 70:
-                    states.append(f"glucose too low, glucose={glucose} mg/dL")
+                    conditions |= Condition.GLUCOSE_LOW
                 elif glucose > 180:
-                    states.append(f"glucose too high, glucose={glucose} mg/dL")
+                    conditions |= Condition.GLUCOSE_HIGH
                 elif glucose > 140:
-                    states.append(f"glucose spike, glucose={glucose} mg/dL, spike=initial elevated reading")
+                    conditions |= Condition.GLUCOSE_SPIKE_INITIAL
             
-            # Update previous glucose value
-            self.previous_glucose = glucose
-        
-        # Combine states with events from PersonicleEngine
-        if len(states) == 0:
-            state_str = events if events else "normal"
-        else:
-            state_parts = [events] + states if events and events != "normal" else states
-            state_str = "; ".join(state_parts)
+            # Update this user's previous glucose value
+            user_state.previous_glucose = glucose
         
-        return {"state": state_str, "processed_data": processed_data}
+        record.conditions = conditions
+        return record
+
+
+class KnowledgeRecord:
+    """Knowledge selected for a state: the winning rule's guidance plus every matched rule."""
+    __slots__ = ("state", "guidance", "matched_rules")
+
+    def __init__(self, state, guidance, matched_rules):
+        self.state = state
+        self.guidance = guidance
+        self.matched_rules = matched_rules
+
+    @property
+    def text(self):
+        if self.guidance is not None:
+            return self.guidance
+        return f"Knowledge: General health monitoring for state: {self.state}"
+
+    def __str__(self):
+        return self.text
 
 
 class KnowledgeBase:
+    # (trigger phrase in the state text, condition codes, guidance) in priority
+    # order: the first matching rule supplies the guidance, as with the original
+    # if/elif chain. StateRecords are matched on condition codes; free-text
+    # states fall back to the phrase index.
+    RULES = [
+        ("heart rate too low", Condition.HR_LOW, "Knowledge: Low heart rate may indicate rest, sleep, or potential bradycardia. Normal resting HR is 60-100 bpm for adults."),
+        ("heart rate too high", Condition.HR_HIGH, "Knowledge: Elevated heart rate can result from exercise, stress, caffeine, or medical conditions. Target HR during moderate activity is 50-70% of max (220-age)."),
+        ("glucose spike", Condition.GLUCOSE_SPIKE | Condition.GLUCOSE_SPIKE_INITIAL, "Knowledge: Post-meal glucose typically peaks 1-2 hours after eating. Healthy post-meal glucose is <140 mg/dL. Large spikes may indicate high-carb meals or insulin resistance."),
+        ("glucose too low", Condition.GLUCOSE_LOW, "Knowledge: Hypoglycemia (<70 mg/dL) requires immediate attention. Quick-acting carbs (15g) can help raise glucose. If severe, seek medical help."),
+        ("glucose too high", Condition.GLUCOSE_HIGH, "Knowledge: Hyperglycemia (>180 mg/dL) may indicate diabetes or poor glucose control. Monitor diet, exercise, and consider consulting healthcare provider."),
+    ]
+
+    def __init__(self, rules=None):
+        """Compile the rules once: a phrase matcher and an index keyed on condition bits."""
+        self.rules = list(self.RULES if rules is None else rules)
+        self.index = RuleIndex(pattern for pattern, _, _ in self.rules)
+        self.by_condition = {}
+        for rule_id, (_, conditions, _) in enumerate(self.rules):
+            for flag in Condition:
+                if flag and conditions & flag:
+                    self.by_condition.setdefault(flag, []).append(rule_id)
+
+    def match(self, state):
+        """Ids of all rules matching the state, in priority order."""
+        if isinstance(state, StateRecord):
+            by_condition = self.by_condition
+            matched = set()
+            for flag in _set_flags(state.conditions):
+                matched.update(by_condition.get(flag, ()))
+            return sorted(matched)
+        state_data = state.get('state', state) if isinstance(state, dict) else str(state)
+        return self.index.match(state_data)
+
     def retrieve(self, state):
         """Provide domain knowledge relevant to the state."""
-        # Extract clean data for readable output
-        state_data = state.get('state', state) if isinstance(state, dict) else str(state)
-        
-        # Generate domain-specific guidance based on state
-        knowledge_guidance = ""
-        
-        if "heart rate too low" in state_data:
-            knowledge_guidance = "Knowledge: Low heart rate may indicate rest, sleep, or potential bradycardia. Normal resting HR is 60-100 bpm for adults."
-        elif "heart rate too high" in state_data:
-            knowledge_guidance = "Knowledge: Elevated heart rate can result from exercise, stress, caffeine, or medical conditions. Target HR during moderate activity is 50-70% of max (220-age)."
-        elif "glucose spike" in state_data:
-            knowledge_guidance = "Knowledge: Post-meal glucose typically peaks 1-2 hours after eating. Healthy post-meal glucose is <140 mg/dL. Large spikes may indicate high-carb meals or insulin resistance."
-        elif "glucose too low" in state_data:
-            knowledge_guidance = "Knowledge: Hypoglycemia (<70 mg/dL) requires immediate attention. Quick-acting carbs (15g) can help raise glucose. If severe, seek medical help."
-        elif "glucose too high" in state_data:
-            knowledge_guidance = "Knowledge: Hyperglycemia (>180 mg/dL) may indicate diabetes or poor glucose control. Monitor diet, exercise, and consider consulting healthcare provider."
-        else:
-            knowledge_guidance = f"Knowledge: General health monitoring for state: {state_data}"
-        
-        return {"knowledge": knowledge_guidance, "state": state_data}
+        matched = self.match(state)
+        if not isinstance(state, StateRecord):
+            state = state.get('state', state) if isinstance(state, dict) else str(state)
+        guidance = self.rules[matched[0]][2] if matched else None
+        return KnowledgeRecord(state, guidance, [self.rules[i][0] for i in matched])
+
+
+def _set_flags(conditions):
+    """Individual Condition bits set in `conditions`."""
+    value = int(conditions)
+    while value:
+        bit = value & -value
+        yield Condition(bit)
+        value ^= bit
+
+
+class ContextRecord:
+    """Situation handed to guidance: the state plus the knowledge retrieved for it."""
+    __slots__ = ("state", "knowledge")
+
+    def __init__(self, state, knowledge):
+        self.state = state
+        self.knowledge = knowledge
+
+    @property
+    def text(self):
+        return f"context(state={self.state}, knowledge={self.knowledge})"
+
+    def __str__(self):
+        return self.text
 
 
 class ContextualInferenceEngine:
     def infer(self, state, knowledge):
         """Interpret user's situation/intent."""
-        # Extract clean values to avoid nested string escaping
-        state_val = state.get('state', '') if isinstance(state, dict) else str(state)
-        knowledge_val = knowledge.get('knowledge', '') if isinstance(knowledge, dict) else str(knowledge)
-        return {"context": f"context(state={state_val}, knowledge={knowledge_val})", "knowledge_guidance": knowledge_val}
+        return ContextRecord(state, knowledge)
 
 
-class GuidanceGenerator:
-    def generate(self, context):
-        """Generate nudges, insights, explanations."""
-        # Extract context data and knowledge guidance
-        context_data = context.get('context', context) if isinstance(context, dict) else str(context)
-        knowledge_guidance = context.get('knowledge_guidance', '') if isinstance(context, dict) else ''
-        
-        # Parse context to extract meaningful information and generate personalized guidance
-        # Check for glucose spike events first (highest priority)
-        if "glucose spike" in context_data:
-            glucose_match = re.search(r'glucose=([\d.]+)', context_data)
-            spike_match = re.search(r'spike=([\d.]+)', context_data)  # Just capture the number
-            glucose_value = glucose_match.group(1) if glucose_match else "unknown"
-            spike_value = spike_match.group(1) if spike_match else "unknown"
-            if "initial" in context_data.lower():
-                base_msg = f"Insight: Glucose spike detected (eating event). Your glucose is {glucose_value} mg/dL (elevated reading)."
+# Guidance kinds in priority order, each with the conditions that select it.
+GUIDANCE_PRIORITY = (
+    ("glucose_spike", Condition.GLUCOSE_SPIKE | Condition.GLUCOSE_SPIKE_INITIAL),
+    ("exercising", Condition.EXERCISING),
+    ("hr_warning", Condition.HR_WARNING),
+    ("hr_low", Condition.HR_LOW),
+    ("hr_high", Condition.HR_HIGH),
+    ("glucose_low", Condition.GLUCOSE_LOW),
+    ("glucose_high", Condition.GLUCOSE_HIGH),
+)
+
+
+def _select_guidance(conditions):
+    for kind, mask in GUIDANCE_PRIORITY:
+        if conditions & mask:
+            return kind
+    return "general"
+
+
+# Every combination of condition bits -> guidance kind, so selection is one index.
+GUIDANCE_TABLE = tuple(_select_guidance(c) for c in range(1 << (len(Condition.__members__) - 1)))
+
+
+class GuidanceRecord:
+    """Selected guidance kind plus the context it is about; rendered only on delivery."""
+    __slots__ = ("kind", "context")
+
+    def __init__(self, kind, context):
+        self.kind = kind
+        self.context = context
+
+    def render(self):
+        state = self.context.state
+        knowledge_guidance = self.context.knowledge.text
+        kind = self.kind
+        if kind == "glucose_spike":
+            if state.conditions & Condition.GLUCOSE_SPIKE_INITIAL:
+                base_msg = f"Insight: Glucose spike detected (eating event). Your glucose is {state.glucose} mg/dL (elevated reading)."
             else:
-                base_msg = f"Insight: Glucose spike detected (eating event). Your glucose is {glucose_value} mg/dL (spike: +{spike_value} mg/dL)."
-            guidance_msg = f"{base_msg} {knowledge_guidance} Consider tracking your meal timing and composition."
-        
-        # Check for PersonicleEngine events (exercising, warning)
-        elif "exercising" in context_data:
+                base_msg = f"Insight: Glucose spike detected (eating event). Your glucose is {state.glucose} mg/dL (spike: +{state.spike:.1f} mg/dL)."
+            return f"{base_msg} {knowledge_guidance} Consider tracking your meal timing and composition."
+        if kind == "exercising":
             base_msg = "Insight: Your heart rate pattern suggests you may be exercising."
-            guidance_msg = f"{base_msg} {knowledge_guidance if knowledge_guidance else 'Keep up the good work!'}"
-        elif "warning" in context_data:
+            return f"{base_msg} {knowledge_guidance if knowledge_guidance else 'Keep up the good work!'}"
+        if kind == "hr_warning":
             base_msg = "Notice: Your heart rate is in the lower normal range."
-            guidance_msg = f"{base_msg} {knowledge_guidance if knowledge_guidance else 'Monitor your condition.'}"
-        
-        # Check for heart rate events
-        elif "heart rate too low" in context_data:
-            # Extract heart rate value
-            hr_match = re.search(r'heart rate=(\d+)', context_data)
-            hr_value = hr_match.group(1) if hr_match else "unknown"
-            base_msg = f"Recommendation: Your heart rate ({hr_value} bpm) is below normal."
-            guidance_msg = f"{base_msg} {knowledge_guidance} Consider resting or consulting a healthcare provider if this persists."
-        elif "heart rate too high" in context_data:
-            # Extract heart rate value
-            hr_match = re.search(r'heart rate=(\d+)', context_data)
-            hr_value = hr_match.group(1) if hr_match else "unknown"
-            base_msg = f"Recommendation: Your heart rate ({hr_value} bpm) is elevated."
-            guidance_msg = f"{base_msg} {knowledge_guidance} Consider taking a break, deep breathing, or consulting a healthcare provider if this persists."
-        
-        # Check for glucose events
-        elif "glucose too low" in context_data:
-            glucose_match = re.search(r'glucose=([\d.]+)', context_data)
-            glucose_value = glucose_match.group(1) if glucose_match else "unknown"
-            base_msg = f"Alert: Your glucose ({glucose_value} mg/dL) is below normal."
-            guidance_msg = f"{base_msg} {knowledge_guidance} Consider having a snack or consulting a healthcare provider if this persists."
-        elif "glucose too high" in context_data:
-            glucose_match = re.search(r'glucose=([\d.]+)', context_data)
-            glucose_value = glucose_match.group(1) if glucose_match else "unknown"
-            base_msg = f"Alert: Your glucose ({glucose_value} mg/dL) is elevated."
-            guidance_msg = f"{base_msg} {knowledge_guidance} Consider monitoring your diet and consulting a healthcare provider if this persists."
-        else:
-            if knowledge_guidance:
-                guidance_msg = f"{knowledge_guidance} Additional context: {context_data}"
-            else:
-                guidance_msg = f"Guidance based on: {context_data}"
-        
-        return {"guidance": guidance_msg}
+            return f"{base_msg} {knowledge_guidance if knowledge_guidance else 'Monitor your condition.'}"
+        if kind == "hr_low":
+            base_msg = f"Recommendation: Your heart rate ({state.hr} bpm) is below normal."
+            return f"{base_msg} {knowledge_guidance} Consider resting or consulting a healthcare provider if this persists."
+        if kind == "hr_high":
+            base_msg = f"Recommendation: Your heart rate ({state.hr} bpm) is elevated."
+            return f"{base_msg} {knowledge_guidance} Consider taking a break, deep breathing, or consulting a healthcare provider if this persists."
+        if kind == "glucose_low":
+            base_msg = f"Alert: Your glucose ({state.glucose} mg/dL) is below normal."
+            return f"{base_msg} {knowledge_guidance} Consider having a snack or consulting a healthcare provider if this persists."
+        if kind == "glucose_high":
+            base_msg = f"Alert: Your glucose ({state.glucose} mg/dL) is elevated."
+            return f"{base_msg} {knowledge_guidance} Consider monitoring your diet and consulting a healthcare provider if this persists."
+        if knowledge_guidance:
+            return f"{knowledge_guidance} Additional context: {self.context}"
+        return f"Guidance based on: {self.context}"
+
+    def __str__(self):
+        return self.render()
+
+
+class GuidanceGenerator:
+    def generate(self, context):
+        """Generate nudges, insights, explanations."""
+        # Selection is a table lookup on the state's condition codes; text is
+        # rendered later, when the guidance is delivered.
+        conditions = context.state.conditions if isinstance(context.state, StateRecord) else 0
+        return GuidanceRecord(GUIDANCE_TABLE[conditions], context)
 
 
 class InterfaceLayer:
     def deliver(self, message):
         """Deliver guidance to user or caregiver."""
+        text = message.render() if isinstance(message, GuidanceRecord) else message
         # Format message in a more readable way
         print(f"[Interface] Recommendation:")
-        print(f"  {message}")
+        print(f"  {text}")
 
 # ================================================================
 # Orchestrator (Central Brain)
@@ -288,24 +531,21 @@ class Orchestrator:
 
         # 3. Route logic
         if next_action == "update_state":
+            # Records flow between stages; the trace prints below render them lazily.
             state = self.state_estimator.update(personicle_output)
-            state_str = state.get('state', '') if isinstance(state, dict) else str(state)
-            print(f"[StateEstimationModule] Output: {state_str}")
+            print(f"[StateEstimationModule] Output: {state}")
             
             knowledge = self.knowledge.retrieve(state)
-            knowledge_str = knowledge.get('knowledge', '') if isinstance(knowledge, dict) else str(knowledge)
-            print(f"[KnowledgeBase] Output: {knowledge_str}")
+            print(f"[KnowledgeBase] Output: {knowledge}")
             
             context = self.context_engine.infer(state, knowledge)
-            context_str = context.get('context', '') if isinstance(context, dict) else str(context)
-            print(f"[ContextualInferenceEngine] Output: {context_str}")
+            print(f"[ContextualInferenceEngine] Output: {context}")
             
             guidance = self.guidance.generate(context)
-            guidance_str = guidance.get('guidance', '') if isinstance(guidance, dict) else str(guidance)
-            print(f"[GuidanceGenerator] Output: {guidance_str}")
+            print(f"[GuidanceGenerator] Output: {guidance}")
             print()  # Add spacing before interface delivery
             
-            self.interface.deliver(guidance_str)
+            self.interface.deliver(guidance)
 
         elif next_action == "ignore":
             print("[Orchestrator] Data logged but not providing recommendation at this time.")
@@ -1,6 +1,17 @@
 # Convenience re-exports for core types.
 from .topics import Topic, NodeRole
 from .message import Message
+from .frame import SensorFrame
+from .ingest import IngestReducer, StreamPolicy, ReductionStats
+from .queue import BoundedQueue, OverflowPolicy, QueueFullError, DEFAULT_BLOCK_TIMEOUT, QueueStats, PriorityQueue, Priority, TOPIC_PRIORITY
+from .shedding import SheddingPolicy, ShedRule, ShedAction, ShedStats, DEFAULT_SHED_RULES, NEVER_SHED
 from .bus import EventBus, InMemoryBus
+from .instrumentation import Instrumentation, Histogram
+from .async_bus import AsyncioBus
+from .keyed_state import KeyedStateStore
 from .node import Node
-from .validator import DataflowValidator, DataflowIssue
+from .tracing import SpanCollector, Span
+from .cache import LRUCache, CacheStats
+from .rules import RuleIndex
+from .validator import DataflowValidator, DataflowIssue, DataflowReport
+from .window import SlidingWindow, TumblingWindow, WindowEngine, WindowPredicate, WindowSpec, WindowStats
@@ -0,0 +1,206 @@
+from typing import Callable, Dict, List, Iterable, Optional
+import asyncio, inspect, threading
+from .message import CURRENT, Message
+from .topics import Topic
+from .queue import BoundedQueue, OverflowPolicy, QueueStats
+
+class _Mailbox:
+    """Per-node bounded inbox plus the event its consumer task sleeps on."""
+    __slots__ = ("node", "queue", "ready", "task")
+
+    def __init__(self, node: "Node", capacity: int, overflow: OverflowPolicy) -> None:
+        self.node = node
+        # The loop thread always drains mailboxes, so BLOCK producers may wait indefinitely.
+        self.queue = BoundedQueue(capacity, overflow, block_timeout=None)
+        self.ready: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+
+class AsyncioBus:
+    """
+    asyncio-native EventBus: each subscribed node owns a bounded mailbox and a
+    consumer task, so a slow handler (e.g. KB or Interface awaiting I/O) only
+    backs up its own mailbox while other nodes keep draining theirs.
+
+    - start()/stop() run the event loop on a dedicated thread (PCUSystem does
+      this for you); route() blocks the caller until the graph is quiescent.
+    - Handlers may be plain or `async def`; awaitable results are awaited.
+      Sync handlers still run on the loop thread, so long CPU-bound work
+      should be offloaded by the node itself.
+    - publish() is thread-safe. Producers outside the loop block while a
+      mailbox is full under OverflowPolicy.BLOCK; publishes from handlers on
+      the loop are admitted past capacity instead (they cannot wait on it).
+    - Per-node delivery order matches publish order.
+    - call_in_loop() runs other code that touches node state (PCUSystem uses
+      it for on_tick hooks) on the loop thread, between handlers.
+    - log (a pcu.storage.MessageLog) records every publish before delivery.
+    """
+    def __init__(self, mailbox_size: int = 1024,
+                 overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+                 log: Optional["MessageLog"] = None) -> None:
+        self.mailbox_size = mailbox_size
+        self.overflow = OverflowPolicy(overflow)
+        self.log = log
+        self._subs: Dict[Topic, List["Node"]] = {}
+        self._boxes: Dict["Node", _Mailbox] = {}
+        self._routes: Dict[Topic, List[_Mailbox]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._inflight = 0
+        self._errors: List[BaseException] = []
+
+    # ---- EventBus protocol ----
+    def publish(self, msg: Message) -> None:
+        if self.log is not None:
+            self.log.append(msg)
+        loop = self._loop
+        on_loop = self._thread is not None and self._thread.ident == threading.get_ident()
+        block = loop is not None and not on_loop
+        for box in self._routes.get(msg.topic, ()):
+            queue = box.queue
+            queue.put(msg, block=block)
+            # Only a consumer that may have gone to sleep needs a wake-up.
+            if loop is not None and len(queue) <= 1:
+                if on_loop:
+                    box.ready.set()  # type: ignore[union-attr]
+                else:
+                    loop.call_soon_threadsafe(box.ready.set)  # type: ignore[union-attr]
+
+    def subscribe(self, node: "Node", topics: Iterable[Topic]) -> None:
+        box = self._boxes.get(node)
+        if box is None:
+            box = self._boxes[node] = _Mailbox(node, self.mailbox_size, self.overflow)
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._spawn, box)
+        for t in topics:
+            nodes = self._subs.setdefault(t, [])
+            if node not in nodes:
+                nodes.append(node)
+                self._routes.setdefault(t, []).append(box)
+
+    def route(self) -> None:
+        """Block until every mailbox is empty and no handler is running."""
+        if self._loop is None:
+            raise RuntimeError("AsyncioBus is not running; call start() first")
+        if self._thread is not None and self._thread.ident == threading.get_ident():
+            raise RuntimeError("route() cannot be called from the bus event loop; await drain()")
+        asyncio.run_coroutine_threadsafe(self.drain(), self._loop).result()
+        if self._errors:
+            err, self._errors = self._errors[0], []
+            raise err
+
+    def call_in_loop(self, callback: Callable[[], None]) -> None:
+        """
+        Run callback on the loop thread and wait for it, so it never races a
+        handler; its exceptions propagate to the caller. Runs inline when the
+        bus is stopped or the caller is already on the loop.
+        """
+        loop = self._loop
+        if loop is None or (self._thread is not None and self._thread.ident == threading.get_ident()):
+            callback()
+            return
+        asyncio.run_coroutine_threadsafe(self._call(callback), loop).result()
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        if self._loop is not None:
+            return
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            self._idle = asyncio.Event()
+            for box in self._boxes.values():
+                self._spawn(box)
+            started.set()
+            loop.run_forever()
+
+        self._loop = loop
+        self._thread = threading.Thread(target=run, name="pcu-asyncio-bus", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self) -> None:
+        """Drain outstanding work, cancel consumers and shut the loop down."""
+        loop, thread = self._loop, self._thread
+        if loop is None or thread is None:
+            return
+        try:
+            self.route()
+        finally:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+            self._loop = self._thread = self._idle = None
+
+    async def drain(self) -> None:
+        """Await quiescence from inside the loop (the async form of route())."""
+        idle = self._idle
+        while self._inflight or any(box.queue for box in self._boxes.values()):
+            idle.clear()  # type: ignore[union-attr]
+            await idle.wait()  # type: ignore[union-attr]
+
+    # ---- internals (loop thread only) ----
+    async def _call(self, callback: Callable[[], None]) -> None:
+        callback()
+
+    def _spawn(self, box: _Mailbox) -> None:
+        box.ready = asyncio.Event()
+        if box.queue:
+            box.ready.set()
+        box.task = asyncio.get_event_loop().create_task(self._consume(box))
+
+    async def _consume(self, box: _Mailbox) -> None:
+        queue, ready, node, handling = box.queue, box.ready, box.node, CURRENT.set
+        while True:
+            if not queue:
+                ready.clear()  # type: ignore[union-attr]
+                self._idle.set()  # type: ignore[union-attr]
+                await ready.wait()  # type: ignore[union-attr]
+                continue
+            msg = queue.get()
+            self._inflight += 1
+            handling(msg)  # each consumer task runs in its own context
+            try:
+                result = node.on_message(msg)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:  # surfaced to the next route() caller
+                self._errors.append(e)
+            finally:
+                self._inflight -= 1
+
+    async def _shutdown(self) -> None:
+        tasks = [box.task for box in self._boxes.values() if box.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for box in self._boxes.values():
+            box.task = box.ready = None
+
+    # ---- introspection ----
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(box.queue) for box in self._boxes.values())
+
+    def mailbox_stats(self) -> Dict[str, QueueStats]:
+        return {box.node.name: box.queue.stats() for box in self._boxes.values()}
+
+    def stats(self) -> QueueStats:
+        """Mailbox stats summed across nodes (high_watermark is the worst mailbox)."""
+        per_node = [box.queue.stats() for box in self._boxes.values()]
+        return QueueStats(
+            depth=sum(s.depth for s in per_node),
+            capacity=self.mailbox_size,
+            high_watermark=max((s.high_watermark for s in per_node), default=0),
+            enqueued=sum(s.enqueued for s in per_node),
+            dequeued=sum(s.dequeued for s in per_node),
+            dropped_oldest=sum(s.dropped_oldest for s in per_node),
+            dropped_newest=sum(s.dropped_newest for s in per_node),
+        )
+
+    @property
+    def subscriptions(self) -> Dict[Topic, List["Node"]]:
+        return self._subs
@@ -1,6 +1,11 @@
-from typing import Dict, List, Iterable, Protocol
-from .message import Message
+from dataclasses import asdict
+from typing import Callable, Dict, List, Iterable, Mapping, Optional, Protocol
+import threading
+from .message import CURRENT, Message
 from .topics import Topic
+from .queue import BoundedQueue, DEFAULT_BLOCK_TIMEOUT, OverflowPolicy, PriorityQueue, QueueStats
+from .instrumentation import Instrumentation, METRICS_KIND
+from .shedding import SheddingPolicy
 
 class EventBus(Protocol):
     def publish(self, msg: Message) -> None: ...
@@ -11,24 +16,237 @@ class InMemoryBus:
     """
     Minimal pub/sub for local dev and unit tests.
     Swap with Kafka/NATS in production using same interface.
+
+    capacity/overflow bound the pending queue (see OverflowPolicy); the
+    default is unbounded, matching the original behaviour. A BLOCK publish
+    from outside route() gives up after block_timeout seconds (None: waits
+    for another thread's route() forever).
+
+    batch_size switches route() to batched delivery: up to batch_size queued
+    messages are drained, grouped by topic (first-seen order, FIFO within a
+    topic) and handed to each subscriber's on_batch. Ordering across topics
+    inside one batch is therefore not preserved.
+
+    log (a pcu.storage.MessageLog) makes publish write-ahead: every message
+    is appended to the durable log before it is queued.
+
+    instrumentation (an Instrumentation) times handlers and queueing inside
+    route() and publishes periodic snapshots on Topic.AUDIT; without it the
+    router takes the untimed path.
+
+    priorities (topic -> level, e.g. queue.TOPIC_PRIORITY) replaces the
+    FIFO queue with a PriorityQueue: one lane per level, FIFO within a lane,
+    Message.priority overriding the topic's level, and starvation_limit
+    bounding how long lower lanes can be passed over.
+
+    shedding (a SheddingPolicy) lets the router degrade instead of falling
+    behind: each dequeued message on a topic with a shedding rule is checked
+    against its deadline (Message.ts age) and the queue depth, and stale
+    ones are collapsed, sampled down or dropped rather than delivered.
+    Counters are in shedding.stats() and in instrumentation snapshots.
+
+    fuse() (see PCUSystem.compile) turns a topic into a direct call: a
+    message on it published from inside route() is handed straight to its
+    one subscriber, depth-first, without being queued. Publishes from
+    outside route() still go through the queue. Subscribing another node to
+    a fused topic un-fuses it, so the new subscriber is not bypassed.
+
+    defer(callback), called from a handler, runs callback once the queue is
+    empty, before route() returns; whatever it publishes is routed in the
+    same pass. Nodes use it to answer everything of one pass together.
     """
-    def __init__(self) -> None:
+    def __init__(self, capacity: Optional[int] = None,
+                 overflow: OverflowPolicy = OverflowPolicy.RAISE,
+                 block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT,
+                 batch_size: Optional[int] = None,
+                 log: Optional["MessageLog"] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 priorities: Optional[Mapping[Topic, int]] = None,
+                 starvation_limit: int = 32,
+                 shedding: Optional[SheddingPolicy] = None) -> None:
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer or None")
         self._subs: Dict[Topic, List["Node"]] = {}
-        self._queue: List[Message] = []
+        if priorities is None:
+            self._queue = BoundedQueue(capacity, overflow, block_timeout)
+        else:
+            self._queue = PriorityQueue(capacity, overflow, block_timeout, priorities,
+                                        starvation_limit=starvation_limit)
+        self._router: Optional[int] = None  # thread id currently inside route()
+        self.batch_size = batch_size
+        self.log = log
+        self.instrumentation = instrumentation
+        self.shedding = shedding
+        self._fused: Dict[Topic, "Node"] = {}
+        self._deferred: List[Callable[[], None]] = []
 
     def publish(self, msg: Message) -> None:
-        self._queue.append(msg)
+        if self.log is not None:
+            self.log.append(msg)
+        routing = self._router == threading.get_ident()
+        if routing and self._fused:
+            node = self._fused.get(msg.topic)
+            if node is not None:
+                token = CURRENT.set(msg)
+                try:
+                    node.on_message(msg)
+                finally:
+                    CURRENT.reset(token)
+                return
+        # Handlers publishing from inside route() must never block on themselves.
+        queued = self._queue.put(msg, block=not routing)
+        if queued and self.shedding is not None:
+            self.shedding.published(msg)
+
+    def defer(self, callback: Callable[[], None]) -> bool:
+        """Run callback at the end of the current route() pass; False (not queued) outside route()."""
+        if self._router != threading.get_ident():
+            return False
+        self._deferred.append(callback)
+        return True
+
+    def fuse(self, routes: Dict[Topic, "Node"]) -> None:
+        """Deliver these topics by direct call to the given node (replaces any earlier fusion; {} undoes it)."""
+        self._fused = dict(routes)
+
+    @property
+    def fused(self) -> Dict[Topic, "Node"]:
+        return self._fused
 
     def subscribe(self, node: "Node", topics: Iterable[Topic]) -> None:
+        """Idempotent: subscribing a node to a topic it already has is a no-op."""
         for t in topics:
-            self._subs.setdefault(t, []).append(node)
+            nodes = self._subs.setdefault(t, [])
+            if node not in nodes:
+                nodes.append(node)
+                if self._fused.get(t, node) is not node:
+                    # A fused topic has exactly one consumer; route it normally again.
+                    self._fused = {topic: n for topic, n in self._fused.items() if topic is not t}
 
     def route(self) -> None:
-        while self._queue:
-            msg = self._queue.pop(0)
-            for node in self._subs.get(msg.topic, []):
+        self._router = threading.get_ident()
+        # The loops below point CURRENT at each message while its handlers run;
+        # restore the caller's value however route() exits.
+        token = CURRENT.set(None)
+        try:
+            inst = self.instrumentation
+            self._drain(inst)
+            while self._deferred:
+                deferred, self._deferred = self._deferred, []
+                for callback in deferred:
+                    CURRENT.set(None)
+                    callback()
+                self._drain(inst)
+            if inst is not None and inst.snapshot_due():
+                CURRENT.set(None)
+                metrics = inst.snapshot(self.stats())
+                if self.shedding is not None:
+                    metrics["shed"] = asdict(self.shedding.stats())
+                self.publish(Message(Topic.AUDIT, {"kind": METRICS_KIND, "metrics": metrics},
+                                     provenance={"node": "bus"}))
+                self._drain(inst)
+        finally:
+            CURRENT.reset(token)
+            self._router = None
+
+    def _drain(self, inst: Optional[Instrumentation]) -> None:
+        if self.batch_size:
+            self._route_batched(self.batch_size, inst)
+        elif self.shedding is not None:
+            self._route_single_shedding(self.shedding, inst)
+        elif inst is None:
+            self._route_single()
+        else:
+            self._route_single_instrumented(inst)
+
+    def _route_single(self) -> None:
+        queue, subs, handling = self._queue, self._subs, CURRENT.set
+        while queue:
+            msg = queue.get()
+            handling(msg)
+            for node in subs.get(msg.topic, []):
                 node.on_message(msg)
 
+    def _route_single_instrumented(self, inst: Instrumentation) -> None:
+        queue, subs, clock, handling = self._queue, self._subs, inst.clock, CURRENT.set
+        while queue:
+            msg = queue.get()
+            handling(msg)
+            if not inst.should_sample(msg):
+                for node in subs.get(msg.topic, []):
+                    node.on_message(msg)
+                continue
+            t0 = clock()
+            inst.sample(msg, len(queue) + 1, t0)
+            for node in subs.get(msg.topic, []):
+                node.on_message(msg)
+                t1 = clock()
+                inst.handled(node.name, t1 - t0)
+                t0 = t1
+
+    def _route_single_shedding(self, shedding: SheddingPolicy, inst: Optional[Instrumentation]) -> None:
+        queue, subs, handling, admit = self._queue, self._subs, CURRENT.set, shedding.admit
+        while queue:
+            msg = queue.get()
+            if not admit(msg, len(queue)):
+                continue
+            handling(msg)
+            if inst is None or not inst.should_sample(msg):
+                for node in subs.get(msg.topic, []):
+                    node.on_message(msg)
+                continue
+            clock = inst.clock
+            t0 = clock()
+            inst.sample(msg, len(queue) + 1, t0)
+            for node in subs.get(msg.topic, []):
+                node.on_message(msg)
+                t1 = clock()
+                inst.handled(node.name, t1 - t0)
+                t0 = t1
+
+    def _route_batched(self, batch_size: int, inst: Optional[Instrumentation] = None) -> None:
+        queue, subs = self._queue, self._subs
+        admit = self.shedding.admit if self.shedding is not None else None
+        while queue:
+            groups: Dict[Topic, List[Message]] = {}
+            sampled = False
+            for _ in range(min(len(queue), batch_size)):
+                msg = queue.get()
+                if admit is not None and not admit(msg, len(queue)):
+                    continue
+                if inst is not None and inst.should_sample(msg):
+                    inst.sample(msg, len(queue) + 1, inst.clock())
+                    sampled = True
+                group = groups.get(msg.topic)
+                if group is None:
+                    groups[msg.topic] = [msg]
+                else:
+                    group.append(msg)
+            for topic, msgs in groups.items():
+                # A batch is attributed to its newest message: anything the
+                # handler publishes becomes that message's child.
+                CURRENT.set(msgs[-1])
+                if not sampled:
+                    for node in subs.get(topic, []):
+                        node.on_batch(msgs)
+                    continue
+                # Batches holding a sampled message time each on_batch call.
+                clock = inst.clock
+                t0 = clock()
+                for node in subs.get(topic, []):
+                    node.on_batch(msgs)
+                    t1 = clock()
+                    inst.handled(node.name, t1 - t0)
+                    t0 = t1
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> QueueStats:
+        """Queue depth, high watermark and drop counters."""
+        return self._queue.stats()
+
     # Introspection used by the validator
     @property
     def subscriptions(self) -> Dict[Topic, List["Node"]]:
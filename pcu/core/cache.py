@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional, Tuple
+import time
+
+@dataclass
+class CacheStats:
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class LRUCache:
+    """
+    Size-bounded LRU cache with an optional TTL (seconds) per entry.
+    Expired entries are dropped lazily when looked up.
+    """
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        data = self._data
+        entry = data.get(key)
+        if entry is not None:
+            if entry[1] >= self._clock():
+                data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del data[key]
+            self.expirations += 1
+        self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = float("inf") if self.ttl is None else self._clock() + self.ttl
+        data = self._data
+        data[key] = (value, expires)
+        data.move_to_end(key)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when key is None (e.g. after a KB update)."""
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(len(self._data), self.hits, self.misses, self.evictions, self.expirations)
+
+def freeze(obj: Any) -> Hashable:
+    """Canonical hashable form of a JSON-like query (dict key order ignored)."""
+    if isinstance(obj, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    if isinstance(obj, (set, frozenset)):
+        return frozenset(freeze(v) for v in obj)
+    hash(obj)  # surface unhashable leaves as TypeError
+    return obj
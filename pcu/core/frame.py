@@ -0,0 +1,130 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Union
+
+Column = Union[str, int, Iterable[Any], None]
+
+def _numeric(col: Any) -> Any:
+    """Keep array('d') / NumPy arrays as-is (no copy); pack anything else into array('d')."""
+    if hasattr(col, "dtype") or (isinstance(col, array) and col.typecode == "d"):
+        return col
+    return array("d", col)
+
+class SensorFrame:
+    """
+    Columnar batch of sensor samples, published as a single RAW_SENSORS message.
+    - ts, value: numeric columns, array('d') or NumPy arrays (passed through
+      untouched, so NumPy callers get zero-copy vector access downstream)
+    - user_id, stream_id, unit: either one value shared by every row (the
+      common case for a wearable burst) or a per-row column. Strings, bytes,
+      None and other non-iterables (e.g. a numeric user id) are shared; any
+      other iterable is a column, and one that is not a list, tuple, array or
+      NumPy array (a deque, range, generator, ...) is copied into a list
+    Handlers that only understand per-sample dicts can iterate rows().
+    """
+    __slots__ = ("user_id", "stream_id", "ts", "value", "unit")
+
+    LABELS = ("user_id", "stream_id", "unit")
+
+    def __init__(self, user_id: Column, stream_id: Column, ts: Iterable[float],
+                 value: Iterable[float], unit: Column = None) -> None:
+        self.ts = _numeric(ts)
+        self.value = _numeric(value)
+        self.user_id = user_id
+        self.stream_id = stream_id
+        self.unit = unit
+        n = len(self.ts)
+        if len(self.value) != n:
+            raise ValueError(f"value has {len(self.value)} rows, ts has {n}")
+        for name in self.LABELS:
+            col = getattr(self, name)
+            if self._is_scalar(col):
+                continue
+            if not isinstance(col, (list, tuple, array)) and not hasattr(col, "dtype"):
+                col = list(col)
+                setattr(self, name, col)
+            if len(col) != n:
+                raise ValueError(f"{name} has {len(col)} rows, ts has {n}")
+
+    @staticmethod
+    def _is_scalar(col: Any) -> bool:
+        if isinstance(col, (list, tuple, array)):
+            return False
+        if col is None or isinstance(col, (str, bytes)):
+            return True
+        ndim = getattr(col, "ndim", None)
+        if ndim is not None:
+            return ndim == 0  # NumPy arrays are columns, NumPy scalars are not
+        return not isinstance(col, Iterable)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def uniform(self, name: str) -> bool:
+        """True when the label column holds one value for every row."""
+        return self._is_scalar(getattr(self, name))
+
+    def label(self, name: str, i: int) -> Any:
+        col = getattr(self, name)
+        return col if self._is_scalar(col) else col[i]
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Per-sample dicts in the ingest_sensor_packet shape (allocates; avoid on hot paths)."""
+        ts, value = self.ts, self.value
+        for i in range(len(ts)):
+            yield {
+                "user_id": self.label("user_id", i),
+                "stream_id": self.label("stream_id", i),
+                "ts": float(ts[i]),
+                "value": float(value[i]),
+                "unit": self.label("unit", i),
+            }
+
+    def take(self, indices: Sequence[int]) -> "SensorFrame":
+        """New frame with the given rows, in order."""
+        def pick(col: Any) -> Any:
+            if self._is_scalar(col):
+                return col
+            if hasattr(col, "dtype"):
+                return col[list(indices)]
+            return [col[i] for i in indices]
+        ts = self.ts[list(indices)] if hasattr(self.ts, "dtype") else array("d", (self.ts[i] for i in indices))
+        value = self.value[list(indices)] if hasattr(self.value, "dtype") else array("d", (self.value[i] for i in indices))
+        return SensorFrame(pick(self.user_id), pick(self.stream_id), ts, value, pick(self.unit))
+
+    @classmethod
+    def from_packets(cls, packets: Iterable[Dict[str, Any]]) -> "SensorFrame":
+        """Build a frame from ingest_sensor_packet-style dicts; labels collapse to scalars when uniform."""
+        users: List[Any] = []
+        streams: List[Any] = []
+        units: List[Any] = []
+        ts = array("d")
+        value = array("d")
+        for p in packets:
+            users.append(p.get("user_id"))
+            streams.append(p.get("stream_id"))
+            units.append(p.get("unit"))
+            ts.append(p.get("ts", 0.0))
+            value.append(p["value"])
+
+        def collapse(col: List[Any]) -> Column:
+            first = col[0] if col else None
+            if all(v == first for v in col) and cls._is_scalar(first):
+                return first
+            return col
+        return cls(collapse(users), collapse(streams), ts, value, collapse(units))
+
+    def __repr__(self) -> str:
+        return (f"SensorFrame(rows={len(self)}, user_id={self._describe('user_id')}, "
+                f"stream_id={self._describe('stream_id')}, unit={self._describe('unit')})")
+
+    def _describe(self, name: str) -> str:
+        col = getattr(self, name)
+        return repr(col) if self._is_scalar(col) else f"<{len(col)} values>"
+
+def frame_payload(frame: SensorFrame) -> Dict[str, Any]:
+    """RAW_SENSORS payload for a frame; uniform user/stream labels are lifted for routing."""
+    payload: Dict[str, Any] = {"frame": frame}
+    for name in ("user_id", "stream_id"):
+        if frame.uniform(name):
+            payload[name] = getattr(frame, name)
+    return payload
@@ -0,0 +1,224 @@
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, List, Mapping, Optional, Set
+import math, time
+from .frame import SensorFrame
+
+AGGREGATES = ("mean", "min", "max", "first", "last")
+
+@dataclass(frozen=True)
+class StreamPolicy:
+    """
+    How one stream is thinned before it reaches the bus.
+    - coalesce: seconds; samples in the same aligned interval
+      ([k*coalesce, (k+1)*coalesce)) are merged into one packet carrying
+      their `aggregate` and "count", published once the interval is over
+    - min_interval: seconds; downsample by dropping samples that arrive less
+      than this long after the last one forwarded
+    Set at most one of the two; neither forwards every (non-duplicate) sample.
+    """
+    coalesce: Optional[float] = None
+    aggregate: str = "mean"
+    min_interval: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.coalesce is not None and self.min_interval is not None:
+            raise ValueError("set coalesce or min_interval, not both")
+        if self.aggregate not in AGGREGATES:
+            raise ValueError(f"aggregate must be one of {AGGREGATES}")
+        for name in ("coalesce", "min_interval"):
+            v = getattr(self, name)
+            if v is not None and v <= 0:
+                raise ValueError(f"{name} must be positive")
+
+@dataclass
+class ReductionStats:
+    received: int     # samples offered
+    forwarded: int    # samples passed through unchanged
+    aggregates: int   # coalesced packets emitted
+    duplicates: int   # dropped as exact (user_id, stream_id, ts) repeats
+    downsampled: int  # dropped by min_interval
+    coalesced: int    # merged into an emitted aggregate (count - 1 per aggregate)
+    pending: int      # samples held in aggregates that are still open
+
+    @property
+    def published(self) -> int:
+        return self.forwarded + self.aggregates
+
+    @property
+    def removed(self) -> int:
+        return self.received - self.published - self.pending
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of received samples that never became a bus message."""
+        return self.removed / self.received if self.received else 0.0
+
+class _Series:
+    """Dedup memory, downsampling clock and open aggregate of one (user_id, stream_id)."""
+    __slots__ = ("seen", "order", "last_forwarded", "bucket", "count", "value", "first_ts", "last_ts", "unit")
+
+    def __init__(self) -> None:
+        self.seen: Set[float] = set()
+        self.order: Deque[float] = deque()
+        self.last_forwarded = -math.inf
+        self.bucket: Optional[int] = None
+        self.count = 0
+        self.value = 0.0
+        self.first_ts = self.last_ts = 0.0
+        self.unit: Any = None
+
+class IngestReducer:
+    """
+    Pre-bus stage for IngestionNode. Per (user_id, stream_id) it
+    1) drops exact duplicates: a ts already seen among the series' last
+       dedup_window timestamps (retransmissions); samples without ts are kept
+    2) applies the stream's StreamPolicy from policies (else default):
+       coalescing into per-interval aggregates, or downsampling
+    admit()/admit_frame() say what to forward now; aggregates closed by a
+    later sample are collected and handed out by drain(), close_idle()
+    closes those of series that went quiet (by `clock`), and flush() closes
+    all open ones. max_keys bounds the number of series (LRU; an evicted
+    series' open aggregate is emitted, its dedup memory forgotten).
+    """
+    def __init__(self, policies: Optional[Mapping[str, StreamPolicy]] = None,
+                 default: Optional[StreamPolicy] = None, dedup: bool = True,
+                 dedup_window: int = 64, max_keys: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.policies = dict(policies or {})
+        self.default = default or StreamPolicy()
+        self.dedup = dedup
+        self.dedup_window = dedup_window
+        self.max_keys = max_keys
+        self.clock = clock
+        self._series: "OrderedDict[Hashable, _Series]" = OrderedDict()
+        # Series with an open aggregate -> clock() of their last sample, least recent first.
+        self._open: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._ready: List[Dict[str, Any]] = []
+        self.received = self.forwarded = self.aggregates = 0
+        self.duplicates = self.downsampled = self.coalesced = 0
+
+    def stats(self) -> ReductionStats:
+        pending = sum(s.count for s in self._series.values())
+        return ReductionStats(self.received, self.forwarded, self.aggregates, self.duplicates,
+                              self.downsampled, self.coalesced, pending)
+
+    def admit(self, user_id: Any, stream_id: Any, ts: Optional[float], value: Any, unit: Any = None) -> bool:
+        """True if this sample should be published as-is."""
+        self.received += 1
+        key = (user_id, stream_id)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+            if self.max_keys is not None and len(self._series) > self.max_keys:
+                self._close(*self._series.popitem(last=False))
+        elif self.max_keys is not None:
+            self._series.move_to_end(key)
+
+        if ts is not None and self.dedup:
+            seen = series.seen
+            if ts in seen:
+                self.duplicates += 1
+                return False
+            seen.add(ts)
+            order = series.order
+            order.append(ts)
+            if len(order) > self.dedup_window:
+                seen.discard(order.popleft())
+
+        policy = self.policies.get(stream_id, self.default)
+        numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if ts is None or not numeric:
+            self.forwarded += 1
+            return True
+        if policy.coalesce is not None:
+            self._coalesce(key, series, policy, ts, value, unit)
+            return False
+        if policy.min_interval is not None:
+            if ts - series.last_forwarded < policy.min_interval:
+                self.downsampled += 1
+                return False
+            series.last_forwarded = ts
+        self.forwarded += 1
+        return True
+
+    def admit_packet(self, payload: Mapping[str, Any]) -> bool:
+        return self.admit(payload.get("user_id"), payload.get("stream_id"), payload.get("ts"),
+                          payload.get("value"), payload.get("unit"))
+
+    def admit_frame(self, frame: SensorFrame) -> Optional[SensorFrame]:
+        """The rows to publish as-is: frame itself when all pass, a subset, or None."""
+        ts, values, admit, label = frame.ts, frame.value, self.admit, frame.label
+        kept = [i for i in range(len(ts))
+                if admit(label("user_id", i), label("stream_id", i), float(ts[i]), float(values[i]), label("unit", i))]
+        if len(kept) == len(ts):
+            return frame
+        return frame.take(kept) if kept else None
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Aggregates closed since the last drain, in closing order (no allocation when there are none)."""
+        ready = self._ready
+        if ready:
+            self._ready = []
+        return ready
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Close every open aggregate and return everything ready."""
+        for key, series in self._series.items():
+            self._close(key, series)
+        return self.drain()
+
+    def close_idle(self, idle: float, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Close the aggregates of series with no sample for at least idle seconds; return everything ready."""
+        cutoff = (self.clock() if now is None else now) - idle
+        opened = self._open
+        while opened:
+            key, seen = next(iter(opened.items()))
+            if seen > cutoff:
+                break
+            series = self._series.get(key)
+            if series is None or not series.count:
+                del opened[key]
+            else:
+                self._close(key, series)
+        return self.drain()
+
+    def _coalesce(self, key: Any, series: _Series, policy: StreamPolicy, ts: float, value: float, unit: Any) -> None:
+        bucket = math.floor(ts / policy.coalesce)
+        if series.count and bucket > series.bucket:
+            self._close(key, series)
+        if not series.count:
+            series.bucket = bucket
+            series.count = 1
+            series.value = value
+            series.first_ts = series.last_ts = ts
+            series.unit = unit
+            self._open[key] = self.clock()
+            return
+        # Late samples (an earlier bucket) are folded into the open aggregate.
+        agg = policy.aggregate
+        n = series.count = series.count + 1
+        if agg == "mean":
+            series.value += (value - series.value) / n
+        elif agg == "min":
+            series.value = min(series.value, value)
+        elif agg == "max":
+            series.value = max(series.value, value)
+        elif agg == "last":
+            series.value = value
+        series.last_ts = max(series.last_ts, ts)
+        opened = self._open
+        opened[key] = self.clock()
+        opened.move_to_end(key)
+
+    def _close(self, key: Any, series: _Series) -> None:
+        if not series.count:
+            return
+        self._open.pop(key, None)
+        user_id, stream_id = key
+        self._ready.append({"user_id": user_id, "stream_id": stream_id, "ts": series.last_ts,
+                            "value": series.value, "unit": series.unit, "count": series.count,
+                            "first_ts": series.first_ts})
+        self.aggregates += 1
+        self.coalesced += series.count - 1
+        series.count = 0
@@ -0,0 +1,149 @@
+from bisect import bisect_left
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import time
+from .message import Message
+from .topics import Topic
+
+# Bucket upper bounds, 1-2-5 steps. Latencies are in ns (1 us .. 10 s);
+# queue depths in messages. One extra overflow bucket catches anything larger.
+LATENCY_BUCKETS_NS = tuple(m * 10 ** e for e in range(3, 10) for m in (1, 2, 5)) + (10 ** 10,)
+DEPTH_BUCKETS = tuple(m * 10 ** e for e in range(0, 6) for m in (1, 2, 5))
+
+METRICS_KIND = "bus.metrics"  # AUDIT payload["kind"] of instrumentation snapshots
+
+class Histogram:
+    """
+    Fixed-bucket histogram: record() is one bisect and an increment, no
+    allocation. Percentiles resolve to the upper bound of the bucket holding
+    that rank (the overflow bucket reports the largest value seen).
+    """
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Sequence[int]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self, scale: float = 1.0) -> Dict[str, Any]:
+        """count, mean/p50/p99/max multiplied by scale (e.g. 1e-3 for ns -> us) and raw bucket counts."""
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean": mean * scale,
+            "p50": self.percentile(50) * scale,
+            "p99": self.percentile(99) * scale,
+            "max": self.max * scale,
+            "buckets": list(self.counts),
+        }
+
+class Instrumentation:
+    """
+    Router-side metrics for InMemoryBus(instrumentation=...):
+    - per-topic message counts (always exact)
+    - per-node handler latency and per-topic time spent queued (dequeue time
+      minus Message.ts, so only meaningful for monotonic_ns timestamps of this
+      process; negative waits are skipped, and PCUSystem.replay() suspends
+      instrumentation so replayed messages are not counted), in ns histograms
+    - queue depth when a sampled message is dequeued
+    Timings are taken for one in sample_every messages (counter based, so
+    unsampled messages pay one increment and one dict update).
+    Every snapshot_interval seconds the bus publishes snapshot() on
+    Topic.AUDIT with payload {"kind": METRICS_KIND, "metrics": ...};
+    None disables periodic publishing.
+    """
+    def __init__(self, sample_every: int = 16, snapshot_interval: Optional[float] = 10.0,
+                 clock: Callable[[], int] = time.monotonic_ns) -> None:
+        if sample_every <= 0:
+            raise ValueError("sample_every must be a positive integer")
+        self.sample_every = sample_every
+        self.snapshot_interval = snapshot_interval
+        self.clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        self.messages = 0
+        self.topic_counts: Dict[Topic, int] = {}
+        self.handler: Dict[str, Histogram] = {}
+        self.queued: Dict[Topic, Histogram] = {}
+        self.depth = Histogram(DEPTH_BUCKETS)
+        self._countdown = self.sample_every
+        self._last_snapshot = self.clock()
+
+    def sample(self, msg: Message, depth: int, now: int) -> None:
+        """Account a dequeued message that was picked for timing (see should_sample)."""
+        self.depth.record(depth)
+        waited = now - msg.ts
+        if 0 <= waited:
+            hist = self.queued.get(msg.topic)
+            if hist is None:
+                hist = self.queued[msg.topic] = Histogram(LATENCY_BUCKETS_NS)
+            hist.record(waited)
+
+    def should_sample(self, msg: Message) -> bool:
+        """Count msg; True when this one should also be timed."""
+        self.messages += 1
+        counts = self.topic_counts
+        counts[msg.topic] = counts.get(msg.topic, 0) + 1
+        self._countdown -= 1
+        if self._countdown:
+            return False
+        self._countdown = self.sample_every
+        return True
+
+    def handled(self, node_name: str, elapsed: int) -> None:
+        hist = self.handler.get(node_name)
+        if hist is None:
+            hist = self.handler[node_name] = Histogram(LATENCY_BUCKETS_NS)
+        hist.record(elapsed)
+
+    def snapshot_due(self) -> bool:
+        if self.snapshot_interval is None:
+            return False
+        now = self.clock()
+        if now - self._last_snapshot < self.snapshot_interval * 1e9:
+            return False
+        self._last_snapshot = now
+        return True
+
+    def snapshot(self, queue: Any = None) -> Dict[str, Any]:
+        """Plain-dict view of every metric; latencies in microseconds. queue: QueueStats to include."""
+        us = 1e-3
+        snap: Dict[str, Any] = {
+            "sample_every": self.sample_every,
+            "messages": self.messages,
+            "topics": {t.value: n for t, n in self.topic_counts.items()},
+            "handler_us": {name: h.summary(us) for name, h in self.handler.items()},
+            "queued_us": {t.value: h.summary(us) for t, h in self.queued.items()},
+            "depth": self.depth.summary(),
+            "latency_bounds_us": [b * us for b in LATENCY_BUCKETS_NS],
+            "depth_bounds": list(DEPTH_BUCKETS),
+        }
+        if queue is not None:
+            snap["queue"] = asdict(queue)
+        return snap
+
+    def slowest(self, n: int = 5, q: float = 99) -> List[Any]:
+        """(node, latency_us at percentile q) for the n slowest handlers."""
+        ranked = sorted(((h.percentile(q) / 1e3, name) for name, h in self.handler.items()), reverse=True)
+        return [(name, us) for us, name in ranked[:n]]
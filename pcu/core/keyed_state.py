@@ -0,0 +1,113 @@
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional
+import time
+
+class KeyedStateStore:
+    """
+    Per-key (typically per-user) numeric state held in array-backed slots.
+    - fields: field name -> default value. Each field is one array('d')
+      column; a key owns one slot index into every column, so 100k users cost
+      8 bytes per field per user rather than a dict per user.
+    - max_keys: LRU bound; creating a key past it evicts the least recently used.
+    - idle_ttl: seconds; keys untouched for longer are evicted. Expiry is checked
+      from the cold end of the LRU order, so each access pays O(evicted).
+    Views returned by get() address a slot, and slots are recycled after
+    eviction: use a view within one handler call, don't keep it around.
+    """
+    def __init__(self, fields: Mapping[str, float], max_keys: Optional[int] = None,
+                 idle_ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if not fields:
+            raise ValueError("KeyedStateStore needs at least one field")
+        if max_keys is not None and max_keys <= 0:
+            raise ValueError("max_keys must be a positive integer or None")
+        self.fields = dict(fields)
+        self.max_keys = max_keys
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._columns: Dict[str, array] = {name: array("d") for name in self.fields}
+        self._last_seen = array("d")
+        self._index: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._view = _make_view_class(self._columns)
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def get(self, key: Hashable) -> Any:
+        """View of key's slot, creating it with defaults on first use."""
+        now = self._clock()
+        slot = self._index.get(key)
+        if slot is None:
+            self._expire(now)
+            slot = self._allocate(key)
+        else:
+            self._index.move_to_end(key)
+        self._last_seen[slot] = now
+        return self._view(slot)
+
+    def peek(self, key: Hashable) -> Any:
+        """View of key's slot without creating it or refreshing its recency; None if absent."""
+        slot = self._index.get(key)
+        return None if slot is None else self._view(slot)
+
+    def evict(self, key: Hashable) -> bool:
+        slot = self._index.pop(key, None)
+        if slot is None:
+            return False
+        self._free.append(slot)
+        self.evictions += 1
+        return True
+
+    def sweep(self) -> int:
+        """Evict every idle key now; returns how many were removed."""
+        before = self.evictions
+        self._expire(self._clock())
+        return self.evictions - before
+
+    def _expire(self, now: float) -> None:
+        if self.idle_ttl is None:
+            return
+        cutoff = now - self.idle_ttl
+        index, last_seen = self._index, self._last_seen
+        while index:
+            key, slot = next(iter(index.items()))
+            if last_seen[slot] > cutoff:
+                break
+            self.evict(key)
+
+    def _allocate(self, key: Hashable) -> int:
+        if self.max_keys is not None and len(self._index) >= self.max_keys:
+            self.evict(next(iter(self._index)))
+        if self._free:
+            slot = self._free.pop()
+            for name, col in self._columns.items():
+                col[slot] = self.fields[name]
+        else:
+            slot = len(self._last_seen)
+            for name, col in self._columns.items():
+                col.append(self.fields[name])
+            self._last_seen.append(0.0)
+        self._index[key] = slot
+        return slot
+
+def _make_view_class(columns: Dict[str, array]) -> type:
+    """Build a slotted view type exposing each column as an attribute of one slot."""
+    def field(col: array) -> property:
+        def fget(self: Any) -> float:
+            return col[self._slot]
+        def fset(self: Any, value: float) -> None:
+            col[self._slot] = value
+        return property(fget, fset)
+
+    namespace: Dict[str, Any] = {name: field(col) for name, col in columns.items()}
+    namespace["__slots__"] = ("_slot",)
+    namespace["__init__"] = lambda self, slot: setattr(self, "_slot", slot)
+    namespace["__repr__"] = lambda self: "KeyedState(" + ", ".join(
+        f"{name}={getattr(self, name)!r}" for name in columns) + ")"
+    return type("KeyedState", (), namespace)
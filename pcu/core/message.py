@@ -1,19 +1,128 @@
-from dataclasses import dataclass, field
-from typing import Any, Dict
+from contextvars import ContextVar
+from dataclasses import FrozenInstanceError
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 import time, uuid
 from .topics import Topic
 
-@dataclass(frozen=True)
+# Shared read-only provenance for hops that never set one (no per-message dict).
+EMPTY_PROVENANCE: Mapping[str, Any] = MappingProxyType({})
+
+_monotonic_ns = time.monotonic_ns
+
+# Message whose handler is running in this context; set by the buses around
+# every delivery so messages published from a handler inherit its trace.
+CURRENT: "ContextVar[Optional[Message]]" = ContextVar("pcu_current_message", default=None)
+_current = CURRENT.get
+
 class Message:
     """
     Immutable envelope for all inter-node communication.
     - topic: routing channel
     - payload: domain data (dict for flexibility)
-    - ts, correlation_id: observability & tracing
+    - ts: int time.monotonic_ns() at creation; use for ages and latencies
+    - correlation_id: observability & tracing; generated lazily on first read
     - provenance: model versions, sources, policy matches
+    - trace_id / parent_id: causal lineage. A message created while a handler
+      runs (see CURRENT) inherits that message's trace_id and takes its
+      correlation_id as parent_id; any other message starts a trace of its
+      own (trace_id == correlation_id, parent_id None). The inherited ids are
+      resolved on first read: until then the message only references its
+      parent, so a handler's output costs no uuid unless something traces it.
+    - priority: optional routing level (0 = most urgent) overriding the
+      topic's default on buses with priority lanes (see PriorityQueue)
+    Slotted and allocation-light: a bare Message(topic=..., payload=...)
+    allocates no uuid and no provenance dict.
     """
+    __slots__ = ("topic", "payload", "ts", "_correlation_id", "provenance", "_trace_id", "_parent", "priority")
+
     topic: Topic
     payload: Dict[str, Any]
-    ts: float = field(default_factory=lambda: time.time())
-    correlation_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    provenance: Dict[str, Any] = field(default_factory=dict)
+    ts: int
+    provenance: Mapping[str, Any]
+    priority: Optional[int]
+
+    def __init__(self, topic: Topic, payload: Dict[str, Any], ts: Optional[int] = None,
+                 correlation_id: Optional[str] = None,
+                 provenance: Optional[Mapping[str, Any]] = None,
+                 trace_id: Optional[str] = None, parent_id: Optional[str] = None,
+                 priority: Optional[int] = None) -> None:
+        _set_topic(self, topic)
+        _set_payload(self, payload)
+        _set_ts(self, _monotonic_ns() if ts is None else ts)
+        _set_cid(self, correlation_id)
+        _set_provenance(self, EMPTY_PROVENANCE if provenance is None else provenance)
+        _set_trace(self, trace_id)
+        # Unresolved lineage: a reference to the message being handled (see _lineage).
+        _set_parent(self, _current() if trace_id is None and parent_id is None else parent_id)
+        _set_priority(self, priority)
+
+    @property
+    def correlation_id(self) -> str:
+        cid = self._correlation_id
+        if cid is None:
+            cid = str(uuid.uuid4())
+            _set_cid(self, cid)
+        return cid
+
+    @property
+    def trace_id(self) -> str:
+        tid = self._trace_id
+        if tid is None:
+            if self._parent.__class__ is Message:
+                return self._lineage()[0]
+            return self.correlation_id
+        return tid
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        parent = self._parent
+        if parent.__class__ is Message:
+            return self._lineage()[1]
+        return parent
+
+    def _lineage(self) -> Tuple[str, str]:
+        """Fix trace_id/parent_id from the parent reference and drop the reference."""
+        parent = self._parent
+        trace_id, parent_id = parent.trace_id, parent.correlation_id
+        _set_trace(self, trace_id)
+        _set_parent(self, parent_id)
+        return trace_id, parent_id
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.topic == other.topic and self.ts == other.ts  # type: ignore[attr-defined]
+                and self.correlation_id == other.correlation_id  # type: ignore[attr-defined]
+                and self.payload == other.payload  # type: ignore[attr-defined]
+                and self.provenance == other.provenance)  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return hash((self.topic, self.ts, self.correlation_id))
+
+    def __repr__(self) -> str:
+        return (f"Message(topic={self.topic!r}, payload={self.payload!r}, ts={self.ts!r}, "
+                f"correlation_id={self.correlation_id!r}, provenance={dict(self.provenance)!r}, "
+                f"trace_id={self.trace_id!r}, parent_id={self.parent_id!r}, priority={self.priority!r})")
+
+    def __reduce__(self):
+        provenance = None if self.provenance is EMPTY_PROVENANCE else self.provenance
+        # Fix the ids now so both sides of a process boundary agree on them.
+        return (Message, (self.topic, self.payload, self.ts, self.correlation_id, provenance,
+                          self.trace_id, self.parent_id, self.priority))
+
+# Slot descriptors bypass the frozen __setattr__ and are faster than object.__setattr__.
+_set_topic = Message.topic.__set__  # type: ignore[attr-defined]
+_set_payload = Message.payload.__set__  # type: ignore[attr-defined]
+_set_ts = Message.ts.__set__  # type: ignore[attr-defined]
+_set_cid = Message._correlation_id.__set__  # type: ignore[attr-defined]
+_set_provenance = Message.provenance.__set__  # type: ignore[attr-defined]
+_set_trace = Message._trace_id.__set__  # type: ignore[attr-defined]
+_set_parent = Message._parent.__set__  # type: ignore[attr-defined]
+_set_priority = Message.priority.__set__  # type: ignore[attr-defined]
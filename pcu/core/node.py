@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Any
+from typing import Dict, Hashable, List, Any, Optional
 from .topics import Topic, NodeRole
+from .message import Message
 from .bus import EventBus
+from .keyed_state import KeyedStateStore
 
 class Node(ABC):
     """
@@ -10,11 +12,19 @@ class Node(ABC):
       - outputs: topics it may publish on
       - on_message: handler for inbound messages
     Using ABC prevents accidental instantiation of incomplete nodes.
+
+    Nodes that track per-user numbers declare STATE_FIELDS (name -> default)
+    and read/write them through self.keyed_state(user_id).
     """
+    STATE_FIELDS: Dict[str, float] = {}
+    STATE_MAX_KEYS: Optional[int] = None
+    STATE_IDLE_TTL: Optional[float] = None
+
     def __init__(self, name: str, role: NodeRole, bus: EventBus) -> None:
         self.name = name
         self.role = role
         self.bus = bus
+        self._state_store: Optional[KeyedStateStore] = None
 
     @property
     @abstractmethod
@@ -36,9 +46,45 @@ class Node(ABC):
 
     @abstractmethod
     def on_message(self, msg) -> None:
-        """Main reactive entrypoint."""
+        """
+        Main reactive entrypoint. May be declared `async def` when the node
+        runs on an AsyncioBus; the consumer task awaits the result.
+        """
         ...
 
+    def on_batch(self, msgs: List[Message]) -> None:
+        """
+        Batched entrypoint used by InMemoryBus(batch_size=...): all queued
+        messages of one topic, in publish order. Override to amortize per-call
+        work; the list is shared across subscribers and must not be mutated.
+        Default falls back to on_message per message.
+        """
+        on_message = self.on_message
+        for msg in msgs:
+            on_message(msg)
+
+    def on_tick(self) -> None:
+        """
+        Called by PCUSystem.tick() before routing, for time-based work that
+        no message triggers (e.g. closing windows of users who went quiet).
+        Runs on the thread that runs handlers, so it may share state with
+        on_message without locks. Anything published here is routed in the
+        same tick.
+        """
+        pass
+
+    @property
+    def state_store(self) -> KeyedStateStore:
+        """Keyed state backend, created on first use from STATE_FIELDS."""
+        if self._state_store is None:
+            self._state_store = KeyedStateStore(
+                self.STATE_FIELDS, max_keys=self.STATE_MAX_KEYS, idle_ttl=self.STATE_IDLE_TTL)
+        return self._state_store
+
+    def keyed_state(self, key: Hashable) -> Any:
+        """Slot view for key (e.g. user_id); fields are attributes, e.g. .previous_glucose."""
+        return self.state_store.get(key)
+
     # Optional synchronous RPC-style hook
     def call(self, method: str, **kwargs: Any) -> Any:
         raise NotImplementedError(f"{self.name} has no RPC method '{method}'")
@@ -0,0 +1,274 @@
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum, IntEnum
+from typing import Deque, Dict, List, Mapping, Optional
+import threading, time
+from .message import Message
+from .topics import Topic
+
+class OverflowPolicy(str, Enum):
+    """What a bounded queue does when a publish arrives at capacity."""
+    BLOCK = "block"              # producer waits for the router to free a slot
+    DROP_OLDEST = "drop_oldest"  # evict the head to make room (freshest data wins)
+    DROP_NEWEST = "drop_newest"  # discard the incoming message
+    RAISE = "raise"              # raise QueueFullError to the producer
+
+class QueueFullError(RuntimeError):
+    """Raised when a bounded queue rejects a message."""
+
+# How long a BLOCK put waits for the router by default: a producer that is
+# itself the only thread able to drain the queue fails instead of hanging.
+DEFAULT_BLOCK_TIMEOUT = 10.0
+
+@dataclass
+class QueueStats:
+    """Point-in-time snapshot of queue health."""
+    depth: int
+    capacity: Optional[int]
+    high_watermark: int
+    enqueued: int
+    dequeued: int
+    dropped_oldest: int
+    dropped_newest: int
+
+    @property
+    def dropped(self) -> int:
+        return self.dropped_oldest + self.dropped_newest
+
+class BoundedQueue:
+    """
+    FIFO message queue with O(1) put/get, optional capacity and an overflow policy.
+    - capacity=None keeps the queue unbounded (overflow policy never applies).
+    - BLOCK waits up to block_timeout seconds (None = forever) before raising.
+      Callers that are themselves the consumer (e.g. handlers publishing during
+      route) must pass block=False, otherwise they would wait on themselves;
+      such puts are admitted past capacity rather than dropped.
+    put() checks capacity and enqueues under one lock, so concurrent
+    producers never overshoot capacity.
+    """
+    def __init__(self, capacity: Optional[int] = None,
+                 overflow: OverflowPolicy = OverflowPolicy.RAISE,
+                 block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT) -> None:
+        if capacity is not None and capacity <= 0:
+            raise ValueError("capacity must be a positive integer or None")
+        self.capacity = capacity
+        self.overflow = OverflowPolicy(overflow)
+        self.block_timeout = block_timeout
+        self._items: Deque[Message] = deque()
+        self._not_full = threading.Condition(threading.Lock())
+        self._high_watermark = 0
+        self._enqueued = 0
+        self._dequeued = 0
+        self._dropped_oldest = 0
+        self._dropped_newest = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def put(self, msg: Message, block: bool = True) -> bool:
+        """Enqueue msg; returns False if it was dropped by DROP_NEWEST."""
+        items = self._items
+        with self._not_full:
+            if self.capacity is not None and len(items) >= self.capacity:
+                policy = self.overflow
+                if policy is OverflowPolicy.DROP_OLDEST:
+                    items.popleft()
+                    self._dropped_oldest += 1
+                elif policy is OverflowPolicy.DROP_NEWEST:
+                    self._dropped_newest += 1
+                    return False
+                elif policy is OverflowPolicy.RAISE:
+                    raise QueueFullError(f"queue at capacity ({self.capacity})")
+                elif block:
+                    self._wait_for_space()
+            items.append(msg)
+            self._enqueued += 1
+            if len(items) > self._high_watermark:
+                self._high_watermark = len(items)
+        return True
+
+    def get(self) -> Message:
+        """Dequeue the oldest message; raises IndexError when empty."""
+        with self._not_full:
+            msg = self._items.popleft()
+            self._dequeued += 1
+            if self.overflow is OverflowPolicy.BLOCK:
+                self._not_full.notify()
+        return msg
+
+    def _wait_for_space(self) -> None:
+        """Wait (lock held) until a slot is free; raises QueueFullError after block_timeout."""
+        deadline = None if self.block_timeout is None else time.monotonic() + self.block_timeout
+        while len(self) >= self.capacity:  # type: ignore[operator]
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise QueueFullError(
+                    f"queue at capacity ({self.capacity}) for {self.block_timeout}s")
+            self._not_full.wait(remaining)
+
+    def stats(self) -> QueueStats:
+        return QueueStats(
+            depth=len(self),
+            capacity=self.capacity,
+            high_watermark=self._high_watermark,
+            enqueued=self._enqueued,
+            dequeued=self._dequeued,
+            dropped_oldest=self._dropped_oldest,
+            dropped_newest=self._dropped_newest,
+        )
+
+class Priority(IntEnum):
+    """Routing levels for PriorityQueue; lower is served first."""
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+# Default level per topic: the later a topic sits on the sensor -> nudge path,
+# the sooner it is routed, so work already in flight finishes before new
+# input is admitted; AUDIT yields to everything.
+TOPIC_PRIORITY: Dict[Topic, int] = {
+    Topic.ORCH_DECISION: Priority.CRITICAL,
+    Topic.GUIDANCE_OUT: Priority.CRITICAL,
+    Topic.CONTROL: Priority.CRITICAL,
+    Topic.GUIDANCE_PLAN: Priority.HIGH,
+    Topic.ORCH_PROPOSAL: Priority.HIGH,
+    Topic.CONTEXT: Priority.HIGH,
+    Topic.STATE: Priority.HIGH,
+    Topic.EVENTS: Priority.HIGH,
+    Topic.KB_QUERY: Priority.HIGH,
+    Topic.KB_RESULT: Priority.HIGH,
+    Topic.RAW_SENSORS: Priority.NORMAL,
+    Topic.FEEDBACK: Priority.NORMAL,
+    Topic.AUDIT: Priority.LOW,
+}
+
+class PriorityQueue(BoundedQueue):
+    """
+    BoundedQueue with one FIFO lane per priority level. A message's level is
+    Message.priority when set, else priorities[topic] (default: NORMAL),
+    clamped to the available lanes. get() serves the most urgent non-empty
+    lane, so order is kept within a level but not across levels.
+    - Starvation protection: after starvation_limit consecutive gets from
+      higher lanes while a lower one was waiting, the next get serves a
+      lower lane instead (round-robin over them), so every level keeps a
+      share of at least 1 / (starvation_limit + 1) of the throughput.
+    - capacity counts all lanes; DROP_OLDEST evicts the oldest message of
+      the least urgent non-empty lane, but never one more urgent than the
+      incoming message: if every queued message is, the incoming one is
+      dropped instead (counted in dropped_newest, put returns False).
+    """
+    def __init__(self, capacity: Optional[int] = None,
+                 overflow: OverflowPolicy = OverflowPolicy.RAISE,
+                 block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT,
+                 priorities: Optional[Mapping[Topic, int]] = None,
+                 levels: int = len(Priority), starvation_limit: int = 32) -> None:
+        if levels <= 0:
+            raise ValueError("levels must be a positive integer")
+        if starvation_limit <= 0:
+            raise ValueError("starvation_limit must be a positive integer")
+        super().__init__(capacity, overflow, block_timeout)
+        self.priorities = dict(TOPIC_PRIORITY if priorities is None else priorities)
+        self.levels = levels
+        self._topic_level = {t: self._clamp(level) for t, level in self.priorities.items()}
+        self.starvation_limit = starvation_limit
+        self._lanes: List[Deque[Message]] = [deque() for _ in range(levels)]
+        self._size = 0
+        self._streak = 0   # consecutive gets that passed over a waiting lower lane
+        self._rotor = 0    # next lower lane to consider when rescuing
+        self._default = min(int(Priority.NORMAL), levels - 1)
+        self.served = [0] * levels
+        self.rescued = 0   # gets served by starvation protection
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def _clamp(self, level: int) -> int:
+        return 0 if level < 0 else min(level, self.levels - 1)
+
+    def level(self, msg: Message) -> int:
+        level = msg.priority
+        if level is None:
+            return self._topic_level.get(msg.topic, self._default)
+        return self._clamp(level)
+
+    def put(self, msg: Message, block: bool = True) -> bool:
+        """Enqueue msg in its lane; returns False if msg itself was dropped on overflow."""
+        level = msg.priority
+        if level is None:
+            level = self._topic_level.get(msg.topic, self._default)
+        elif not 0 <= level < self.levels:
+            level = self._clamp(level)
+        with self._not_full:
+            size = self._size
+            if self.capacity is not None and size >= self.capacity:
+                policy = self.overflow
+                if policy is OverflowPolicy.DROP_OLDEST:
+                    lanes = self._lanes
+                    for i in range(self.levels - 1, level - 1, -1):
+                        if lanes[i]:
+                            lanes[i].popleft()
+                            break
+                    else:
+                        self._dropped_newest += 1
+                        return False
+                    size -= 1
+                    self._dropped_oldest += 1
+                elif policy is OverflowPolicy.DROP_NEWEST:
+                    self._dropped_newest += 1
+                    return False
+                elif policy is OverflowPolicy.RAISE:
+                    raise QueueFullError(f"queue at capacity ({self.capacity})")
+                elif block:
+                    self._wait_for_space()
+                    size = self._size
+            self._lanes[level].append(msg)
+            self._size = size = size + 1
+            self._enqueued += 1
+            if size > self._high_watermark:
+                self._high_watermark = size
+        return True
+
+    def get(self) -> Message:
+        """Dequeue from the most urgent lane (or a starved lower one); raises IndexError when empty."""
+        with self._not_full:
+            size = self._size
+            if not size:
+                raise IndexError("get from an empty PriorityQueue")
+            for top, lane in enumerate(self._lanes):
+                if lane:
+                    break
+            level = top
+            if size > len(lane):  # something is waiting in a lower lane
+                streak = self._streak + 1
+                if streak > self.starvation_limit:
+                    level = self._rescue(top)
+                    lane = self._lanes[level]
+                    streak = 0
+                self._streak = streak
+            else:
+                self._streak = 0
+            msg = lane.popleft()
+            self._size = size - 1
+            self._dequeued += 1
+            self.served[level] += 1
+            if self.overflow is OverflowPolicy.BLOCK:
+                self._not_full.notify()
+        return msg
+
+    def _rescue(self, top: int) -> int:
+        """Next non-empty lane below top, round-robin."""
+        lanes, below = self._lanes, self.levels - top - 1
+        for step in range(below):
+            level = top + 1 + (self._rotor + step) % below
+            if lanes[level]:
+                self._rotor = (level - top) % below
+                self.rescued += 1
+                return level
+        return top
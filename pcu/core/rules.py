@@ -0,0 +1,59 @@
+from collections import deque
+from typing import Dict, Iterable, List
+
+class RuleIndex:
+    """
+    Multi-pattern substring matcher (Aho-Corasick) compiled once from rule
+    trigger patterns. match(text) scans the text a single time and returns
+    the ids (positions in the input order, i.e. priority order) of every
+    rule whose pattern occurs in it, independent of how many rules exist.
+    """
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = list(patterns)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for rule_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError(f"rule {rule_id} has an empty pattern")
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = goto[state][ch] = len(goto)
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(rule_id)
+
+        # Breadth-first failure links; each state's outputs include those of its
+        # failure state so match() never has to walk the failure chain for output.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def match(self, text: str) -> List[int]:
+        """Ids of all rules whose pattern occurs in text, ascending (priority order)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return sorted(found)
@@ -0,0 +1,169 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Dict, Hashable, Mapping, Optional
+import time
+from .message import Message
+from .topics import Topic
+
+class ShedAction(str, Enum):
+    """What the router does with a message once it is stale or the queue is overloaded."""
+    COLLAPSE = "collapse"  # keep only the newest queued message per (user_id, stream_id)
+    SAMPLE = "sample"      # deliver one in sample_every
+    DROP = "drop"          # deliver none
+
+@dataclass(frozen=True)
+class ShedRule:
+    """
+    Per-topic shedding rule. A message is stale once its age (dequeue time
+    minus Message.ts, monotonic ns) exceeds deadline seconds; stale messages,
+    and every message while the queue is over max_depth, get `action`.
+    """
+    deadline: float
+    action: ShedAction = ShedAction.DROP
+    sample_every: int = 10
+
+    def __post_init__(self) -> None:
+        if self.deadline < 0:
+            raise ValueError("deadline must be non-negative")
+        if self.sample_every <= 0:
+            raise ValueError("sample_every must be a positive integer")
+
+# Topics the router may never shed, whatever the configuration.
+NEVER_SHED = frozenset({Topic.ORCH_DECISION, Topic.GUIDANCE_OUT, Topic.CONTROL})
+
+DEFAULT_SHED_RULES: Dict[Topic, ShedRule] = {
+    Topic.RAW_SENSORS: ShedRule(5.0, ShedAction.COLLAPSE),
+    Topic.FEEDBACK: ShedRule(30.0, ShedAction.SAMPLE, sample_every=10),
+    Topic.AUDIT: ShedRule(10.0, ShedAction.SAMPLE, sample_every=10),
+}
+
+@dataclass
+class ShedStats:
+    """Router-side shedding counters."""
+    checked: int      # dequeued messages on a topic with a rule
+    stale: int        # of those, past their deadline
+    overloaded: int   # of those, dequeued while the queue was over max_depth
+    collapsed: int    # dropped because a newer sample of the same stream was queued
+    sampled_out: int  # dropped by SAMPLE
+    dropped: int      # dropped by DROP
+    by_topic: Dict[str, int] = field(default_factory=dict)  # topic value -> messages shed
+
+    @property
+    def shed(self) -> int:
+        return self.collapsed + self.sampled_out + self.dropped
+
+def _stream_key(msg: Message) -> Optional[Hashable]:
+    payload = msg.payload
+    if not isinstance(payload, Mapping):
+        return None
+    user_id, stream_id = payload.get("user_id"), payload.get("stream_id")
+    if user_id is None or stream_id is None:
+        return None  # e.g. a frame mixing streams: cannot tell which sample is newest
+    return (user_id, stream_id)
+
+class SheddingPolicy:
+    """
+    Deadline-aware load shedding for InMemoryBus(shedding=...). The router
+    calls admit() on every dequeued message; False means it is shed instead
+    of delivered. Only topics with a rule are ever shed, and NEVER_SHED topics
+    cannot be given one. A message is shed-eligible when it is past its
+    rule's deadline or when the queue still holds max_depth messages behind it
+    (None: age only). Eligible messages then get their rule's action:
+    - COLLAPSE: dropped if a newer message of the same (user_id, stream_id)
+      is already queued, so a backlog of stale samples is reduced to the
+      latest value per stream (the bus reports publishes via published());
+      messages without both labels are kept. The newest message per stream
+      is remembered only while it may still be queued: the entry goes once
+      that message is dequeued, when the queue runs empty (the message was
+      evicted on overflow) or, past max_streams streams, least recently
+      published first. A forgotten stream's messages are simply kept.
+    - SAMPLE: one in sample_every (per topic) is delivered
+    - DROP: nothing is delivered
+    Ages use Message.ts, so only monotonic_ns timestamps are meaningful;
+    replayed messages bypass shedding (see PCUSystem.replay).
+    """
+    def __init__(self, rules: Optional[Mapping[Topic, ShedRule]] = None,
+                 max_depth: Optional[int] = 10_000,
+                 clock: Callable[[], int] = time.monotonic_ns,
+                 max_streams: int = 100_000) -> None:
+        rules = DEFAULT_SHED_RULES if rules is None else rules
+        protected = sorted(t.value for t in rules if t in NEVER_SHED)
+        if protected:
+            raise ValueError(f"topics {protected} must never be shed")
+        if max_depth is not None and max_depth <= 0:
+            raise ValueError("max_depth must be a positive integer or None")
+        if max_streams <= 0:
+            raise ValueError("max_streams must be a positive integer")
+        self.rules = dict(rules)
+        self.max_depth = max_depth
+        self.clock = clock
+        self.max_streams = max_streams
+        self._deadline_ns = {t: int(r.deadline * 1e9) for t, r in self.rules.items()}
+        self._collapse = frozenset(t for t, r in self.rules.items() if r.action is ShedAction.COLLAPSE)
+        self._latest: "OrderedDict[Hashable, Message]" = OrderedDict()  # stream -> newest queued message
+        self._countdown = {t: r.sample_every for t, r in self.rules.items() if r.action is ShedAction.SAMPLE}
+        self.reset()
+
+    def reset(self) -> None:
+        self.checked = self.stale = self.overloaded = 0
+        self.collapsed = self.sampled_out = self.dropped = 0
+        self.by_topic: Dict[Topic, int] = {}
+
+    def stats(self) -> ShedStats:
+        return ShedStats(self.checked, self.stale, self.overloaded, self.collapsed,
+                         self.sampled_out, self.dropped, {t.value: n for t, n in self.by_topic.items()})
+
+    def published(self, msg: Message) -> None:
+        """Remember msg as its stream's newest queued message (COLLAPSE topics only)."""
+        if msg.topic in self._collapse:
+            key = _stream_key(msg)
+            if key is not None:
+                latest = self._latest
+                latest[key] = msg
+                latest.move_to_end(key)
+                if len(latest) > self.max_streams:
+                    latest.popitem(last=False)
+
+    def admit(self, msg: Message, depth: int) -> bool:
+        """True to deliver msg; depth is the number of messages still queued behind it."""
+        topic = msg.topic
+        deadline = self._deadline_ns.get(topic)
+        if deadline is None:
+            return True
+        newest = True
+        if topic in self._collapse:
+            key = _stream_key(msg)
+            if key is not None:
+                latest = self._latest.get(key)
+                if latest is msg:
+                    del self._latest[key]
+                else:
+                    newest = latest is None
+            if not depth and self._latest:
+                # Nothing is queued any more: what is left was evicted on overflow.
+                self._latest.clear()
+        self.checked += 1
+        if self.max_depth is not None and depth >= self.max_depth:
+            self.overloaded += 1
+        elif self.clock() - msg.ts > deadline:
+            self.stale += 1
+        else:
+            return True
+
+        rule = self.rules[topic]
+        if rule.action is ShedAction.COLLAPSE:
+            if newest:
+                return True
+            self.collapsed += 1
+        elif rule.action is ShedAction.SAMPLE:
+            left = self._countdown[topic] - 1
+            if not left:
+                self._countdown[topic] = rule.sample_every
+                return True
+            self._countdown[topic] = left
+            self.sampled_out += 1
+        else:
+            self.dropped += 1
+        self.by_topic[topic] = self.by_topic.get(topic, 0) + 1
+        return False
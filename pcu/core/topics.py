@@ -29,3 +29,4 @@ class NodeRole(Enum):
     AGENT = auto()
     SAFETY = auto()
     OBSERVABILITY = auto()
+    STORAGE = auto()
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Union
+import inspect, time
+from .instrumentation import Histogram, LATENCY_BUCKETS_NS
+from .message import Message
+from .node import Node
+
+class Span:
+    """One delivery: message span_id (its correlation_id) handled by node from start to end (monotonic ns)."""
+    __slots__ = ("trace_id", "span_id", "parent_id", "topic", "node", "published", "start", "end")
+
+    def __init__(self, msg: Message, node: str, start: int, end: int) -> None:
+        self.trace_id = msg.trace_id
+        self.span_id = msg.correlation_id
+        self.parent_id = msg.parent_id
+        self.topic = msg.topic
+        self.node = node
+        self.published = msg.ts
+        self.start = start
+        self.end = end
+
+    @property
+    def queued(self) -> int:
+        return self.start - self.published
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return (f"Span({self.topic.value} -> {self.node}, queued={self.queued / 1e3:.1f}us, "
+                f"handler={self.duration / 1e3:.1f}us)")
+
+class SpanCollector:
+    """
+    In-process trace store. attach() wraps node handlers so that every
+    delivery is recorded as a Span, with no logging in the handlers themselves.
+    Messages carry trace_id/parent_id (see Message), so the spans of one
+    trace form the causal tree that started at a sensor packet.
+    - path() walks back from a node (default "interface") to the root
+      message, choosing each message's producer as the parent delivery whose
+      handler was running when it was published (exact on InMemoryBus).
+    - hops()/end_to_end() turn that path into per-hop latencies.
+    Keeps the newest max_traces traces.
+    """
+    def __init__(self, max_traces: int = 10_000, clock: Callable[[], int] = time.monotonic_ns) -> None:
+        self.max_traces = max_traces
+        self.clock = clock
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+
+    # ---- capture ----
+    def attach(self, nodes: Union[Mapping[str, Node], Iterable[Node]]) -> None:
+        """
+        Instrument nodes (e.g. PCUSystem.nodes). Call after any instance-level
+        on_message overrides are in place, since those replace the wrapper.
+        """
+        for node in (nodes.values() if isinstance(nodes, Mapping) else nodes):
+            node.on_message = self._wrap(node.name, node.on_message)  # type: ignore[assignment]
+            # Overridden on_batch implementations don't go through on_message.
+            if type(node).on_batch is not Node.on_batch:
+                node.on_batch = self._wrap_batch(node.name, node.on_batch)  # type: ignore[assignment]
+
+    def _wrap(self, name: str, handler: Callable[[Message], Any]) -> Callable[[Message], Any]:
+        clock, record = self.clock, self.record
+        if inspect.iscoroutinefunction(handler):
+            async def traced_async(msg: Message) -> Any:
+                start = clock()
+                try:
+                    return await handler(msg)
+                finally:
+                    record(Span(msg, name, start, clock()))
+            return traced_async
+
+        def traced(msg: Message) -> Any:
+            start = clock()
+            try:
+                return handler(msg)
+            finally:
+                record(Span(msg, name, start, clock()))
+        return traced
+
+    def _wrap_batch(self, name: str, handler: Callable[[List[Message]], None]) -> Callable[[List[Message]], None]:
+        clock, record = self.clock, self.record
+
+        def traced_batch(msgs: List[Message]) -> None:
+            start = clock()
+            try:
+                handler(msgs)
+            finally:
+                end = clock()
+                for msg in msgs:
+                    record(Span(msg, name, start, end))
+        return traced_batch
+
+    def record(self, span: Span) -> None:
+        traces = self._traces
+        spans = traces.get(span.trace_id)
+        if spans is None:
+            if len(traces) >= self.max_traces:
+                traces.popitem(last=False)
+            spans = traces[span.trace_id] = []
+        spans.append(span)
+
+    def clear(self) -> None:
+        self._traces.clear()
+
+    # ---- queries ----
+    def traces(self) -> List[str]:
+        return list(self._traces)
+
+    def spans(self, trace_id: str) -> List[Span]:
+        return sorted(self._traces.get(trace_id, ()), key=lambda s: s.start)
+
+    def path(self, trace_id: str, node: str = "interface") -> List[Span]:
+        """Causal chain root -> first delivery to node; [] if the trace never reached it."""
+        spans = self.spans(trace_id)
+        by_message: Dict[str, List[Span]] = {}
+        for s in spans:
+            by_message.setdefault(s.span_id, []).append(s)
+        target = next((s for s in spans if s.node == node), None)
+        if target is None:
+            return []
+        chain = [target]
+        cur = target
+        while cur.parent_id is not None:
+            producers = [s for s in by_message.get(cur.parent_id, ())
+                         if s.start <= cur.published <= s.end]
+            if not producers:
+                break  # parent delivery not captured (node not attached or evicted)
+            cur = max(producers, key=lambda s: s.start)
+            chain.append(cur)
+        chain.reverse()
+        return chain
+
+    def hops(self, trace_id: str, node: str = "interface") -> List[Dict[str, Any]]:
+        """Per hop of path(): topic, node, queued/handler time and time since the root publish (us)."""
+        chain = self.path(trace_id, node)
+        if not chain:
+            return []
+        root = chain[0].published
+        return [{
+            "topic": s.topic.value,
+            "node": s.node,
+            "queued_us": s.queued / 1e3,
+            "handler_us": s.duration / 1e3,
+            "since_root_us": (s.end - root) / 1e3,
+        } for s in chain]
+
+    def end_to_end(self, node: str = "interface") -> Dict[str, Any]:
+        """
+        Latency summaries (us) over every trace that reached node: "total"
+        (root publish -> node's handler done) and, per hop "<topic> -> <node>",
+        the time from publish to that handler finishing.
+        """
+        total = Histogram(LATENCY_BUCKETS_NS)
+        per_hop: Dict[str, Histogram] = {}
+        for trace_id in self._traces:
+            chain = self.path(trace_id, node)
+            if not chain:
+                continue
+            total.record(chain[-1].end - chain[0].published)
+            for s in chain:
+                key = f"{s.topic.value} -> {s.node}"
+                hist = per_hop.get(key)
+                if hist is None:
+                    hist = per_hop[key] = Histogram(LATENCY_BUCKETS_NS)
+                hist.record(s.end - s.published)
+        return {"total": total.summary(1e-3), "hops": {k: h.summary(1e-3) for k, h in per_hop.items()}}
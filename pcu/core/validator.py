@@ -1,70 +1,277 @@
-from dataclasses import dataclass
-from typing import Dict, List, Set, Tuple
+from dataclasses import dataclass, field
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
 from .node import Node
 from .topics import Topic
 from .bus import InMemoryBus
 
 @dataclass
 class DataflowIssue:
-    level: str   # "ERROR" or "WARN"
+    level: str   # "ERROR", "WARN" or "INFO"
     code: str    # e.g., "UNSUBSCRIBED_OUTPUT"
     detail: str  # human-readable description
 
+@dataclass
+class DataflowReport:
+    """
+    Result of DataflowValidator.analyze():
+    - issues: what validate() returns
+    - fanout: topic -> number of subscribers one message is delivered to
+    - cycles: strongly connected groups of nodes (feedback loops), each in schedule order
+    - order: every node, producers before consumers, with the edges that
+      close feedback loops (DFS back edges from the entry points) ignored
+    - unreachable: nodes no entry point can reach
+    """
+    issues: List[DataflowIssue] = field(default_factory=list)
+    fanout: Dict[Topic, int] = field(default_factory=dict)
+    cycles: List[List[str]] = field(default_factory=list)
+    order: List[str] = field(default_factory=list)
+    unreachable: List[str] = field(default_factory=list)
+
+class _Graph:
+    """Bipartite node/topic graph: declared outputs on one side, actual bus subscriptions on the other."""
+    def __init__(self, nodes: Dict[str, Node], subs: Dict[Topic, List[Node]]) -> None:
+        names = {id(n): name for name, n in nodes.items()}
+        self.names = list(nodes)
+        self.consumers: Dict[Topic, List[str]] = {
+            t: [names[id(n)] for n in ns if id(n) in names] for t, ns in subs.items()}
+        self.subscribed: Dict[str, Set[Topic]] = {name: set() for name in nodes}
+        for t, ns in self.consumers.items():
+            for name in ns:
+                self.subscribed[name].add(t)
+        self.outputs: Dict[str, List[Topic]] = {name: list(n.outputs) for name, n in nodes.items()}
+        self.producers: Dict[Topic, List[str]] = {}
+        for name, ts in self.outputs.items():
+            for t in ts:
+                self.producers.setdefault(t, []).append(name)
+        # Node -> downstream nodes, in first-seen order.
+        self.succ: Dict[str, List[str]] = {}
+        for name, ts in self.outputs.items():
+            seen: Dict[str, None] = {}
+            for t in ts:
+                for c in self.consumers.get(t, ()):
+                    seen[c] = None
+            self.succ[name] = list(seen)
+        # Entry points: nodes fed from outside the graph (no inputs), and
+        # subscribed topics nothing in the graph produces (e.g. CONTROL).
+        self.entry_topics = [t for t, ns in self.consumers.items() if ns and t not in self.producers]
+        self.entry_nodes = [name for name, n in nodes.items() if not n.inputs]
+
+    def depths(self) -> Dict[str, int]:
+        """BFS distance of each node from the entry points (absent = unreachable)."""
+        frontier = self.roots()
+        depth = dict.fromkeys(frontier, 0)
+        while frontier:
+            nxt = []
+            for name in frontier:
+                for c in self.succ[name]:
+                    if c not in depth:
+                        depth[c] = depth[name] + 1
+                        nxt.append(c)
+            frontier = nxt
+        return depth
+
+    def reaches(self, src: Topic, dst: Topic) -> bool:
+        """True if a message on src can (transitively) cause one on dst."""
+        seen: Set[str] = set()
+        stack = list(self.consumers.get(src, ()))
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            if dst in self.outputs[name]:
+                return True
+            stack.extend(self.succ[name])
+        return False
+
+    def roots(self) -> List[str]:
+        roots = dict.fromkeys(self.entry_nodes)
+        for t in self.entry_topics:
+            roots.update(dict.fromkeys(self.consumers[t]))
+        return list(roots)
+
+    def schedule(self, depth: Dict[str, int]) -> List[str]:
+        """
+        Topological order of the graph minus its back edges (found by DFS
+        from the entry points), ties broken by depth then declaration order.
+        """
+        back: Set[Tuple[str, str]] = set()
+        visited: Set[str] = set()
+        for root in self.roots() + self.names:
+            if root in visited:
+                continue
+            visited.add(root)
+            on_path = {root}
+            work: List[Tuple[str, int]] = [(root, 0)]
+            while work:
+                name, i = work[-1]
+                succ = self.succ[name]
+                if i == len(succ):
+                    work.pop()
+                    on_path.discard(name)
+                    continue
+                work[-1] = (name, i + 1)
+                c = succ[i]
+                if c in on_path:
+                    back.add((name, c))
+                elif c not in visited:
+                    visited.add(c)
+                    on_path.add(c)
+                    work.append((c, 0))
+
+        unreached = len(self.names)
+        key = {name: (depth.get(name, unreached), i) for i, name in enumerate(self.names)}
+        indegree = dict.fromkeys(self.names, 0)
+        for name, succ in self.succ.items():
+            for c in succ:
+                if (name, c) not in back:
+                    indegree[c] += 1
+        ready = [(key[n], n) for n, d in indegree.items() if not d]
+        heapq.heapify(ready)
+        order: List[str] = []
+        while ready:
+            _, name = heapq.heappop(ready)
+            order.append(name)
+            for c in self.succ[name]:
+                if (name, c) not in back:
+                    indegree[c] -= 1
+                    if not indegree[c]:
+                        heapq.heappush(ready, (key[c], c))
+        return order
+
+    def components(self) -> List[List[str]]:
+        """Tarjan's strongly connected components, in topological order (sources first)."""
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        out: List[List[str]] = []
+        for root in self.names:
+            if root in index:
+                continue
+            # Iterative DFS: (node, position in its successor list).
+            work: List[Tuple[str, int]] = [(root, 0)]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                name, i = work[-1]
+                succ = self.succ[name]
+                if i < len(succ):
+                    work[-1] = (name, i + 1)
+                    c = succ[i]
+                    if c not in index:
+                        index[c] = low[c] = len(index)
+                        stack.append(c)
+                        on_stack.add(c)
+                        work.append((c, 0))
+                    elif c in on_stack:
+                        low[name] = min(low[name], index[c])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[name])
+                if low[name] == index[name]:
+                    comp = []
+                    while True:
+                        c = stack.pop()
+                        on_stack.discard(c)
+                        comp.append(c)
+                        if c == name:
+                            break
+                    out.append(comp)
+        out.reverse()  # Tarjan emits sinks first
+        return out
+
 class DataflowValidator:
     """
-    Validates wiring and discoverability:
+    Validates wiring and discoverability over a node/topic graph built once
+    from declared outputs and the bus's subscriptions:
       1) Each node's declared inputs are actually subscribed.
       2) Each declared output has at least one subscriber (no dead-ends),
          except for permitted sink topics (e.g., AUDIT).
-      3) Basic reachability along the main spine.
+      3) Every node is reachable from an entry point, and each step of the
+         main spine can cause the next.
+      4) Feedback cycles (INFO) and topics whose fan-out exceeds max_fanout (WARN).
+    analyze() also returns per-topic fan-out and a schedule order.
     """
     SINK_TOPICS: Set[Topic] = {Topic.AUDIT}
+    # Main lineage: RAW_SENSORS -> EVENTS -> STATE -> CONTEXT -> GUIDANCE_PLAN
+    SPINE: Tuple[Topic, ...] = (
+        Topic.RAW_SENSORS, Topic.EVENTS, Topic.STATE, Topic.CONTEXT, Topic.GUIDANCE_PLAN
+    )
 
-    def __init__(self, nodes: Dict[str, Node], bus: InMemoryBus) -> None:
+    def __init__(self, nodes: Dict[str, Node], bus: InMemoryBus, max_fanout: Optional[int] = 16) -> None:
         self.nodes = nodes
         self.bus = bus
+        self.max_fanout = max_fanout
 
     def validate(self) -> List[DataflowIssue]:
-        issues: List[DataflowIssue] = []
+        return self.analyze().issues
+
+    def analyze(self) -> DataflowReport:
+        graph = _Graph(self.nodes, self.bus.subscriptions)
+        report = DataflowReport()
+        issues = report.issues
 
         # 1) Inputs are subscribed (the bus should know every input topic->node)
-        actual_subs = self.bus.subscriptions  # Topic -> [Node]
-        for node in self.nodes.values():
+        for name, node in self.nodes.items():
             for t in node.inputs:
-                if node not in actual_subs.get(t, []):
+                if t not in graph.subscribed[name]:
                     issues.append(DataflowIssue(
                         "ERROR", "MISSING_SUBSCRIPTION",
                         f"{node.name} declares input {t} but is not subscribed."
                     ))
 
-        # Create a reverse map: topic -> list of nodes that declare it in outputs
-        output_decls: Dict[Topic, List[str]] = {}
-        for node in self.nodes.values():
-            for t in node.outputs:
-                output_decls.setdefault(t, []).append(node.name)
-
         # 2) Outputs must have at least one subscriber unless it's a sink
-        for topic, producers in output_decls.items():
+        for topic, producers in graph.producers.items():
             if topic in self.SINK_TOPICS:
                 continue
-            subscribers = actual_subs.get(topic, [])
-            if not subscribers:
+            if not graph.consumers.get(topic):
                 issues.append(DataflowIssue(
                     "ERROR", "UNSUBSCRIBED_OUTPUT",
                     f"Topic {topic} produced by {producers} has no subscribers."
                 ))
 
-        # 3) Quick reachability check for main lineage (optional, conservative)
-        # Define a minimal expected path: RAW_SENSORS -> EVENTS -> STATE -> CONTEXT -> GUIDANCE_PLAN -> ORCH_DECISION/GUIDANCE_OUT
-        required_chain: List[Topic] = [
-            Topic.RAW_SENSORS, Topic.EVENTS, Topic.STATE, Topic.CONTEXT, Topic.GUIDANCE_PLAN
-        ]
-        for i in range(len(required_chain) - 1):
-            a, b = required_chain[i], required_chain[i+1]
-            if not actual_subs.get(b):
+        # 3) Reachability from the entry points, and along the spine
+        depth = graph.depths()
+        report.unreachable = [name for name in graph.names if name not in depth]
+        for name in report.unreachable:
+            issues.append(DataflowIssue(
+                "WARN", "UNREACHABLE_NODE",
+                f"{name} cannot receive messages from any entry point."
+            ))
+        for a, b in zip(self.SPINE, self.SPINE[1:]):
+            if not graph.consumers.get(b):
                 issues.append(DataflowIssue(
                     "WARN", "FRAGILE_CHAIN",
                     f"No subscribers for {b}; chain {a} -> {b} may be broken."
                 ))
+            elif not graph.reaches(a, b):
+                issues.append(DataflowIssue(
+                    "WARN", "FRAGILE_CHAIN",
+                    f"Nothing subscribed to {a} leads to {b}; chain {a} -> {b} is broken."
+                ))
 
-        return issues
+        # 4) Cycles, fan-out and schedule order
+        report.order = graph.schedule(depth)
+        position = {name: i for i, name in enumerate(report.order)}
+        for comp in graph.components():
+            comp.sort(key=position.__getitem__)
+            if len(comp) > 1 or comp[0] in graph.succ[comp[0]]:
+                report.cycles.append(comp)
+                issues.append(DataflowIssue(
+                    "INFO", "CYCLE",
+                    f"Feedback loop through {comp}; a message can re-trigger its own producers."
+                ))
+        report.fanout = {t: len(ns) for t, ns in graph.consumers.items() if ns}
+        if self.max_fanout is not None:
+            for t, n in report.fanout.items():
+                if n > self.max_fanout and t not in self.SINK_TOPICS:
+                    issues.append(DataflowIssue(
+                        "WARN", "HIGH_FANOUT",
+                        f"Each {t} message is delivered to {n} subscribers (max_fanout={self.max_fanout})."
+                    ))
+        return report
@@ -0,0 +1,380 @@
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+import math, time
+
+class WindowStats:
+    """
+    Running statistics over the samples currently in a window, each O(1):
+    count, mean, variance/std (Welford, with removal), min, max, and slope
+    (least-squares value change per second). start/end are the oldest and
+    newest sample ts. Times are kept relative to an anchor so the slope sums
+    stay well-conditioned on epoch timestamps.
+    """
+    __slots__ = ("count", "mean", "_m2", "_anchor", "_st", "_stt", "_stv", "_sv", "_min", "_max", "start", "end")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = self._m2 = 0.0
+        self._anchor = self._st = self._stt = self._stv = self._sv = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self.start = self.end = math.nan
+
+    def _add(self, ts: float, value: float) -> None:
+        if not self.count:
+            self._anchor = self.start = ts
+        self.count += 1
+        d = value - self.mean
+        self.mean += d / self.count
+        self._m2 += d * (value - self.mean)
+        t = ts - self._anchor
+        self._st += t
+        self._stt += t * t
+        self._stv += t * value
+        self._sv += value
+        self.end = ts
+
+    def _remove(self, ts: float, value: float) -> None:
+        if self.count <= 1:
+            self.reset()
+            return
+        self.count -= 1
+        d = value - self.mean
+        self.mean -= d / self.count
+        self._m2 = max(0.0, self._m2 - d * (value - self.mean))
+        t = ts - self._anchor
+        self._st -= t
+        self._stt -= t * t
+        self._stv -= t * value
+        self._sv -= value
+
+    def _reanchor(self, anchor: float) -> None:
+        """Shift the time origin of the slope sums to anchor (O(1))."""
+        d = anchor - self._anchor
+        n = self.count
+        self._stt -= 2.0 * d * self._st - n * d * d
+        self._st -= n * d
+        self._stv -= d * self._sv
+        self._anchor = anchor
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1); 0.0 below two samples."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def min(self) -> float:
+        return self._min
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope in value units per second; 0.0 if undefined."""
+        n = self.count
+        denom = n * self._stt - self._st * self._st
+        if n < 2 or denom <= 0.0:
+            return 0.0
+        return (n * self._stv - self._st * self._sv) / denom
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start if self.count else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"count": self.count, "mean": self.mean, "std": self.std, "min": self.min,
+                "max": self.max, "slope": self.slope, "start": self.start, "end": self.end}
+
+class SlidingWindow(WindowStats):
+    """
+    Samples with ts in (newest ts - span, newest ts]. Values sit in a ring
+    buffer (array('d'), doubled when full) and min/max come from monotonic
+    deques, so add() is amortized O(1): each sample is appended and evicted
+    exactly once and nothing is ever rescanned.
+    """
+    __slots__ = ("span", "_ts", "_values", "_head", "_seq", "_mins", "_maxs")
+
+    def __init__(self, span: float, capacity: int = 16) -> None:
+        if span <= 0:
+            raise ValueError("span must be positive")
+        self.span = span
+        self._ts = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._head = 0  # ring index of the oldest sample
+        self._seq = 0   # samples ever added; the oldest held is _seq - count
+        self._mins: Deque[Tuple[int, float]] = deque()
+        self._maxs: Deque[Tuple[int, float]] = deque()
+        super().__init__()
+
+    def add(self, ts: float, value: float) -> None:
+        """Append a sample (ts must not go backwards) and evict what falls out of the span."""
+        if self.count == len(self._ts):
+            self._grow()
+        i = (self._head + self.count) % len(self._ts)
+        self._ts[i] = ts
+        self._values[i] = value
+        self._add(ts, value)
+
+        seq = self._seq
+        self._seq += 1
+        mins, maxs = self._mins, self._maxs
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((seq, value))
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        maxs.append((seq, value))
+
+        cutoff = ts - self.span
+        evicted = False
+        while self._ts[self._head] <= cutoff:
+            self._evict()
+            evicted = True
+        if evicted and self.start - self._anchor > self.span:
+            self._reanchor(self.start)
+
+    def _evict(self) -> None:
+        size = len(self._ts)
+        head = self._head
+        oldest = self._seq - self.count
+        self._remove(self._ts[head], self._values[head])
+        self._head = (head + 1) % size
+        if self.count:
+            self.start = self._ts[self._head]
+        if self._mins[0][0] == oldest:
+            self._mins.popleft()
+        if self._maxs[0][0] == oldest:
+            self._maxs.popleft()
+
+    def _grow(self) -> None:
+        size, head = len(self._ts), self._head
+        for col in (self._ts, self._values):
+            ordered = col[head:] + col[:head]
+            col[:] = ordered + array("d", bytes(8 * size))
+        self._head = 0
+
+    @property
+    def min(self) -> float:
+        return self._mins[0][1] if self._mins else math.inf
+
+    @property
+    def max(self) -> float:
+        return self._maxs[0][1] if self._maxs else -math.inf
+
+    @property
+    def last(self) -> float:
+        if not self.count:
+            return math.nan
+        return self._values[(self._head + self.count - 1) % len(self._values)]
+
+class TumblingWindow:
+    """
+    Consecutive, non-overlapping windows aligned to multiples of span
+    ([k*span, (k+1)*span)). add() returns the finished window's WindowStats
+    when a sample crosses into a new window, else None; flush() closes the
+    current window early (e.g. once its stream has gone quiet). Only running
+    sums are kept, so memory is O(1) however many samples a window holds.
+    """
+    __slots__ = ("span", "current", "_ends")
+
+    def __init__(self, span: float) -> None:
+        if span <= 0:
+            raise ValueError("span must be positive")
+        self.span = span
+        self.current = WindowStats()
+        self._ends = math.nan  # exclusive end of the current window
+
+    def add(self, ts: float, value: float) -> Optional[WindowStats]:
+        closed = None
+        if not ts < self._ends:  # also true for the first sample (NaN)
+            if self.current.count:
+                closed = self.current
+                self.current = WindowStats()
+            self._ends = (math.floor(ts / self.span) + 1) * self.span
+        current = self.current
+        current._add(ts, value)
+        if value < current._min:
+            current._min = value
+        if value > current._max:
+            current._max = value
+        return closed
+
+    def flush(self) -> Optional[WindowStats]:
+        """Close the current window now; its WindowStats, or None if it holds no samples."""
+        if not self.current.count:
+            return None
+        closed = self.current
+        self.current = WindowStats()
+        self._ends = math.nan  # the next sample opens a window aligned to its own ts
+        return closed
+
+SLIDING = "sliding"
+TUMBLING = "tumbling"
+
+@dataclass(frozen=True)
+class WindowSpec:
+    """A window kept for every user on one stream, e.g. WindowSpec("glucose_30m", "cgm.glucose", 1800)."""
+    name: str
+    stream_id: str
+    span: float
+    kind: str = SLIDING
+
+@dataclass(frozen=True)
+class WindowPredicate:
+    """
+    Event rule on one window. test(stats) is evaluated after every sample
+    (sliding) or on every finished window (tumbling). It is edge-triggered:
+    event fires when test turns true and re-arms once it is false again.
+    """
+    event: str
+    window: str
+    test: Callable[[WindowStats], bool]
+
+class _Series:
+    """The windows and predicate states of one (user_id, stream_id)."""
+    __slots__ = ("windows", "active", "last_ts")
+
+    def __init__(self, specs: List[WindowSpec], npredicates: int) -> None:
+        self.windows = [SlidingWindow(s.span) if s.kind == SLIDING else TumblingWindow(s.span) for s in specs]
+        self.active = [False] * npredicates
+        self.last_ts = -math.inf
+
+class WindowEngine:
+    """
+    Per-(user_id, stream_id) windowed aggregation. add() updates every window
+    defined for the sample's stream and returns the events whose predicates
+    just fired, as EVENTS payloads:
+        {"event", "user_id", "stream_id", "ts", "window", "stats": {...}}
+    Samples older than the newest one seen for their series are counted in
+    `late` and skipped. max_keys bounds the number of series (LRU).
+    A tumbling window only closes when a later sample arrives; flush(idle)
+    closes those of series that have received nothing for idle seconds
+    (by `clock`, not sample ts) and returns the events that fire on them.
+    """
+    def __init__(self, windows: Iterable[WindowSpec], predicates: Iterable[WindowPredicate] = (),
+                 max_keys: Optional[int] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.windows = list(windows)
+        self.predicates = list(predicates)
+        self.max_keys = max_keys
+        self.clock = clock
+        names = {w.name: w for w in self.windows}
+        if len(names) != len(self.windows):
+            raise ValueError("window names must be unique")
+        for w in self.windows:
+            if w.kind not in (SLIDING, TUMBLING):
+                raise ValueError(f"window {w.name!r}: kind must be {SLIDING!r} or {TUMBLING!r}")
+        # stream -> its specs, and per spec index the (predicate index, predicate) pairs on it.
+        self._specs: Dict[str, List[WindowSpec]] = {}
+        for w in self.windows:
+            self._specs.setdefault(w.stream_id, []).append(w)
+        self._rules: Dict[str, List[List[Tuple[int, WindowPredicate]]]] = {
+            stream: [[] for _ in specs] for stream, specs in self._specs.items()}
+        for i, p in enumerate(self.predicates):
+            spec = names.get(p.window)
+            if spec is None:
+                raise ValueError(f"predicate {p.event!r} refers to unknown window {p.window!r}")
+            self._rules[spec.stream_id][self._specs[spec.stream_id].index(spec)].append((i, p))
+        self._series: "OrderedDict[Hashable, _Series]" = OrderedDict()
+        # Series with a tumbling window -> clock() of their last sample, least recent first.
+        self._open: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._tumbling = {stream for stream, specs in self._specs.items() if any(s.kind == TUMBLING for s in specs)}
+        self.samples = self.late = self.fired = self.evictions = self.flushed = 0
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def series(self, user_id: Any, stream_id: str) -> Dict[str, Any]:
+        """Window name -> live WindowStats (the current one for tumbling windows); {} if unseen."""
+        s = self._series.get((user_id, stream_id))
+        if s is None:
+            return {}
+        return {spec.name: (w.current if isinstance(w, TumblingWindow) else w)
+                for spec, w in zip(self._specs[stream_id], s.windows)}
+
+    def add(self, user_id: Any, stream_id: str, ts: float, value: float) -> List[Dict[str, Any]]:
+        specs = self._specs.get(stream_id)
+        if specs is None:
+            return []
+        key = (user_id, stream_id)
+        s = self._series.get(key)
+        if s is None:
+            s = self._series[key] = _Series(specs, len(self.predicates))
+            if self.max_keys is not None and len(self._series) > self.max_keys:
+                self._open.pop(self._series.popitem(last=False)[0], None)
+                self.evictions += 1
+        elif self.max_keys is not None:
+            self._series.move_to_end(key)
+        if ts < s.last_ts:
+            self.late += 1
+            return []
+        s.last_ts = ts
+        self.samples += 1
+        if stream_id in self._tumbling:
+            opened = self._open
+            opened[key] = self.clock()
+            opened.move_to_end(key)
+
+        events: List[Dict[str, Any]] = []
+        active = s.active
+        for spec, window, rules in zip(specs, s.windows, self._rules[stream_id]):
+            if spec.kind == SLIDING:
+                window.add(ts, value)
+                stats = window
+            else:
+                stats = window.add(ts, value)
+                if stats is None:
+                    continue
+            for i, p in rules:
+                if p.test(stats):
+                    if not active[i]:
+                        active[i] = True
+                        self.fired += 1
+                        events.append({"event": p.event, "user_id": user_id, "stream_id": stream_id,
+                                       "ts": ts, "window": spec.name, "stats": stats.as_dict()})
+                else:
+                    active[i] = False
+        return events
+
+    def flush(self, idle: float, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Close the tumbling windows of series idle for at least idle seconds; events that fire."""
+        cutoff = (self.clock() if now is None else now) - idle
+        events: List[Dict[str, Any]] = []
+        opened = self._open
+        while opened:
+            key, seen = next(iter(opened.items()))
+            if seen > cutoff:
+                break
+            del opened[key]
+            s = self._series.get(key)
+            if s is None:
+                continue
+            user_id, stream_id = key
+            active = s.active
+            for spec, window, rules in zip(self._specs[stream_id], s.windows, self._rules[stream_id]):
+                if spec.kind != TUMBLING:
+                    continue
+                stats = window.flush()
+                if stats is None:
+                    continue
+                self.flushed += 1
+                for i, p in rules:
+                    if p.test(stats):
+                        if not active[i]:
+                            active[i] = True
+                            self.fired += 1
+                            events.append({"event": p.event, "user_id": user_id, "stream_id": stream_id,
+                                           "ts": s.last_ts, "window": spec.name, "stats": stats.as_dict()})
+                    else:
+                        active[i] = False
+        return events
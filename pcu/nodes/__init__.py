@@ -1,12 +1,33 @@
-# Re-export concrete nodes for convenience.
-from .ingestion import IngestionNode
-from .personicle import PersonicleNode
-from .state import StateNode
-from .kb import KBNode
-from .context import ContextNode
-from .guidance import GuidanceNode
-from .orchestrator import OrchestratorNode
-from .interface import InterfaceNode
-from .safety import SafetyNode
-from .observability import ObservabilityNode
-from .agent import AgentNode
+# Re-export concrete nodes for convenience. Classes are imported on first
+# access, so loading pcu.nodes (or building a topology) only pulls in the
+# node modules actually used.
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "IngestionNode": ".ingestion",
+    "PersonicleNode": ".personicle",
+    "StateNode": ".state",
+    "KBNode": ".kb",
+    "ContextNode": ".context",
+    "GuidanceNode": ".guidance",
+    "OrchestratorNode": ".orchestrator",
+    "InterfaceNode": ".interface",
+    "SafetyNode": ".safety",
+    "ObservabilityNode": ".observability",
+    "AgentNode": ".agent",
+    "HistoryNode": ".history",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> Any:
+    return sorted(list(globals()) + __all__)
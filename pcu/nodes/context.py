@@ -1,12 +1,14 @@
-from typing import List
+from typing import List, Optional
 from ..core.node import Node
 from ..core.topics import Topic, NodeRole
 from ..core.message import Message
+from ..storage.history import SensorHistoryStore
 
 class ContextNode(Node):
     """Infers situation, goals, interruptibility, risk; may query KB."""
-    def __init__(self, name, bus):
+    def __init__(self, name, bus, history: Optional[SensorHistoryStore] = None):
         super().__init__(name, NodeRole.CONTEXT, bus)
+        self.history = history  # lookback windows, e.g. history.last(user_id, "glucose", 7200)
 
     @property
     def inputs(self) -> List[Topic]:
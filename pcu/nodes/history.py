@@ -0,0 +1,33 @@
+from typing import List
+import time
+from ..core.node import Node
+from ..core.topics import Topic, NodeRole
+from ..core.message import Message
+from ..storage.history import SensorHistoryStore
+
+class HistoryNode(Node):
+    """Appends RAW_SENSORS samples (packets and frames) to the on-disk sensor history."""
+    def __init__(self, name, bus, store: SensorHistoryStore):
+        super().__init__(name, NodeRole.STORAGE, bus)
+        self.store = store
+
+    @property
+    def inputs(self) -> List[Topic]:
+        return [Topic.RAW_SENSORS]
+
+    @property
+    def outputs(self) -> List[Topic]:
+        return []
+
+    def on_message(self, msg: Message) -> None:
+        p = msg.payload
+        frame = p.get("frame")
+        if frame is not None:
+            self.store.append_frame(frame)
+            return
+        value = p.get("value")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.store.append(p.get("user_id"), p.get("stream_id"), p.get("ts", time.time()), value)
+
+    def stop(self) -> None:
+        self.store.flush()
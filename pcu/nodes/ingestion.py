@@ -1,12 +1,31 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import threading
 from ..core.node import Node
 from ..core.topics import Topic, NodeRole
 from ..core.message import Message
+from ..core.frame import SensorFrame, frame_payload
+from ..core.ingest import IngestReducer
 
 class IngestionNode(Node):
-    """Collects raw multimodal data and publishes standardized packets."""
-    def __init__(self, name, bus):
+    """
+    Collects raw multimodal data and publishes standardized packets.
+    With a `reducer` (an IngestReducer, opt-in), every sample first passes
+    through it, so duplicates can be dropped and streams coalesced or
+    downsampled before anything reaches the bus; reducer.stats() counts what
+    it removed. None (the default) publishes everything. On every tick,
+    aggregates of series that sent nothing for idle_close seconds are closed
+    and published (None: only a later sample or flush() closes them).
+    The reducer is locked: producers call the entrypoints from their own
+    threads while on_tick runs on the bus's thread. Messages are published
+    after the lock is released, so a producer blocked on a full mailbox
+    never holds up a tick.
+    """
+    def __init__(self, name, bus, reducer: Optional[IngestReducer] = None,
+                 idle_close: Optional[float] = 60.0):
         super().__init__(name, NodeRole.INGEST, bus)
+        self.reducer = reducer
+        self.idle_close = idle_close
+        self._lock = threading.Lock()
 
     @property
     def inputs(self) -> List[Topic]:
@@ -20,6 +39,55 @@ class IngestionNode(Node):
         # Ingestion is event-driven by external API calls, not by subscribed topics.
         pass
 
-    def ingest_sensor_packet(self, payload: Dict[str, Any]) -> None:
-        """External entrypoint: push normalized sensor packet onto the bus."""
-        self.bus.publish(Message(topic=Topic.RAW_SENSORS, payload=payload, provenance={"node": self.name}))
+    def ingest_sensor_packet(self, payload: Dict[str, Any], priority: Optional[int] = None) -> None:
+        """
+        External entrypoint: push normalized sensor packet onto the bus.
+        priority (e.g. Priority.CRITICAL for a device alarm) routes it ahead
+        of routine traffic on buses with priority lanes.
+        """
+        reducer = self.reducer
+        if reducer is not None:
+            with self._lock:
+                keep = reducer.admit_packet(payload)
+                aggregates = reducer.drain()
+            self._publish_aggregates(aggregates)
+            if not keep:
+                return
+        self.bus.publish(Message(topic=Topic.RAW_SENSORS, payload=payload, provenance={"node": self.name},
+                                 priority=priority))
+
+    def ingest_sensor_batch(self, frame: Optional[SensorFrame] = None, **columns: Any) -> None:
+        """
+        External entrypoint for bursts: publish one RAW_SENSORS message whose
+        payload["frame"] is a columnar SensorFrame, instead of one message per
+        sample. Pass a SensorFrame or its columns (user_id, stream_id, ts, value, unit).
+        """
+        if frame is None:
+            frame = SensorFrame(**columns)
+        reducer = self.reducer
+        if reducer is not None:
+            with self._lock:
+                frame = reducer.admit_frame(frame)
+                aggregates = reducer.drain()
+            self._publish_aggregates(aggregates)
+            if frame is None:
+                return
+        self.bus.publish(Message(topic=Topic.RAW_SENSORS, payload=frame_payload(frame), provenance={"node": self.name}))
+
+    def on_tick(self) -> None:
+        if self.reducer is not None and self.idle_close is not None:
+            with self._lock:
+                aggregates = self.reducer.close_idle(self.idle_close)
+            self._publish_aggregates(aggregates)
+
+    def flush(self) -> None:
+        """Publish the reducer's still-open aggregates; call before the final tick."""
+        if self.reducer is not None:
+            with self._lock:
+                aggregates = self.reducer.flush()
+            self._publish_aggregates(aggregates)
+
+    def _publish_aggregates(self, packets: List[Dict[str, Any]]) -> None:
+        publish, provenance = self.bus.publish, {"node": self.name, "coalesced": True}
+        for payload in packets:
+            publish(Message(topic=Topic.RAW_SENSORS, payload=payload, provenance=provenance))
@@ -1,12 +1,25 @@
-from typing import List, Any
+from typing import Dict, List, Any, Optional
+import copy
 from ..core.node import Node
 from ..core.topics import Topic, NodeRole
-from ..core.message import Message
+from ..core.message import CURRENT, Message
+from ..core.cache import LRUCache, CacheStats, freeze
 
 class KBNode(Node):
-    """Retrieves evidence, rules, and policies given a query."""
-    def __init__(self, name, bus):
+    """
+    Retrieves evidence, rules, and policies given a query.
+    Retrievals go through an LRU/TTL result cache keyed on the canonical
+    query; callers get a copy, never the cached object. On an InMemoryBus,
+    KB_QUERY messages are held until the end of the routing pass (bus.defer)
+    and identical ones are coalesced into a single retrieval and a single
+    KB_RESULT whose "requests" lists every asking correlation_id. Buses
+    without defer() get one answer per message (per batch when batched).
+    """
+    def __init__(self, name, bus, cache_size: int = 4096, cache_ttl: Optional[float] = 300.0):
         super().__init__(name, NodeRole.KB, bus)
+        self.cache = LRUCache(cache_size, cache_ttl)
+        self.coalesced = 0  # KB_QUERY messages answered by another message's retrieval
+        self._pending: List[Message] = []  # queries held until the end of the routing pass
 
     @property
     def inputs(self) -> List[Topic]:
@@ -16,12 +29,74 @@ class KBNode(Node):
     def outputs(self) -> List[Topic]:
         return [Topic.KB_RESULT, Topic.AUDIT]
 
+    def retrieve(self, **query: Any) -> Dict[str, Any]:
+        """Uncached retrieval/reasoning backend."""
+        # TODO: perform retrieval/reasoning.
+        return {"results": []}
+
+    def lookup(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Cached retrieval; queries with unhashable values bypass the cache."""
+        try:
+            key = freeze(query)
+        except TypeError:
+            self.cache.misses += 1
+            return self.retrieve(**query)
+        # Copy out so no caller can modify the cached result under everyone else.
+        return copy.deepcopy(self.cache.get_or_compute(key, lambda: self.retrieve(**query)))
+
+    def invalidate(self, query: Optional[Dict[str, Any]] = None) -> None:
+        """Forget one cached query, or the whole cache after the KB changes."""
+        if query is None:
+            self.cache.invalidate()
+            return
+        try:
+            key = freeze(query)
+        except TypeError:
+            return  # unhashable queries are never cached
+        self.cache.invalidate(key)
+
+    def cache_stats(self) -> CacheStats:
+        return self.cache.stats()
+
     def on_message(self, msg: Message) -> None:
-        # TODO: perform retrieval/reasoning and publish KB_RESULT.
-        pass
+        self._hold([msg])
+
+    def on_batch(self, msgs: List[Message]) -> None:
+        self._hold(msgs)
+
+    def _hold(self, msgs: List[Message]) -> None:
+        if not self._pending:
+            defer = getattr(self.bus, "defer", None)
+            if defer is None or not defer(self._flush):
+                self._answer(msgs)
+                return
+        self._pending.extend(msgs)
+
+    def _flush(self) -> None:
+        msgs, self._pending = self._pending, []
+        self._answer(msgs)
+
+    def _answer(self, msgs: List[Message]) -> None:
+        groups: Dict[Any, List[Message]] = {}
+        for msg in msgs:
+            try:
+                key = freeze(msg.payload)
+            except TypeError:
+                key = msg  # unhashable query: answer on its own
+            groups.setdefault(key, []).append(msg)
+        for group in groups.values():
+            self.coalesced += len(group) - 1
+            query = group[0].payload
+            payload = {"query": query, "requests": [m.correlation_id for m in group], **self.lookup(query)}
+            # The result is attributed to the newest asking message, as on batched routing.
+            token = CURRENT.set(group[-1])
+            try:
+                self.bus.publish(Message(topic=Topic.KB_RESULT, payload=payload, provenance={"node": self.name}))
+            finally:
+                CURRENT.reset(token)
 
     # Optional synchronous RPC hook for direct lookups
     def call(self, method: str, **kwargs: Any) -> Any:
         if method == "retrieve":
-            return {"results": []}
+            return self.lookup(kwargs)
         return super().call(method, **kwargs)
@@ -1,12 +1,22 @@
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from ..core.node import Node
 from ..core.topics import Topic, NodeRole
 from ..core.message import Message
+from ..core.instrumentation import METRICS_KIND
+
+if TYPE_CHECKING:
+    from ..storage.audit import AuditWriter
 
 class ObservabilityNode(Node):
-    """Collects AUDIT telemetry and pushes to logging/metrics stores."""
-    def __init__(self, name, bus):
+    """
+    Collects AUDIT telemetry and pushes to logging/metrics stores.
+    With a writer, every AUDIT message is handed to the AuditWriter, which
+    serializes and compresses off the routing thread.
+    """
+    def __init__(self, name, bus, writer: Optional["AuditWriter"] = None):
         super().__init__(name, NodeRole.OBSERVABILITY, bus)
+        self.metrics: Optional[Dict[str, Any]] = None  # latest bus instrumentation snapshot
+        self.writer = writer
 
     @property
     def inputs(self) -> List[Topic]:
@@ -17,5 +27,11 @@ class ObservabilityNode(Node):
         return []
 
     def on_message(self, msg: Message) -> None:
-        # TODO: ship to observability backend.
-        pass
+        if msg.payload.get("kind") == METRICS_KIND:
+            self.metrics = msg.payload["metrics"]
+        if self.writer is not None:
+            self.writer.submit(msg)
+
+    def stop(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
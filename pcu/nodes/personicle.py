@@ -1,12 +1,54 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+import time
 from ..core.node import Node
 from ..core.topics import Topic, NodeRole
 from ..core.message import Message
+from ..core.queue import Priority
+from ..core.window import TUMBLING, WindowEngine, WindowPredicate, WindowSpec
+
+HR = "watch.hr"
+GLUCOSE = "cgm.glucose"
+
+# Samples outside [low, high) are sensor noise and never reach a window.
+PLAUSIBLE: Dict[str, Tuple[float, float]] = {HR: (30.0, 180.0), GLUCOSE: (20.0, 500.0)}
+
+DEFAULT_WINDOWS = (
+    WindowSpec("hr_10m", HR, 600.0),
+    WindowSpec("hr_30m", HR, 1800.0),
+    WindowSpec("glucose_30m", GLUCOSE, 1800.0),
+    WindowSpec("glucose_1h", GLUCOSE, 3600.0, TUMBLING),
+)
+
+DEFAULT_PREDICATES = (
+    # Sustained elevated HR for at least 5 minutes.
+    WindowPredicate("exercise", "hr_10m", lambda w: w.duration >= 300 and w.mean >= 85 and w.min >= 75),
+    # Low, steady HR over most of half an hour.
+    WindowPredicate("sleep", "hr_30m", lambda w: w.duration >= 1500 and w.mean < 60 and w.std < 4),
+    # Glucose climbing >= 1 mg/dL per minute by at least 25 mg/dL.
+    WindowPredicate("meal", "glucose_30m", lambda w: w.count >= 4 and w.slope >= 1 / 60 and w.max - w.min >= 25),
+    WindowPredicate("glucose_low", "glucose_30m", lambda w: w.count >= 2 and w.mean < 70),
+    WindowPredicate("glucose_high", "glucose_30m", lambda w: w.count >= 2 and w.mean > 180),
+    WindowPredicate("glucose_variable", "glucose_1h", lambda w: w.count >= 6 and w.std >= 20),
+)
+
+# Events routed ahead of everything else on buses with priority lanes.
+URGENT_EVENTS = {"glucose_low": Priority.CRITICAL}
 
 class PersonicleNode(Node):
-    """Transforms continuous streams into discrete life events."""
-    def __init__(self, name, bus):
+    """
+    Transforms continuous streams into discrete life events: every
+    RAW_SENSORS sample (packet or frame row) updates the per-user windows of
+    its stream, and each predicate that fires is published on EVENTS.
+    On every tick, tumbling windows of series that have sent nothing for
+    idle_flush seconds are closed, so e.g. the last hour's glucose_variable
+    is still evaluated for a user who stops sending (None: never).
+    """
+    def __init__(self, name, bus, windows: Optional[WindowEngine] = None,
+                 idle_flush: Optional[float] = 3600.0):
         super().__init__(name, NodeRole.PERSONICLE, bus)
+        self.windows = windows if windows is not None else WindowEngine(DEFAULT_WINDOWS, DEFAULT_PREDICATES)
+        self.idle_flush = idle_flush
+        self.noise = 0
 
     @property
     def inputs(self) -> List[Topic]:
@@ -17,5 +59,34 @@ class PersonicleNode(Node):
         return [Topic.EVENTS, Topic.AUDIT]
 
     def on_message(self, msg: Message) -> None:
-        # TODO: detect events (e.g., sleep, meals) from raw streams, then publish EVENTS.
-        pass
+        p = msg.payload
+        frame = p.get("frame")
+        if frame is None:
+            value = p.get("value")
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._sample(p.get("user_id"), p.get("stream_id"), p.get("ts", time.time()), value)
+            return
+        ts, values = frame.ts, frame.value
+        for i in range(len(ts)):
+            self._sample(frame.label("user_id", i), frame.label("stream_id", i), float(ts[i]), float(values[i]))
+
+    def on_tick(self) -> None:
+        if self.idle_flush is not None:
+            self.flush(self.idle_flush)
+
+    def flush(self, idle: float = 0.0) -> None:
+        """Close tumbling windows idle for at least idle seconds (0: all) and publish their events."""
+        for event in self.windows.flush(idle):
+            self._publish(event)
+
+    def _sample(self, user_id: Any, stream_id: str, ts: float, value: float) -> None:
+        bounds = PLAUSIBLE.get(stream_id)
+        if bounds is not None and not bounds[0] <= value < bounds[1]:
+            self.noise += 1
+            return
+        for event in self.windows.add(user_id, stream_id, ts, value):
+            self._publish(event)
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        self.bus.publish(Message(topic=Topic.EVENTS, payload=event, provenance={"node": self.name},
+                                 priority=URGENT_EVENTS.get(event["event"])))
@@ -1,12 +1,19 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 from ..core.node import Node
 from ..core.topics import Topic, NodeRole
 from ..core.message import Message
+from ..storage.history import SensorHistoryStore
+from .personicle import GLUCOSE, HR, PLAUSIBLE
 
 class StateNode(Node):
     """Maintains user physiological/behavioral/emotional state."""
-    def __init__(self, name, bus):
+    # Per-user numeric state via self.keyed_state(user_id); NaN means "no reading yet".
+    STATE_FIELDS = {"heart_rate": float("nan"), "glucose": float("nan"), "previous_glucose": float("nan")}
+    STATE_IDLE_TTL = 6 * 3600.0
+
+    def __init__(self, name, bus, history: Optional[SensorHistoryStore] = None):
         super().__init__(name, NodeRole.STATE, bus)
+        self.history = history  # lookback windows, e.g. history.last(user_id, "glucose", 7200)
 
     @property
     def inputs(self) -> List[Topic]:
@@ -17,5 +24,35 @@ class StateNode(Node):
         return [Topic.STATE, Topic.AUDIT]
 
     def on_message(self, msg: Message) -> None:
-        # TODO: update and publish latent state vector.
-        pass
+        if msg.topic == Topic.RAW_SENSORS:
+            p = msg.payload
+            frame = p.get("frame")
+            if frame is None:
+                self._reading(p.get("user_id"), p.get("stream_id"), p.get("value"))
+                return
+            values = frame.value
+            for i in range(len(values)):
+                self._reading(frame.label("user_id", i), frame.label("stream_id", i), float(values[i]))
+        # TODO: publish the latent state vector on STATE.
+
+    def _reading(self, user_id: Any, stream_id: Any, value: Any) -> None:
+        if stream_id not in (HR, GLUCOSE) or user_id is None:
+            return
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return
+        low, high = PLAUSIBLE[stream_id]
+        if not low <= value < high:
+            return  # sensor noise, as in PersonicleNode
+        state = self.keyed_state(user_id)
+        if stream_id == HR:
+            state.heart_rate = value
+        else:
+            state.previous_glucose = state.glucose
+            state.glucose = value
+
+    def snapshot(self, user_id: Any) -> Optional[Dict[str, float]]:
+        """Current state fields of user_id (NaN where no reading yet); None if the user has none."""
+        state = self.state_store.peek(user_id)
+        if state is None:
+            return None
+        return {name: getattr(state, name) for name in self.STATE_FIELDS}
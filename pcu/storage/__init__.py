@@ -0,0 +1,25 @@
+# Durable storage backends (sensor history, logs). Classes are imported on
+# first access, so using one backend does not load the others.
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "SensorHistoryStore": ".history",
+    "HistoryChunk": ".history",
+    "MessageLog": ".wal",
+    "AuditWriter": ".audit",
+    "read_audit": ".audit",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> Any:
+    return sorted(list(globals()) + __all__)
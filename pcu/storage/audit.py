@@ -0,0 +1,227 @@
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Union
+import gzip, json, os, threading, time, zlib
+from ..core.message import Message
+
+SUFFIX = ".jsonl.gz"
+ACTIVE = ".open"  # suffix of the file currently being written
+
+def wall_offset_ns() -> int:
+    """Nanoseconds to add to a monotonic timestamp to get Unix time."""
+    return time.time_ns() - time.monotonic_ns()
+
+def message_record(msg: Message, offset_ns: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The JSON object written for one AUDIT message. "time" is the message's
+    creation time as Unix seconds (its monotonic ts mapped onto the wall
+    clock via offset_ns, taken now when omitted); "ts" keeps the raw
+    monotonic nanoseconds for latency arithmetic within one process.
+    """
+    if offset_ns is None:
+        offset_ns = wall_offset_ns()
+    record: Dict[str, Any] = {
+        "time": (msg.ts + offset_ns) / 1e9,
+        "ts": msg.ts,
+        "topic": msg.topic.value,
+        "id": msg.correlation_id,
+        "trace_id": msg.trace_id,
+        "payload": msg.payload,
+    }
+    if msg.parent_id is not None:
+        record["parent_id"] = msg.parent_id
+    if msg.provenance:
+        record["provenance"] = dict(msg.provenance)
+    return record
+
+class AuditWriter:
+    """
+    Background, batched sink for audit records (AUDIT Messages or plain dicts).
+    - submit() only appends to an in-memory buffer and never blocks the
+      routing thread; a writer thread drains it every flush_interval seconds
+      or as soon as batch_size records are waiting.
+    - Records are written as compact JSON lines into gzip files under
+      directory, rotated once a file reaches max_bytes (compressed) or
+      max_age seconds. The file being written ends in ".open" and is renamed
+      to audit-<utc time>-<n>.jsonl.gz when rotated or closed.
+    - Backpressure: above pressure (a fraction of capacity) only one record in
+      pressure_sample_every is kept; at capacity records are dropped. The
+      sampled_out and dropped counters say how much was shed.
+    close() flushes and stops the thread; a later submit() starts it again.
+    If the writer thread fails (e.g. the disk fills up), flush() and close()
+    re-raise its exception instead of waiting for records never written.
+    """
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 64 << 20,
+                 max_age: Optional[float] = 3600.0, capacity: int = 65536, pressure: float = 0.5,
+                 pressure_sample_every: int = 10, batch_size: int = 1024,
+                 flush_interval: float = 1.0, compresslevel: int = 6) -> None:
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.capacity = capacity
+        self.pressure_sample_every = pressure_sample_every
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compresslevel = compresslevel
+        self._pressure_depth = int(capacity * pressure)
+        self._pending: Deque[Any] = deque()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._batch_written = threading.Condition(self._lock)  # notified after every written batch
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._exited = False  # writer thread has left _run
+        self._error: Optional[BaseException] = None
+        self._raw: Any = None
+        self._gz: Any = None
+        self._opened = 0.0
+        self._file_seq = 0
+        self._skip = 0
+        self.submitted = self.written = self.sampled_out = self.dropped = self.files = 0
+
+    # ---- producer side ----
+    def submit(self, record: Any) -> bool:
+        """Queue one record; False if it was shed under backpressure."""
+        if self._thread is None:
+            self._start()
+        depth = len(self._pending)
+        if depth >= self.capacity:
+            self.dropped += 1
+            return False
+        if depth >= self._pressure_depth:
+            self._skip += 1
+            if self._skip % self.pressure_sample_every:
+                self.sampled_out += 1
+                return False
+        self._pending.append(record)
+        self.submitted += 1
+        if depth + 1 >= self.batch_size:
+            self._wake.set()
+        return True
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        return {"submitted": self.submitted, "written": self.written, "pending": len(self._pending),
+                "sampled_out": self.sampled_out, "dropped": self.dropped, "files": self.files}
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until everything submitted so far is written and flushed.
+        Re-raises the writer thread's exception if it died.
+        """
+        if self._thread is None:
+            return
+        target = self.submitted
+        self._wake.set()
+        with self._batch_written:
+            self._batch_written.wait_for(lambda: self.written >= target or self._exited, timeout)
+            if self._error is not None:
+                raise self._error
+            if self._exited and self.written < target:
+                raise RuntimeError("audit writer thread exited before flushing")
+
+    def close(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stopping = True
+        self._wake.set()
+        thread.join()
+        with self._lock:
+            self._stopping = False
+            error, self._error = self._error, None
+            try:
+                self._close_file()
+            except OSError:
+                if error is None:
+                    raise
+                self._gz = self._raw = None  # the writer already failed; report its error
+        if error is not None:
+            raise error
+
+    # ---- writer thread ----
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._exited = False
+                self._thread = threading.Thread(target=self._run, name="pcu-audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                stopping = self._stopping
+                self._drain()
+                if stopping:
+                    return
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            with self._lock:
+                self._exited = True
+                self._batch_written.notify_all()
+
+    def _drain(self) -> None:
+        pending, dumps = self._pending, json.JSONEncoder(separators=(",", ":"), default=str).encode
+        while pending:
+            lines: List[str] = []
+            offset = wall_offset_ns()
+            for _ in range(min(len(pending), self.batch_size)):
+                record = pending.popleft()
+                lines.append(dumps(message_record(record, offset) if isinstance(record, Message) else record))
+            with self._lock:
+                gz = self._file()
+                gz.write(("\n".join(lines) + "\n").encode())
+                # Sync-flush per batch so a crash loses at most the batch in flight.
+                gz.flush(zlib.Z_SYNC_FLUSH)
+                self.written += len(lines)
+                self._batch_written.notify_all()
+        with self._lock:
+            if self._gz is not None and self._expired():
+                self._close_file()
+
+    def _expired(self) -> bool:
+        if self._raw.tell() >= self.max_bytes:
+            return True
+        return self.max_age is not None and time.monotonic() - self._opened >= self.max_age
+
+    def _file(self) -> Any:
+        if self._gz is not None and self._expired():
+            self._close_file()
+        if self._gz is None:
+            self._file_seq += 1
+            path = self.dir / f"audit-{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{self._file_seq:04d}{SUFFIX}{ACTIVE}"
+            self._raw = open(path, "wb")
+            self._gz = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=self.compresslevel)
+            self._opened = time.monotonic()
+        return self._gz
+
+    def _close_file(self) -> None:
+        if self._gz is None:
+            return
+        self._gz.close()
+        self._raw.close()
+        path = str(self._raw.name)
+        os.replace(path, path[:-len(ACTIVE)])
+        self._gz = self._raw = None
+        self.files += 1
+
+def read_audit(directory: Union[str, Path], include_open: bool = False) -> Iterator[Dict[str, Any]]:
+    """Records from the rotated files in directory, oldest file first."""
+    paths: Iterable[Path] = sorted(Path(directory).glob("audit-*" + SUFFIX))
+    if include_open:
+        paths = list(paths) + sorted(Path(directory).glob("audit-*" + SUFFIX + ACTIVE))
+    for path in paths:
+        try:
+            with gzip.open(path, "rt") as f:
+                for line in f:
+                    yield json.loads(line)
+        except EOFError:  # an open file has no gzip trailer yet; its flushed lines were already yielded
+            continue
@@ -0,0 +1,219 @@
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+from urllib.parse import quote
+import mmap, time
+from ..core.frame import SensorFrame
+
+ITEM = array("d").itemsize  # both columns are float64
+
+def _safe_name(key: Any) -> str:
+    # quote() leaves '.' alone; escape it so ids like ".." can't escape the root.
+    return quote(str(key), safe="").replace(".", "%2E")
+
+class HistoryChunk:
+    """
+    Zero-copy slice of one segment: ts (epoch seconds) and values as
+    memoryviews of float64 over the mmapped files. Views stay valid while the
+    chunk is referenced; copy them out if they must outlive the store.
+    """
+    __slots__ = ("ts", "values")
+
+    def __init__(self, ts: memoryview, values: memoryview) -> None:
+        self.ts = ts
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def numpy(self) -> Tuple[Any, Any]:
+        """(ts, values) as NumPy arrays sharing the mapped memory (requires numpy)."""
+        import numpy as np
+        return np.frombuffer(self.ts, dtype=np.float64), np.frombuffer(self.values, dtype=np.float64)
+
+class _Segment:
+    __slots__ = ("ts_path", "val_path", "rows", "first_ts", "last_ts", "maps")
+
+    def __init__(self, base: Path) -> None:
+        self.ts_path = base.with_suffix(".ts")
+        self.val_path = base.with_suffix(".val")
+        self.rows = self.ts_path.stat().st_size // ITEM if self.ts_path.exists() else 0
+        self.first_ts = self.last_ts = float("nan")
+        self.maps: Optional[Tuple[mmap.mmap, mmap.mmap]] = None  # cached once sealed
+        if self.rows:
+            with open(self.ts_path, "rb") as f:
+                self.first_ts = array("d", f.read(ITEM))[0]
+                f.seek((self.rows - 1) * ITEM)
+                self.last_ts = array("d", f.read(ITEM))[0]
+
+class _Stream:
+    """Segments and write buffer for one (user, stream)."""
+    __slots__ = ("dir", "segments", "ts_buf", "val_buf")
+
+    def __init__(self, directory: Path) -> None:
+        self.dir = directory
+        directory.mkdir(parents=True, exist_ok=True)
+        names = sorted(p.stem for p in directory.glob("*.ts"))
+        self.segments = [_Segment(directory / n) for n in names]
+        self.ts_buf = array("d")
+        self.val_buf = array("d")
+
+class SensorHistoryStore:
+    """
+    Append-only on-disk history of sensor samples, one directory per
+    (user_id, stream_id) under root.
+    - Each segment is a pair of fixed-width float64 column files (<n>.ts with
+      epoch-second timestamps, <n>.val with values) holding up to
+      segment_records rows; full segments are sealed and never rewritten.
+    - Appends are buffered per stream (buffer_records rows) and written with
+      one write() per column; the column files are only open during that
+      write, so the number of streams is not bounded by the fd limit. Reads
+      flush the stream first.
+    - Reads mmap the segment files and return HistoryChunk memoryview slices,
+      located by binary search on the ts column: no parsing, no copies.
+      Samples are expected in non-decreasing ts order per stream. Maps of
+      sealed segments are cached, at most max_mapped_segments of them (LRU;
+      each holds two fds).
+    """
+    def __init__(self, root: Union[str, Path], segment_records: int = 1 << 16,
+                 buffer_records: int = 256, max_mapped_segments: int = 64) -> None:
+        self.root = Path(root)
+        self.segment_records = segment_records
+        self.buffer_records = buffer_records
+        self.max_mapped_segments = max_mapped_segments
+        self._streams: Dict[Tuple[Hashable, Hashable], _Stream] = {}
+        self._mapped: "OrderedDict[_Segment, None]" = OrderedDict()  # sealed segments with cached maps
+
+    # ---- writes ----
+    def append(self, user_id: Hashable, stream_id: Hashable, ts: float, value: float) -> None:
+        s = self._stream(user_id, stream_id)
+        s.ts_buf.append(ts)
+        s.val_buf.append(value)
+        if len(s.ts_buf) >= self.buffer_records:
+            self._write(s)
+
+    def append_many(self, user_id: Hashable, stream_id: Hashable, ts: Any, values: Any) -> None:
+        """Append whole columns (array('d'), NumPy arrays or sequences) for one stream."""
+        s = self._stream(user_id, stream_id)
+        s.ts_buf.extend(self._as_doubles(ts))
+        s.val_buf.extend(self._as_doubles(values))
+        if len(s.ts_buf) >= self.buffer_records:
+            self._write(s)
+
+    def append_frame(self, frame: SensorFrame) -> None:
+        if frame.uniform("user_id") and frame.uniform("stream_id"):
+            self.append_many(frame.user_id, frame.stream_id, frame.ts, frame.value)
+            return
+        ts, value = frame.ts, frame.value
+        for i in range(len(frame)):
+            self.append(frame.label("user_id", i), frame.label("stream_id", i), float(ts[i]), float(value[i]))
+
+    def flush(self) -> None:
+        for s in self._streams.values():
+            self._write(s)
+
+    def close(self) -> None:
+        self.flush()
+        for seg in self._mapped:
+            self._unmap(seg)
+        self._mapped.clear()
+        self._streams.clear()
+
+    # ---- reads ----
+    def window(self, user_id: Hashable, stream_id: Hashable,
+               start: Optional[float] = None, end: Optional[float] = None) -> List[HistoryChunk]:
+        """Chunks covering start <= ts < end (either bound may be open), oldest first."""
+        key = (user_id, stream_id)
+        s = self._streams.get(key)
+        if s is None:
+            if not (self.root / _safe_name(user_id) / _safe_name(stream_id)).is_dir():
+                return []
+            s = self._stream(user_id, stream_id)
+        self._write(s)
+        chunks: List[HistoryChunk] = []
+        for seg in s.segments:
+            if not seg.rows:
+                continue
+            if start is not None and seg.last_ts < start:
+                continue
+            if end is not None and seg.first_ts >= end:
+                break
+            ts_view, val_view = self._views(s, seg)
+            lo = 0 if start is None else bisect_left(ts_view, start)
+            hi = seg.rows if end is None else bisect_left(ts_view, end, lo)
+            if hi > lo:
+                chunks.append(HistoryChunk(ts_view[lo:hi], val_view[lo:hi]))
+        return chunks
+
+    def last(self, user_id: Hashable, stream_id: Hashable, seconds: float,
+             now: Optional[float] = None) -> List[HistoryChunk]:
+        """Lookback window, e.g. last(user, "glucose", 2 * 3600)."""
+        now = time.time() if now is None else now
+        return self.window(user_id, stream_id, now - seconds, None)
+
+    # ---- internals ----
+    @staticmethod
+    def _as_doubles(col: Any) -> Any:
+        if hasattr(col, "dtype"):
+            return array("d", col.astype("float64", copy=False).tobytes())
+        return col if isinstance(col, array) and col.typecode == "d" else array("d", col)
+
+    def _stream(self, user_id: Hashable, stream_id: Hashable) -> _Stream:
+        key = (user_id, stream_id)
+        s = self._streams.get(key)
+        if s is None:
+            s = self._streams[key] = _Stream(self.root / _safe_name(user_id) / _safe_name(stream_id))
+        return s
+
+    def _write(self, s: _Stream) -> None:
+        ts_buf, val_buf = s.ts_buf, s.val_buf
+        pos = 0
+        while pos < len(ts_buf):
+            seg = s.segments[-1] if s.segments else None
+            if seg is None or seg.rows >= self.segment_records:
+                seg = _Segment(s.dir / f"{len(s.segments):08d}")
+                s.segments.append(seg)
+            n = min(len(ts_buf) - pos, self.segment_records - seg.rows)
+            with open(seg.ts_path, "ab") as ts_file, open(seg.val_path, "ab") as val_file:
+                ts_file.write(memoryview(ts_buf)[pos:pos + n])
+                val_file.write(memoryview(val_buf)[pos:pos + n])
+            if not seg.rows:
+                seg.first_ts = ts_buf[pos]
+            seg.rows += n
+            seg.last_ts = ts_buf[pos + n - 1]
+            pos += n
+        if pos:
+            del ts_buf[:], val_buf[:]
+
+    def _views(self, s: _Stream, seg: _Segment) -> Tuple[memoryview, memoryview]:
+        maps = seg.maps
+        mapped = self._mapped
+        if maps is None:
+            maps = (self._map(seg.ts_path, seg.rows), self._map(seg.val_path, seg.rows))
+            # Sealed segments never change, so their maps can be reused; the
+            # active one is remapped per read to pick up new rows.
+            if seg.rows >= self.segment_records:
+                seg.maps = maps
+                mapped[seg] = None
+                if len(mapped) > self.max_mapped_segments:
+                    self._unmap(mapped.popitem(last=False)[0])
+        elif seg in mapped:
+            mapped.move_to_end(seg)
+        return (memoryview(maps[0]).cast("d")[:seg.rows], memoryview(maps[1]).cast("d")[:seg.rows])
+
+    @staticmethod
+    def _map(path: Path, rows: int) -> mmap.mmap:
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), rows * ITEM, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _unmap(seg: _Segment) -> None:
+        if seg.maps is not None:
+            for m in seg.maps:
+                try:
+                    m.close()
+                except BufferError:  # a caller still holds views; let GC release it
+                    pass
+            seg.maps = None
@@ -0,0 +1,197 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import json, os, pickle, struct, threading, weakref, zlib
+from ..core.message import Message, EMPTY_PROVENANCE
+from ..core.topics import Topic
+
+# Frame: body length, crc32(body), sequence number; body is a pickled record tuple.
+HEADER = struct.Struct("<IIQ")
+SUFFIX = ".wal"
+CHECKPOINTS = "checkpoints.json"
+
+class MessageLog:
+    """
+    Durable write-ahead log of published Messages.
+    - Each record is HEADER + pickled (topic, ts, correlation_id, payload,
+      provenance, trace_id, parent_id, priority), numbered with a global,
+      increasing sequence number. Records without the trace fields (older
+      logs) replay as trace roots; without priority, at their topic's level.
+    - Writes go through one buffered file; fsync is batched: every
+      sync_every records, and a background thread syncs anything still
+      unsynced every sync_interval seconds (None: no timer), so a crash
+      loses at most that window even after traffic stops.
+    - Segments rotate at segment_bytes and are named by their first sequence.
+    - checkpoint(topic) syncs the log, then records that results derived
+      from `topic` are durable up to a sequence; replay() skips those records.
+      Sequence numbers at or below a checkpoint are never handed out again.
+    A torn or corrupt record ends replay: nothing after it is trusted, and on
+    reopen the active segment is truncated back to its last good record.
+    """
+    def __init__(self, directory: Union[str, Path], segment_bytes: int = 64 << 20,
+                 sync_every: int = 1024, sync_interval: Optional[float] = 1.0) -> None:
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._file: Any = None
+        self._file_bytes = 0
+        self._unsynced = 0
+        self._checkpoints: Dict[str, int] = self._load_checkpoints()
+        self._next_seq = self._recover()
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if sync_interval is not None:
+            # The thread only holds a weak reference, so an unclosed log can still be collected.
+            self._flusher = threading.Thread(target=_flush_periodically, name="pcu-wal-sync", daemon=True,
+                                             args=(weakref.ref(self), sync_interval, self._closed))
+            self._flusher.start()
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence of the most recently appended record (0 if the log is empty)."""
+        return self._next_seq - 1
+
+    # ---- writes ----
+    def append(self, msg: Message) -> int:
+        provenance = None if msg.provenance is EMPTY_PROVENANCE else dict(msg.provenance)
+        body = pickle.dumps((msg.topic.value, msg.ts, msg.correlation_id, msg.payload, provenance,
+                             msg.trace_id, msg.parent_id, msg.priority), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            seq = self._next_seq
+            if self._file is None or self._file_bytes >= self.segment_bytes:
+                self._rotate(seq)
+            self._file.write(HEADER.pack(len(body), zlib.crc32(body), seq))
+            self._file.write(body)
+            self._file_bytes += HEADER.size + len(body)
+            self._next_seq = seq + 1
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self._sync()
+        return seq
+
+    def sync(self) -> None:
+        """Flush and fsync everything appended so far."""
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def checkpoint(self, topic: Topic, seq: Optional[int] = None) -> None:
+        """Mark results derived from `topic` durable up to seq (default: last appended)."""
+        with self._lock:
+            # Records covered by a checkpoint must be on disk before it is.
+            self._sync()
+            self._checkpoints[Topic(topic).value] = self._next_seq - 1 if seq is None else seq
+            tmp = self.dir / (CHECKPOINTS + ".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self._checkpoints, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.dir / CHECKPOINTS)
+
+    def _sync_if_dirty(self) -> None:
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    @property
+    def checkpoints(self) -> Dict[Topic, int]:
+        return {Topic(t): seq for t, seq in self._checkpoints.items()}
+
+    # ---- reads ----
+    def replay(self, topics: Optional[Iterable[Topic]] = None,
+               skip_checkpointed: bool = True) -> Iterator[Tuple[int, Message]]:
+        """Yield (seq, Message) in log order, optionally limited to `topics`."""
+        self.sync()
+        wanted = None if topics is None else {Topic(t).value for t in topics}
+        skip = self._checkpoints if skip_checkpointed else {}
+        for path in self._segments():
+            data = path.read_bytes()
+            records, good = self._records(data)
+            for seq, body in records:
+                topic, ts, cid, payload, provenance, *extra = pickle.loads(body)
+                if wanted is not None and topic not in wanted:
+                    continue
+                if seq <= skip.get(topic, 0):
+                    continue
+                yield seq, Message(Topic(topic), payload, ts, cid, provenance, *extra)
+            if good < len(data):
+                return  # torn or corrupt record: later segments are not trusted either
+
+    # ---- internals ----
+    def _segments(self) -> List[Path]:
+        return sorted(self.dir.glob("*" + SUFFIX))
+
+    @staticmethod
+    def _records(data: bytes) -> Tuple[List[Tuple[int, memoryview]], int]:
+        """Parse frames; returns (records, offset of the first byte not covered by a good record)."""
+        view = memoryview(data)
+        out: List[Tuple[int, memoryview]] = []
+        pos, end, size = 0, len(data), HEADER.size
+        while pos + size <= end:
+            length, crc, seq = HEADER.unpack_from(view, pos)
+            body = view[pos + size:pos + size + length]
+            if len(body) < length or zlib.crc32(body) != crc:
+                break
+            out.append((seq, body))
+            pos += size + length
+        return out, pos
+
+    def _recover(self) -> int:
+        # A checkpoint may cover records lost with an unsynced tail (e.g. an
+        # older log without checkpoint syncing); never reuse those numbers.
+        floor = max(self._checkpoints.values(), default=0) + 1
+        segments = self._segments()
+        if not segments:
+            return floor
+        last = segments[-1]
+        records, good = self._records(last.read_bytes())
+        if good < last.stat().st_size:
+            with open(last, "r+b") as f:  # drop a torn tail left by a crash
+                f.truncate(good)
+        if records:
+            return max(records[-1][0] + 1, floor)
+        return max(int(last.stem), floor)
+
+    def _rotate(self, first_seq: int) -> None:
+        segments = self._segments()
+        if self._file is None and segments and segments[-1].stat().st_size < self.segment_bytes:
+            path = segments[-1]  # keep filling the segment recovered at open
+        else:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+            path = self.dir / f"{first_seq:020d}{SUFFIX}"
+        self._file = open(path, "ab", buffering=1 << 20)
+        self._file_bytes = path.stat().st_size
+
+    def _sync(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def _load_checkpoints(self) -> Dict[str, int]:
+        path = self.dir / CHECKPOINTS
+        if not path.exists():
+            return {}
+        with open(path) as f:
+            return {str(t): int(seq) for t, seq in json.load(f).items()}
+
+def _flush_periodically(ref: "weakref.ref[MessageLog]", interval: float, closed: threading.Event) -> None:
+    while not closed.wait(interval):
+        log = ref()
+        if log is None:
+            return
+        log._sync_if_dirty()
+        del log
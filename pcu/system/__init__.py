@@ -1 +1,18 @@
+from importlib import import_module
+from typing import Any
 from .build import build_pcu_system, PCUSystem
+from .topology import Topology, NodeSpec, CompiledTopology, DEFAULT_TOPOLOGY
+
+# Imported on first access: the sharded runtime pulls in multiprocessing.
+_LAZY = {"ShardedRuntime": ".sharded"}
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> Any:
+    return sorted(list(globals()) + list(_LAZY))
@@ -1,31 +1,118 @@
 from dataclasses import dataclass
-from typing import Dict
-from ..core.bus import InMemoryBus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+import inspect
+from ..core.bus import EventBus, InMemoryBus
+from ..core.queue import QueueStats
+from ..core.topics import Topic
 from ..core.node import Node
 from ..core.validator import DataflowValidator
-from ..nodes import (
-    IngestionNode, PersonicleNode, StateNode, KBNode, ContextNode,
-    GuidanceNode, SafetyNode, OrchestratorNode, InterfaceNode,
-    ObservabilityNode, AgentNode
-)
+from .topology import CompiledTopology, Topology, DEFAULT_TOPOLOGY
+
+if TYPE_CHECKING:
+    from ..storage.wal import MessageLog
 
 @dataclass
 class PCUSystem:
     """Encapsulates the PCU runtime: bus, nodes, lifecycle helpers."""
-    bus: InMemoryBus
+    bus: EventBus
     nodes: Dict[str, Node]
 
     def start(self) -> None:
+        """Start nodes (subscribing is idempotent), then the bus runtime (event loop) if it has one."""
         for n in self.nodes.values():
             n.start()
+        if hasattr(self.bus, "start"):
+            self.bus.start()
 
     def stop(self) -> None:
+        """Drain and stop the bus runtime first so handlers finish before nodes stop."""
+        if hasattr(self.bus, "stop"):
+            self.bus.stop()
         for n in self.nodes.values():
             n.stop()
 
-    def tick(self) -> None:
-        """Drive the in-memory bus (for local mode/testing)."""
+    def tick(self) -> QueueStats:
+        """
+        Run every node's on_tick() hook, then drive the bus until pending
+        messages are handled (for an AsyncioBus this waits for every mailbox
+        to drain). Hooks run where the bus runs handlers (a bus with
+        call_in_loop, e.g. AsyncioBus, runs them on its loop thread) so they
+        never race on_message over node state.
+        Returns queue stats so callers can spot ingestion outrunning the pipeline
+        (depth/high_watermark growing, or drops under a bounded overflow policy).
+        """
+        call_in_loop = getattr(self.bus, "call_in_loop", None)
+        if call_in_loop is not None:
+            call_in_loop(self._tick_nodes)
+        else:
+            self._tick_nodes()
         self.bus.route()
+        return self.bus.stats()
+
+    def _tick_nodes(self) -> None:
+        for node in self.nodes.values():
+            node.on_tick()
+
+    def replay(self, log: "MessageLog", topics: Optional[Iterable[Topic]] = None,
+               route_every: int = 4096) -> int:
+        """
+        Stream a MessageLog back through the running graph for crash recovery.
+        Records covered by log checkpoints are skipped; pass topics (typically
+        the entry topics, e.g. RAW_SENSORS and FEEDBACK) to regenerate derived
+        messages instead of replaying them. Replayed and derived messages are
+        not re-logged, and load shedding and instrumentation are suspended
+        (their timestamps are from the original run). Returns the number of
+        messages replayed.
+        """
+        bus_log, self.bus.log = getattr(self.bus, "log", None), None  # type: ignore[attr-defined]
+        suspended = {attr: getattr(self.bus, attr, None) for attr in ("shedding", "instrumentation")}
+        for attr, value in suspended.items():
+            if value is not None:
+                setattr(self.bus, attr, None)
+        count = 0
+        try:
+            for _, msg in log.replay(topics=topics):
+                self.bus.publish(msg)
+                count += 1
+                if count % route_every == 0:
+                    self.bus.route()
+            self.bus.route()
+        finally:
+            self.bus.log = bus_log  # type: ignore[attr-defined]
+            for attr, value in suspended.items():
+                if value is not None:
+                    setattr(self.bus, attr, value)
+        return count
+
+    def compile(self) -> Dict[Topic, str]:
+        """
+        Fuse single-producer/single-consumer hops into direct calls.
+        A topic is fused when exactly one node declares it as an output and
+        exactly one (synchronous) node is subscribed to it; AUDIT never is.
+        Subscriptions are unchanged, so the graph still validates and
+        messages published from outside a handler are routed as before.
+        Fused deliveries skip the queue and router instrumentation. A node
+        subscribing to a fused topic later un-fuses that topic (see
+        InMemoryBus.subscribe); call compile() again to re-plan.
+        Returns topic -> consumer name for the fused hops.
+        """
+        if not isinstance(self.bus, InMemoryBus):
+            raise TypeError("compile() needs an InMemoryBus; other buses deliver concurrently")
+        producers: Dict[Topic, List[Node]] = {}
+        for node in self.nodes.values():
+            for t in node.outputs:
+                producers.setdefault(t, []).append(node)
+        routes: Dict[Topic, Node] = {}
+        for topic, subs in self.bus.subscriptions.items():
+            if topic is Topic.AUDIT or len(subs) != 1 or len(producers.get(topic, ())) != 1:
+                continue
+            consumer = subs[0]
+            if consumer is producers[topic][0] or inspect.iscoroutinefunction(consumer.on_message):
+                continue
+            routes[topic] = consumer
+        self.bus.fuse(routes)
+        return {t: n.name for t, n in routes.items()}
 
     def validate(self) -> None:
         """Run the dataflow validator and raise if critical issues exist."""
@@ -39,46 +126,30 @@ class PCUSystem:
             if i.level == "WARN":
                 print(f"[WARN] {i.code}: {i.detail}")
 
-def build_pcu_system() -> PCUSystem:
-    bus = InMemoryBus()
-
-    # Instantiate all layers
-    ingestion = IngestionNode("ingestion", bus)
-    personicle = PersonicleNode("personicle", bus)
-    state = StateNode("state", bus)
-    kb = KBNode("kb", bus)
-    context = ContextNode("context", bus)
-    guidance = GuidanceNode("guidance", bus, kb=kb)
-    safety = SafetyNode("safety", bus)
-    orchestrator = OrchestratorNode("orchestrator", bus)
-    interface = InterfaceNode("interface", bus)
-    observability = ObservabilityNode("observability", bus)
-
-    # Domain agents
-    agent_sleep = AgentNode("agent.sleep", bus, "sleep")
-    agent_activity = AgentNode("agent.activity", bus, "activity")
-    agent_mood = AgentNode("agent.mood", bus, "mood")
-    orchestrator.register_agent(agent_sleep)
-    orchestrator.register_agent(agent_activity)
-    orchestrator.register_agent(agent_mood)
-
-    nodes = {
-        n.name: n for n in [
-            ingestion, personicle, state, kb, context,
-            guidance, safety, orchestrator, interface,
-            observability, agent_sleep, agent_activity, agent_mood
-        ]
-    }
-
-    system = PCUSystem(bus=bus, nodes=nodes)
+def build_pcu_system(bus: Optional[EventBus] = None,
+                     history_root: Optional[Union[str, Path]] = None,
+                     audit_dir: Optional[Union[str, Path]] = None,
+                     topology: Union[Topology, CompiledTopology] = DEFAULT_TOPOLOGY) -> PCUSystem:
+    """
+    history_root enables the on-disk sensor history (HistoryNode + SensorHistoryStore);
+    audit_dir makes ObservabilityNode write AUDIT messages there (AuditWriter).
 
-    # Register subscriptions now so the validator can inspect them
-    system.start()
-    try:
-        # Run validation to ensure all declared outputs have consumers, etc.
-        system.validate()
-    finally:
-        # Keep system running in real usage; stop for a clean builder example
-        system.stop()
+    The topology is validated once per process (or not at all when a
+    CompiledTopology is passed in) and nodes are subscribed from its cached
+    table, so the returned system is wired and start() only starts it.
+    """
+    bus = bus if bus is not None else InMemoryBus()
+    resources: Dict[str, Any] = {}
+    # Storage backends are imported only when asked for (history maps files, audit pulls in gzip).
+    if history_root is not None:
+        from ..storage.history import SensorHistoryStore
+        resources["history"] = SensorHistoryStore(history_root)
+    if audit_dir is not None:
+        from ..storage.audit import AuditWriter
+        resources["audit"] = AuditWriter(audit_dir)
 
-    return system
+    compiled = topology if isinstance(topology, CompiledTopology) else topology.compile(resources)
+    missing = compiled.resources - resources.keys()
+    if missing:
+        raise ValueError(f"topology was compiled for resources {sorted(missing)} that were not supplied")
+    return PCUSystem(bus=bus, nodes=compiled.instantiate(bus, resources))
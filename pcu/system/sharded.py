@@ -0,0 +1,232 @@
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+import multiprocessing as mp
+import os, threading, time, traceback, zlib
+from ..core.bus import InMemoryBus
+from ..core.frame import SensorFrame
+from ..core.message import Message
+from ..core.node import Node
+from ..core.topics import Topic, NodeRole
+from ..nodes.observability import ObservabilityNode
+from .build import build_pcu_system, PCUSystem
+from .topology import DEFAULT_TOPOLOGY
+
+class _AuditForwarder(Node):
+    """Worker-side sink that buffers AUDIT messages for the coordinator."""
+    def __init__(self, name, bus):
+        super().__init__(name, NodeRole.OBSERVABILITY, bus)
+        self.buffer: List[Message] = []
+
+    @property
+    def inputs(self) -> List[Topic]:
+        return [Topic.AUDIT]
+
+    @property
+    def outputs(self) -> List[Topic]:
+        return []
+
+    def on_message(self, msg: Message) -> None:
+        self.buffer.append(msg)
+
+def _worker_main(index: int, builder: Callable[[], PCUSystem], inbox, outbox) -> None:
+    try:
+        system = builder()
+    except Exception:
+        outbox.put(("fatal", index, traceback.format_exc()))
+        raise SystemExit(1)
+    forwarder = _AuditForwarder(f"audit.forward.{index}", system.bus)
+    system.start()
+    forwarder.start()
+    ingestion = system.nodes["ingestion"]
+    ingest, ingest_batch = ingestion.ingest_sensor_packet, ingestion.ingest_sensor_batch
+    try:
+        while True:
+            kind, data = inbox.get()
+            if kind == "packets":
+                try:
+                    for item in data:
+                        if isinstance(item, SensorFrame):
+                            ingest_batch(item)
+                        else:
+                            ingest(item)
+                    system.tick()
+                except Exception:
+                    outbox.put(("error", index, traceback.format_exc()))
+                if forwarder.buffer:
+                    outbox.put(("audit", index, forwarder.buffer))
+                    forwarder.buffer = []
+            elif kind == "barrier":
+                outbox.put(("ack", index, data))
+            elif kind == "stop":
+                break
+    finally:
+        system.stop()
+
+class ShardedRuntime:
+    """
+    Runs the node graph in N worker processes, partitioned by user.
+
+    - Packets are routed by a stable hash (crc32) of payload["user_id"], so a
+      user always lands on the same worker and its packets are handled in
+      submission order. Users on different workers proceed in parallel.
+    - Each worker builds its own graph via `builder` (must be picklable, i.e.
+      a module-level function or a partial of one) and ticks its bus once per
+      received batch. The default builds DEFAULT_TOPOLOGY compiled once here,
+      so workers skip dataflow validation.
+    - AUDIT messages emitted in workers are shipped back and fed into a single
+      coordinator-side ObservabilityNode (`self.observability`).
+    - Packets are buffered per worker and sent in batches of `batch_size` to
+      amortize IPC; call flush()/drain() to push partial batches.
+    - A worker that dies (builder() raising, OOM kill, crash) makes the next
+      drain() raise RuntimeError instead of waiting for it forever; stop()
+      then skips the final drain and only tears the remaining workers down.
+    """
+    def __init__(self, workers: Optional[int] = None,
+                 builder: Optional[Callable[[], PCUSystem]] = None,
+                 batch_size: int = 256,
+                 observability: Optional[Node] = None,
+                 mp_context: Optional[str] = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.builder = builder or partial(build_pcu_system, topology=DEFAULT_TOPOLOGY.compile())
+        self.batch_size = batch_size
+        self.observability = observability or ObservabilityNode("observability", InMemoryBus())
+        self._ctx = mp.get_context(mp_context)
+        self._inboxes: List[Any] = []
+        self._procs: List[Any] = []
+        self._outbox: Any = None
+        self._collector: Optional[threading.Thread] = None
+        self._buffers: List[List[Any]] = [[] for _ in range(self.workers)]
+        self._barrier = 0
+        self._acks: Dict[int, int] = {}
+        self._acked = threading.Condition()
+        self._errors: List[str] = []
+        self._fatal: Dict[int, str] = {}  # shard -> why its worker exited early
+
+    def shard_for(self, user_id: Any) -> int:
+        return zlib.crc32(str(user_id).encode("utf-8")) % self.workers
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        if self._procs:
+            return
+        self._outbox = self._ctx.Queue()
+        for i in range(self.workers):
+            inbox = self._ctx.Queue()
+            proc = self._ctx.Process(target=_worker_main, args=(i, self.builder, inbox, self._outbox),
+                                     name=f"pcu-shard-{i}", daemon=True)
+            proc.start()
+            self._inboxes.append(inbox)
+            self._procs.append(proc)
+        # Start the collector only after forking so no thread state is inherited.
+        self._collector = threading.Thread(target=self._collect, name="pcu-shard-collector", daemon=True)
+        self._collector.start()
+
+    def stop(self) -> None:
+        if not self._procs:
+            return
+        try:
+            if not self._fatal and all(proc.is_alive() for proc in self._procs):
+                self.drain()
+        finally:
+            for inbox in self._inboxes:
+                inbox.put(("stop", None))
+            for proc in self._procs:
+                proc.join()
+            self._outbox.put(("exit", -1, None))
+            self._collector.join()  # type: ignore[union-attr]
+            self._inboxes, self._procs, self._collector = [], [], None
+            self._buffers = [[] for _ in range(self.workers)]
+            self._fatal, self._errors = {}, []
+
+    def _require_started(self) -> None:
+        if not self._procs:
+            raise RuntimeError("ShardedRuntime is not running; call start() first")
+
+    # ---- ingestion ----
+    def ingest_sensor_packet(self, payload: Dict[str, Any]) -> None:
+        """Same contract as IngestionNode.ingest_sensor_packet, routed by user_id."""
+        self._enqueue(self.shard_for(payload.get("user_id")), payload)
+
+    def _enqueue(self, shard: int, item: Any) -> None:
+        self._require_started()
+        buf = self._buffers[shard]
+        buf.append(item)
+        if len(buf) >= self.batch_size:
+            self._send(shard)
+
+    def ingest_sensor_batch(self, frame: SensorFrame) -> None:
+        """Columnar counterpart; frames spanning several users are split per shard."""
+        if frame.uniform("user_id"):
+            self._enqueue(self.shard_for(frame.user_id), frame)
+            return
+        rows: Dict[int, List[int]] = {}
+        for i, user_id in enumerate(frame.user_id):  # type: ignore[arg-type]
+            rows.setdefault(self.shard_for(user_id), []).append(i)
+        for shard, indices in rows.items():
+            self._enqueue(shard, frame.take(indices))
+
+    def flush(self) -> None:
+        for shard in range(self.workers):
+            if self._buffers[shard]:
+                self._send(shard)
+
+    def drain(self, timeout: Optional[float] = None, poll: float = 0.1) -> None:
+        """
+        Flush, then wait until every worker has processed and reported all
+        prior packets. Worker liveness is checked every `poll` seconds while
+        waiting; a dead worker raises RuntimeError.
+        """
+        self._require_started()
+        self.flush()
+        self._barrier += 1
+        token = self._barrier
+        for inbox in self._inboxes:
+            inbox.put(("barrier", token))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        acked = lambda: all(self._acks.get(i, 0) >= token for i in range(self.workers))
+        with self._acked:
+            while not acked():
+                dead = [i for i, proc in enumerate(self._procs) if not proc.is_alive()]
+                if dead:
+                    self._raise_dead(dead)
+                wait = poll if deadline is None else min(poll, deadline - time.monotonic())
+                if wait <= 0:
+                    raise TimeoutError(f"shards did not drain within {timeout}s")
+                self._acked.wait(wait)
+        if self._errors:
+            errors, self._errors = self._errors, []
+            raise RuntimeError("Shard worker failed:\n" + "\n".join(errors))
+
+    def _raise_dead(self, shards: List[int]) -> None:
+        """Called holding _acked. Gives the collector a moment to receive the workers' last report."""
+        self._acked.wait_for(lambda: all(i in self._fatal for i in shards), 1.0)
+        lines = []
+        for i in shards:
+            exitcode = self._procs[i].exitcode
+            lines.append(f"[shard {i}] worker exited (exitcode {exitcode})" +
+                         (f":\n{self._fatal[i]}" if i in self._fatal else ""))
+        raise RuntimeError("Shard worker died:\n" + "\n".join(lines))
+
+    def _send(self, shard: int) -> None:
+        self._inboxes[shard].put(("packets", self._buffers[shard]))
+        self._buffers[shard] = []
+
+    def _collect(self) -> None:
+        on_audit = self.observability.on_message
+        while True:
+            kind, index, data = self._outbox.get()
+            if kind == "audit":
+                for msg in data:
+                    on_audit(msg)
+            elif kind == "ack":
+                with self._acked:
+                    self._acks[index] = data
+                    self._acked.notify_all()
+            elif kind == "error":
+                self._errors.append(f"[shard {index}] {data}")
+            elif kind == "fatal":
+                with self._acked:
+                    self._fatal[index] = data
+                    self._acked.notify_all()
+            elif kind == "exit":
+                break
@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+import threading
+from ..core.bus import EventBus, InMemoryBus
+from ..core.node import Node
+from ..core.topics import Topic
+from ..core.validator import DataflowValidator, DataflowIssue
+
+@dataclass(frozen=True)
+class NodeSpec:
+    """
+    One node of a topology, constructed as cls(name, bus, *args, **kwargs) where
+    kwargs come from refs (kwarg -> name of an earlier node) and resources
+    (kwarg -> build resource such as "history"). A node with `requires` is only
+    built when that resource is supplied.
+    cls is a class exported by pcu.nodes (loaded on first use) or "module:Class".
+    """
+    name: str
+    cls: str
+    args: Tuple[Any, ...] = ()
+    refs: Tuple[Tuple[str, str], ...] = ()
+    resources: Tuple[Tuple[str, str], ...] = ()
+    requires: Optional[str] = None
+
+    def load(self) -> type:
+        module, _, attr = self.cls.rpartition(":")
+        return getattr(import_module(module or "pcu.nodes"), attr)
+
+@dataclass(frozen=True)
+class Topology:
+    """Declarative node graph: node specs in construction order plus the agents the orchestrator coordinates."""
+    nodes: Tuple[NodeSpec, ...]
+    orchestrator: Optional[str] = None
+    agents: Tuple[str, ...] = ()
+
+    def compile(self, resources: Iterable[str] = ()) -> "CompiledTopology":
+        """Validated topology for the given set of resource names (cached per topology and resource set)."""
+        key = (self, frozenset(resources))
+        compiled = _compiled.get(key)
+        if compiled is None:
+            with _compile_lock:
+                compiled = _compiled.get(key)
+                if compiled is None:
+                    compiled = _compiled[key] = _compile(self, key[1])
+        return compiled
+
+@dataclass(frozen=True)
+class CompiledTopology:
+    """
+    A topology checked once by DataflowValidator, with its subscription table
+    (topic -> subscriber names, in subscription order). Picklable, so a parent
+    process can compile once and hand the result to workers.
+    """
+    topology: Topology
+    resources: FrozenSet[str]
+    specs: Tuple[NodeSpec, ...]
+    subscriptions: Tuple[Tuple[Topic, Tuple[str, ...]], ...]
+    warnings: Tuple[DataflowIssue, ...] = field(default=(), compare=False)
+
+    def instantiate(self, bus: EventBus, resources: Optional[Mapping[str, Any]] = None) -> Dict[str, Node]:
+        """Construct the nodes on bus and subscribe them from the cached table (no validation)."""
+        nodes = _construct(self.specs, bus, resources or {})
+        orchestrator = self.topology.orchestrator
+        if orchestrator is not None:
+            for agent in self.topology.agents:
+                nodes[orchestrator].register_agent(nodes[agent])  # type: ignore[attr-defined]
+        for topic, names in self.subscriptions:
+            topics = (topic,)
+            for name in names:
+                bus.subscribe(nodes[name], topics)
+        return nodes
+
+_compiled: Dict[Tuple[Topology, FrozenSet[str]], CompiledTopology] = {}
+_compile_lock = threading.Lock()
+
+def _construct(specs: Iterable[NodeSpec], bus: EventBus, resources: Mapping[str, Any]) -> Dict[str, Node]:
+    nodes: Dict[str, Node] = {}
+    for spec in specs:
+        kwargs = {}
+        for kwarg, ref in spec.refs:
+            if ref not in nodes:
+                raise ValueError(f"{spec.name} refers to {ref!r}, which is not built before it")
+            kwargs[kwarg] = nodes[ref]
+        for kwarg, resource in spec.resources:
+            kwargs[kwarg] = resources.get(resource)
+        nodes[spec.name] = spec.load()(spec.name, bus, *spec.args, **kwargs)
+    return nodes
+
+def _compile(topology: Topology, resources: FrozenSet[str]) -> CompiledTopology:
+    specs = tuple(s for s in topology.nodes if s.requires is None or s.requires in resources)
+    names = [s.name for s in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"duplicate node names in topology: {names}")
+    for name in topology.agents + ((topology.orchestrator,) if topology.orchestrator else ()):
+        if name not in names:
+            raise ValueError(f"topology names {name!r}, which is not one of its nodes")
+
+    # Build once on a scratch bus (resources absent) to read each node's
+    # declared inputs and run the validator; the result is reused for every build.
+    bus = InMemoryBus()
+    nodes = _construct(specs, bus, {})
+    for node in nodes.values():
+        bus.subscribe(node, node.inputs)
+    issues = DataflowValidator(nodes, bus).validate()
+    errors = [i for i in issues if i.level == "ERROR"]
+    if errors:
+        lines = [f"[{i.level}] {i.code}: {i.detail}" for i in issues]
+        raise RuntimeError("Dataflow validation failed:\n" + "\n".join(lines))
+    warnings = tuple(i for i in issues if i.level == "WARN")
+    for i in warnings:
+        print(f"[WARN] {i.code}: {i.detail}")
+
+    table = tuple((topic, tuple(n.name for n in subs)) for topic, subs in bus.subscriptions.items())
+    return CompiledTopology(topology, resources, specs, table, warnings)
+
+# The standard PCU graph built by build_pcu_system().
+DEFAULT_TOPOLOGY = Topology(
+    nodes=(
+        NodeSpec("ingestion", "IngestionNode"),
+        NodeSpec("personicle", "PersonicleNode"),
+        NodeSpec("state", "StateNode", resources=(("history", "history"),)),
+        NodeSpec("kb", "KBNode"),
+        NodeSpec("context", "ContextNode", resources=(("history", "history"),)),
+        NodeSpec("guidance", "GuidanceNode", refs=(("kb", "kb"),)),
+        NodeSpec("safety", "SafetyNode"),
+        NodeSpec("orchestrator", "OrchestratorNode"),
+        NodeSpec("interface", "InterfaceNode"),
+        NodeSpec("observability", "ObservabilityNode", resources=(("writer", "audit"),)),
+        NodeSpec("agent.sleep", "AgentNode", args=("sleep",)),
+        NodeSpec("agent.activity", "AgentNode", args=("activity",)),
+        NodeSpec("agent.mood", "AgentNode", args=("mood",)),
+        NodeSpec("history", "HistoryNode", resources=(("store", "history"),), requires="history"),
+    ),
+    orchestrator="orchestrator",
+    agents=("agent.sleep", "agent.activity", "agent.mood"),
+)
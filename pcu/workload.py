@@ -0,0 +1,172 @@
+from dataclasses import dataclass
+from heapq import merge
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import math, random, time
+
+HR_STREAM = "watch.hr"
+GLUCOSE_STREAM = "cgm.glucose"
+DAY = 86400.0
+
+# Samples outside these ranges are what PersonicleEngine discards as noise.
+HR_NOISE = (30.0, 180.0)        # hr < 30 or hr >= 180
+GLUCOSE_NOISE = (20.0, 500.0)   # glucose < 20 or glucose > 500
+
+@dataclass
+class WorkloadConfig:
+    """
+    Shape of a synthetic population. Times are seconds from start_ts;
+    sample intervals default to a smartwatch HR stream and a 5-minute CGM.
+    """
+    users: int = 100
+    duration: float = DAY
+    seed: int = 0
+    start_ts: float = 0.0
+    hr_interval: float = 5.0
+    glucose_interval: float = 300.0
+    meals_per_day: int = 3
+    meal_rise: Tuple[float, float] = (40.0, 100.0)      # mg/dL peak above baseline
+    meal_peak: float = 30 * 60.0                       # seconds from meal to peak
+    exercise_probability: float = 0.6                 # chance of a session per day
+    exercise_minutes: Tuple[float, float] = (20.0, 60.0)
+    noise_rate: float = 0.002                         # fraction of samples replaced by outliers
+
+class _DayPlan:
+    """One user's meals and exercise session for one day (offsets in seconds)."""
+    __slots__ = ("meals", "exercise")
+
+    # Meal windows (start hour, end hour): breakfast, lunch, dinner, snacks.
+    MEAL_WINDOWS = [(7.0, 9.0), (12.0, 13.5), (18.0, 20.0), (15.0, 16.5), (21.0, 22.5)]
+
+    def __init__(self, config: WorkloadConfig, user: int, day: int) -> None:
+        rng = random.Random(f"{config.seed}/{user}/day{day}")
+        self.meals: List[Tuple[float, float]] = []
+        for lo, hi in self.MEAL_WINDOWS[:config.meals_per_day]:
+            self.meals.append((rng.uniform(lo, hi) * 3600, rng.uniform(*config.meal_rise)))
+        self.exercise: Optional[Tuple[float, float, float]] = None
+        if rng.random() < config.exercise_probability:
+            start = rng.uniform(6.0, 20.0) * 3600
+            # Target HR: mostly moderate (85-100 bpm band), sometimes vigorous.
+            target = rng.uniform(86.0, 99.0) if rng.random() < 0.7 else rng.uniform(110.0, 165.0)
+            self.exercise = (start, start + rng.uniform(*config.exercise_minutes) * 60, target)
+
+class _User:
+    """Per-user physiology and a small cache of day plans shared by its streams."""
+    def __init__(self, config: WorkloadConfig, index: int) -> None:
+        rng = random.Random(f"{config.seed}/{index}")
+        self.config = config
+        self.index = index
+        self.user_id = f"user{index:06d}"
+        self.resting_hr = rng.uniform(55.0, 75.0)
+        self.fasting_glucose = rng.uniform(82.0, 105.0)
+        self._plans: Dict[int, _DayPlan] = {}
+
+    def plan(self, day: int) -> _DayPlan:
+        plan = self._plans.get(day)
+        if plan is None:
+            if len(self._plans) > 2:  # streams are at most a day apart
+                self._plans.pop(min(self._plans))
+            plan = self._plans[day] = _DayPlan(self.config, self.index, day)
+        return plan
+
+    def hr(self, t: float, rng: random.Random) -> float:
+        day, offset = divmod(t, DAY)
+        hour = offset / 3600
+        # Lower overnight, peaking mid-afternoon.
+        value = self.resting_hr + 6.0 * math.sin((hour - 9.0) / 24.0 * 2 * math.pi)
+        session = self.plan(int(day)).exercise
+        if session is not None and session[0] <= offset < session[1]:
+            value = session[2]
+        return value + rng.gauss(0.0, 2.0)
+
+    def glucose(self, t: float, rng: random.Random) -> float:
+        day, offset = divmod(t, DAY)
+        value = self.fasting_glucose
+        peak = self.config.meal_peak
+        # Today's meals plus yesterday's late ones still being absorbed.
+        for d, shift in ((int(day), 0.0), (int(day) - 1, DAY)):
+            if d < 0:
+                continue
+            plan = self.plan(d)
+            for meal_at, rise in plan.meals:
+                dt = offset + shift - meal_at
+                if 0.0 <= dt < 6 * peak:
+                    x = dt / peak
+                    value += rise * x * math.exp(1.0 - x)  # gamma-shaped rise and decay
+            session = plan.exercise
+            if d == day and session is not None and session[0] <= offset < session[1] + 3600:
+                value -= 10.0
+        return value + rng.gauss(0.0, 3.0)
+
+def _stream(user: _User, stream_id: str, unit: str, interval: float,
+            model: Callable[[float, random.Random], float], noise: Tuple[float, float],
+            digits: int) -> Iterator[Dict[str, Any]]:
+    config = user.config
+    rng = random.Random(f"{config.seed}/{user.index}/{stream_id}")
+    low, high = noise
+    n = int(config.duration // interval)
+    # Stagger users so streams don't all tick on the same instant.
+    phase = rng.uniform(0.0, interval)
+    for i in range(n):
+        t = phase + i * interval
+        if rng.random() < config.noise_rate:
+            value = rng.uniform(low * 0.25, low * 0.95) if rng.random() < 0.5 else rng.uniform(high * 1.01, high * 1.3)
+        else:
+            value = model(t, rng)
+        yield {"user_id": user.user_id, "stream_id": stream_id, "ts": config.start_ts + t,
+               "value": round(value, digits), "unit": unit}
+
+def generate(config: Optional[WorkloadConfig] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield ingest_sensor_packet-shaped samples for every user and
+    stream, merged in timestamp order. Memory is O(users): nothing is
+    materialized, so arbitrarily long runs can be streamed. The same config
+    (including seed) always yields the same samples.
+    """
+    config = config or WorkloadConfig()
+    streams = []
+    for i in range(config.users):
+        user = _User(config, i)
+        streams.append(_stream(user, HR_STREAM, "bpm", config.hr_interval, user.hr, HR_NOISE, 0))
+        streams.append(_stream(user, GLUCOSE_STREAM, "mg/dL", config.glucose_interval, user.glucose,
+                               GLUCOSE_NOISE, 1))
+    return merge(*streams, key=lambda s: s["ts"])
+
+# Stream id -> the key orche_skeleton's Orchestrator expects.
+ORCHESTRATOR_KEYS = {HR_STREAM: "hr", GLUCOSE_STREAM: "glucose"}
+
+def orchestrator_packet(sample: Dict[str, Any]) -> Dict[str, Any]:
+    """Reshape a sample for Orchestrator.handle_new_data, e.g. {"user_id": ..., "hr": 72}."""
+    return {"user_id": sample["user_id"],
+            ORCHESTRATOR_KEYS.get(sample["stream_id"], sample["stream_id"]): sample["value"]}
+
+def replay(samples: Iterable[Dict[str, Any]], sink: Callable[[Dict[str, Any]], Any],
+           limit: Optional[int] = None, speed: Optional[float] = None,
+           tick: Optional[Callable[[], Any]] = None, tick_every: int = 1024,
+           transform: Optional[Callable[[Dict[str, Any]], Any]] = None) -> int:
+    """
+    Feed samples into sink (e.g. IngestionNode.ingest_sensor_packet or, with
+    transform=orchestrator_packet, Orchestrator.handle_new_data) one at a time.
+    - limit: stop after this many samples
+    - speed: None replays as fast as possible; otherwise simulated seconds
+      per wall-clock second (1.0 = real time), paced on sample ts
+    - tick: called every tick_every samples and at the end (e.g. PCUSystem.tick)
+    Returns the number of samples fed.
+    """
+    count = 0
+    origin = wall0 = None
+    for sample in samples:
+        if limit is not None and count >= limit:
+            break
+        if speed is not None:
+            if origin is None:
+                origin, wall0 = sample["ts"], time.monotonic()
+            delay = (sample["ts"] - origin) / speed - (time.monotonic() - wall0)
+            if delay > 0:
+                time.sleep(delay)
+        sink(transform(sample) if transform is not None else sample)
+        count += 1
+        if tick is not None and count % tick_every == 0:
+            tick()
+    if tick is not None:
+        tick()
+    return count
@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pcu.core import Message, Node, NodeRole, Topic
+
+class WiredNode(Node):
+    """Node with the given inputs/outputs that records what it receives and optionally reacts."""
+    def __init__(self, name, bus, inputs=(), outputs=(), react: Optional[Callable[["WiredNode", Message], None]] = None):
+        super().__init__(name, NodeRole.STATE, bus)
+        self._inputs, self._outputs = list(inputs), list(outputs)
+        self.react = react
+        self.received: List[Message] = []
+
+    @property
+    def inputs(self) -> List[Topic]:
+        return self._inputs
+
+    @property
+    def outputs(self) -> List[Topic]:
+        return self._outputs
+
+    def on_message(self, msg: Message) -> None:
+        self.received.append(msg)
+        if self.react is not None:
+            self.react(self, msg)
+
+@pytest.fixture
+def make_node():
+    """make_node(name, bus, inputs, outputs, react=None) -> a started WiredNode."""
+    def make(name, bus, inputs=(), outputs=(), react=None):
+        node = WiredNode(name, bus, inputs, outputs, react)
+        node.start()
+        return node
+    return make
+
+class FakeClock:
+    """Manually advanced clock for components that take clock=."""
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pcu.core import AsyncioBus, Message, Node, NodeRole, OverflowPolicy, Topic
+
+class AsyncSink(Node):
+    """Awaits `gate` (if any) before recording each message."""
+    def __init__(self, name, bus, gate=None):
+        super().__init__(name, NodeRole.INTERFACE, bus)
+        self.gate = gate
+        self.received = []
+
+    @property
+    def inputs(self):
+        return [Topic.GUIDANCE_OUT]
+
+    @property
+    def outputs(self):
+        return []
+
+    async def on_message(self, msg):
+        if self.gate is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.gate.wait)
+        await asyncio.sleep(0)
+        self.received.append(msg.payload["value"])
+
+@pytest.fixture
+def bus():
+    bus = AsyncioBus(mailbox_size=4)
+    yield bus
+    bus.stop()
+
+def out(value):
+    return Message(topic=Topic.GUIDANCE_OUT, payload={"value": value})
+
+def test_route_requires_start():
+    with pytest.raises(RuntimeError):
+        AsyncioBus().route()
+
+def test_sync_and_async_handlers_receive_in_publish_order(bus, make_node):
+    sync = make_node("sync", bus, [Topic.GUIDANCE_OUT])
+    sink = AsyncSink("async", bus)
+    sink.start()
+    bus.start()
+    for i in range(10):
+        bus.publish(out(i))
+    bus.route()
+    assert [m.payload["value"] for m in sync.received] == sink.received == list(range(10))
+    assert bus.stats().dequeued == 20
+
+def test_handlers_publishing_on_the_loop_are_routed(bus, make_node):
+    relay = make_node("relay", bus, [Topic.CONTROL], [Topic.GUIDANCE_OUT],
+                      lambda node, msg: node.bus.publish(out(msg.payload["value"])))
+    sink = make_node("sink", bus, [Topic.GUIDANCE_OUT])
+    bus.start()
+    bus.publish(Message(topic=Topic.CONTROL, payload={"value": 1}))
+    bus.route()
+    assert [m.payload["value"] for m in sink.received] == [1]
+    assert sink.received[0].trace_id == relay.received[0].trace_id
+
+def test_slow_handler_only_backs_up_its_own_mailbox(bus, make_node):
+    gate = threading.Event()
+    slow = AsyncSink("slow", bus, gate)
+    slow.start()
+    fast = make_node("fast", bus, [Topic.GUIDANCE_OUT])
+    bus.start()
+    for i in range(3):
+        bus.publish(out(i))
+    deadline = time.monotonic() + 5
+    while len(fast.received) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(fast.received) == 3 and slow.received == []
+    gate.set()
+    bus.route()
+    assert slow.received == [0, 1, 2]
+
+def test_full_mailbox_blocks_outside_producers_until_drained(bus, make_node):
+    gate = threading.Event()
+    slow = AsyncSink("slow", bus, gate)
+    slow.start()
+    bus.start()
+    producer = threading.Thread(target=lambda: [bus.publish(out(i)) for i in range(10)])
+    producer.start()
+    producer.join(0.2)
+    assert producer.is_alive()  # mailbox_size=4: the producer is waiting for room
+    gate.set()
+    producer.join(5)
+    bus.route()
+    assert slow.received == list(range(10))
+    assert bus.mailbox_stats()["slow"].high_watermark <= 4
+
+def test_handler_errors_surface_on_route(bus, make_node):
+    def fail(node, msg):
+        raise ValueError("boom")
+    make_node("bad", bus, [Topic.GUIDANCE_OUT], react=fail)
+    bus.start()
+    bus.publish(out(1))
+    with pytest.raises(ValueError):
+        bus.route()
+    bus.route()  # reported once
+
+def test_stop_drains_pending_messages(make_node):
+    bus = AsyncioBus()
+    sink = make_node("sink", bus, [Topic.GUIDANCE_OUT])
+    bus.start()
+    bus.publish(out(1))
+    bus.stop()
+    assert len(sink.received) == 1
+    bus.stop()  # idempotent
+
+def test_drop_newest_mailbox(make_node):
+    bus = AsyncioBus(mailbox_size=2, overflow=OverflowPolicy.DROP_NEWEST)
+    sink = make_node("sink", bus, [Topic.GUIDANCE_OUT])
+    for i in range(3):
+        bus.publish(out(i))  # not started: nothing drains yet
+    bus.start()
+    bus.route()
+    bus.stop()
+    assert [m.payload["value"] for m in sink.received] == [0, 1]
+    assert bus.stats().dropped_newest == 1
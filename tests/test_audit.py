@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from pcu.core import Message, Topic
+from pcu.storage import AuditWriter, read_audit
+
+def audit(value):
+    return Message(topic=Topic.AUDIT, payload={"value": value})
+
+def test_round_trips_messages_with_wall_clock_time(tmp_path):
+    writer = AuditWriter(tmp_path, flush_interval=60)
+    before = time.time()
+    msg = audit(1)
+    writer.submit(msg)
+    writer.submit({"plain": True})
+    writer.close()
+    record, plain = list(read_audit(tmp_path))
+    assert record["payload"] == {"value": 1}
+    assert record["id"] == msg.correlation_id and record["ts"] == msg.ts
+    assert before - 1 <= record["time"] <= time.time() + 1
+    assert plain == {"plain": True}
+
+def test_flush_makes_records_readable_from_the_open_file(tmp_path):
+    writer = AuditWriter(tmp_path, flush_interval=60)
+    for i in range(3):
+        writer.submit(audit(i))
+    writer.flush(timeout=10)
+    assert [r["payload"]["value"] for r in read_audit(tmp_path, include_open=True)] == [0, 1, 2]
+    assert list(read_audit(tmp_path)) == []
+    writer.close()
+
+def test_rotates_by_size(tmp_path):
+    writer = AuditWriter(tmp_path, max_bytes=1, batch_size=1, flush_interval=60)
+    for i in range(3):
+        writer.submit(audit(i))
+        writer.flush(timeout=10)
+    writer.close()
+    assert writer.files == 3
+    assert [r["payload"]["value"] for r in read_audit(tmp_path)] == [0, 1, 2]
+
+def test_backpressure_samples_then_drops(tmp_path):
+    writer = AuditWriter(tmp_path, capacity=10, pressure=0.5, pressure_sample_every=2,
+                         batch_size=100, flush_interval=60)
+    writer._thread = object()  # hold the writer thread off so the buffer fills
+    kept = [writer.submit(audit(i)) for i in range(20)]
+    assert kept[:5] == [True] * 5
+    assert writer.pending == 10
+    assert writer.sampled_out == 5 and writer.dropped == 5
+    assert writer.stats()["submitted"] == sum(kept) == 10
+
+def test_flush_and_close_raise_when_the_writer_thread_died(tmp_path, monkeypatch):
+    writer = AuditWriter(tmp_path, flush_interval=60)
+
+    def broken_file():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(writer, "_file", broken_file)
+    writer.submit(audit(1))
+    with pytest.raises(OSError, match="disk full"):
+        writer.flush(timeout=10)
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+    monkeypatch.undo()
+    writer.submit(audit(2))
+    writer.close()
+    assert [r["payload"]["value"] for r in read_audit(tmp_path)] == [2]
@@ -0,0 +1,56 @@
+from array import array
+from collections import deque
+
+import pytest
+
+from pcu.core import InMemoryBus, SensorFrame, Topic
+from pcu.nodes.ingestion import IngestionNode
+
+def frame(user_id, stream_id="hr", unit="bpm", n=3):
+    return SensorFrame(user_id, stream_id, [float(i) for i in range(n)], [60.0 + i for i in range(n)], unit)
+
+@pytest.mark.parametrize("user_id", ["u1", 42, 4.5, None, b"raw"])
+def test_scalar_labels_are_shared_by_every_row(user_id):
+    f = frame(user_id)
+    assert f.uniform("user_id")
+    assert [r["user_id"] for r in f.rows()] == [user_id] * 3
+
+@pytest.mark.parametrize("column", [["a", "b", "c"], ("a", "b", "c"), deque("abc"), iter("abc"),
+                                    (u for u in "abc")])
+def test_iterables_are_per_row_columns(column):
+    f = frame(column)
+    assert not f.uniform("user_id")
+    assert [f.label("user_id", i) for i in range(3)] == ["a", "b", "c"]
+
+def test_range_and_array_columns():
+    assert [r["user_id"] for r in frame(range(3)).rows()] == [0, 1, 2]
+    assert [r["user_id"] for r in frame(array("i", [7, 8, 9])).rows()] == [7, 8, 9]
+
+def test_numpy_columns_and_scalars():
+    np = pytest.importorskip("numpy")
+    f = SensorFrame(np.array([1, 2, 3]), np.str_("hr"), np.arange(3.0), np.arange(3.0))
+    assert f.uniform("stream_id") and not f.uniform("user_id")
+    assert f.ts.dtype == np.float64  # numeric columns are passed through
+    assert [r["user_id"] for r in f.take([2, 0]).rows()] == [3, 1]
+
+def test_length_mismatches_raise():
+    with pytest.raises(ValueError):
+        SensorFrame("u", "hr", [0.0, 1.0], [1.0])
+    with pytest.raises(ValueError):
+        frame(deque(["a", "b"]))
+
+def test_take_and_from_packets():
+    f = SensorFrame(["a", "b", "a"], "hr", [0.0, 1.0, 2.0], [60.0, 61.0, 62.0], "bpm")
+    sub = f.take([0, 2])
+    assert sub.uniform("stream_id") and list(sub.value) == [60.0, 62.0] and sub.user_id == ["a", "a"]
+    rebuilt = SensorFrame.from_packets(f.rows())
+    assert (rebuilt.user_id, rebuilt.stream_id, rebuilt.unit) == (["a", "b", "a"], "hr", "bpm")
+    assert list(rebuilt.rows()) == list(f.rows())
+
+def test_ingest_sensor_batch_publishes_one_message(make_node):
+    bus = InMemoryBus()
+    sink = make_node("sink", bus, [Topic.RAW_SENSORS])
+    IngestionNode("ingestion", bus).ingest_sensor_batch(user_id=7, stream_id="hr", ts=[0.0, 1.0], value=[60.0, 61.0])
+    bus.route()
+    (msg,) = sink.received
+    assert (msg.payload["user_id"], msg.payload["stream_id"], len(msg.payload["frame"])) == (7, "hr", 2)
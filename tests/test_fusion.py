@@ -0,0 +1,58 @@
+import pytest
+
+from pcu.core import InMemoryBus, Message, Topic
+from pcu.system import PCUSystem
+
+def relay(node, msg):
+    node.bus.publish(Message(topic=Topic.EVENTS, payload=msg.payload))
+
+@pytest.fixture
+def graph(make_node):
+    bus = InMemoryBus()
+    nodes = {
+        "relay": make_node("relay", bus, [Topic.RAW_SENSORS], [Topic.EVENTS], relay),
+        "sink": make_node("sink", bus, [Topic.EVENTS], [Topic.AUDIT]),
+        "audit": make_node("audit", bus, [Topic.AUDIT]),
+    }
+    return PCUSystem(bus, nodes)
+
+def publish(system, value):
+    system.bus.publish(Message(topic=Topic.RAW_SENSORS, payload={"value": value}))
+    system.tick()
+
+def test_compile_fuses_single_producer_single_consumer_hops(graph):
+    assert graph.compile() == {Topic.EVENTS: "sink"}
+    publish(graph, 1)
+    assert [m.payload["value"] for m in graph.nodes["sink"].received] == [1]
+    # Only the entry message went through the queue; the EVENTS hop was a direct call.
+    assert graph.bus.stats().enqueued == 1
+
+def test_fused_delivery_keeps_trace_lineage(graph):
+    graph.compile()
+    publish(graph, 1)
+    (raw,) = graph.nodes["relay"].received
+    (event,) = graph.nodes["sink"].received
+    assert (event.trace_id, event.parent_id) == (raw.trace_id, raw.correlation_id)
+
+def test_audit_and_multi_consumer_topics_are_not_fused(graph, make_node):
+    make_node("second", graph.bus, [Topic.EVENTS])
+    assert graph.compile() == {}
+
+def test_late_subscriber_unfuses_the_topic(graph, make_node):
+    graph.compile()
+    late = make_node("late", graph.bus, [Topic.EVENTS])
+    assert Topic.EVENTS not in graph.bus.fused
+    publish(graph, 2)
+    assert len(graph.nodes["sink"].received) == len(late.received) == 1
+
+def test_resubscribing_the_fused_consumer_keeps_the_fusion(graph):
+    graph.compile()
+    graph.nodes["sink"].start()
+    assert graph.bus.fused == {Topic.EVENTS: graph.nodes["sink"]}
+
+def test_publishes_from_outside_route_are_queued(graph):
+    graph.compile()
+    graph.bus.publish(Message(topic=Topic.EVENTS, payload={"value": 3}))
+    assert graph.nodes["sink"].received == []
+    graph.tick()
+    assert len(graph.nodes["sink"].received) == 1
@@ -0,0 +1,74 @@
+import os
+import resource
+
+import pytest
+
+from pcu.core import SensorFrame
+from pcu.storage import SensorHistoryStore
+
+def rows(chunks):
+    return [(t, v) for c in chunks for t, v in zip(c.ts, c.values)]
+
+def test_window_reads_back_appends_across_segments(tmp_path):
+    store = SensorHistoryStore(tmp_path, segment_records=4, buffer_records=3)
+    for i in range(10):
+        store.append("u", "hr", float(i), 60.0 + i)
+    assert rows(store.window("u", "hr")) == [(float(i), 60.0 + i) for i in range(10)]
+    assert rows(store.window("u", "hr", 3.0, 7.0)) == [(float(i), 60.0 + i) for i in range(3, 7)]
+    assert store.window("u", "hr", 20.0) == [] and store.window("nobody", "hr") == []
+    assert rows(store.last("u", "hr", 2.0, now=9.0)) == [(7.0, 67.0), (8.0, 68.0), (9.0, 69.0)]
+    assert len(list(tmp_path.glob("u/hr/*.ts"))) == 3
+    store.close()
+
+def test_reopen_continues_existing_history(tmp_path):
+    store = SensorHistoryStore(tmp_path, segment_records=4)
+    store.append_many("u", "hr", [0.0, 1.0, 2.0], [1.0, 2.0, 3.0])
+    store.close()
+    store = SensorHistoryStore(tmp_path, segment_records=4)
+    store.append_many("u", "hr", [3.0, 4.0], [4.0, 5.0])
+    assert [t for t, _ in rows(store.window("u", "hr"))] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    store.close()
+
+def test_append_frame_splits_mixed_labels(tmp_path):
+    store = SensorHistoryStore(tmp_path)
+    store.append_frame(SensorFrame(["a", "b", "a"], "hr", [0.0, 1.0, 2.0], [1.0, 2.0, 3.0]))
+    assert rows(store.window("a", "hr")) == [(0.0, 1.0), (2.0, 3.0)]
+    assert rows(store.window("b", "hr")) == [(1.0, 2.0)]
+    store.close()
+
+def test_ids_cannot_escape_the_root(tmp_path):
+    store = SensorHistoryStore(tmp_path / "root")
+    store.append("..", "../x", 0.0, 1.0)
+    store.close()
+    assert [p.name for p in tmp_path.iterdir()] == ["root"]
+
+def test_numpy_views_share_the_mapped_memory(tmp_path):
+    np = pytest.importorskip("numpy")
+    store = SensorHistoryStore(tmp_path)
+    store.append_many("u", "hr", np.arange(5.0), np.arange(5.0) * 2)
+    (chunk,) = store.window("u", "hr", 1.0, 4.0)
+    ts, values = chunk.numpy()
+    assert ts.tolist() == [1.0, 2.0, 3.0] and values.tolist() == [2.0, 4.0, 6.0]
+    del chunk, ts, values
+    store.close()
+
+@pytest.fixture
+def few_fds():
+    """Lower the soft fd limit to 64 above what is open now."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    in_use = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else 32
+    limit = in_use + 64
+    resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+    yield limit
+    resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+def test_more_streams_than_the_fd_limit(tmp_path, few_fds):
+    store = SensorHistoryStore(tmp_path, segment_records=2, buffer_records=1, max_mapped_segments=8)
+    streams = few_fds * 2
+    for user in range(streams):
+        for ts in range(5):
+            store.append(user, "hr", float(ts), float(user))
+    for user in range(streams):
+        assert [v for _, v in rows(store.window(user, "hr"))] == [float(user)] * 5
+    assert len(store._mapped) == 8
+    store.close()
@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from pcu.core import AsyncioBus, InMemoryBus, IngestReducer, StreamPolicy, Topic
+from pcu.nodes.ingestion import IngestionNode
+from pcu.system import PCUSystem
+
+def packet(ts, value, user="u", stream="hr"):
+    return {"user_id": user, "stream_id": stream, "ts": ts, "value": value, "unit": "bpm"}
+
+def test_exact_duplicates_are_dropped():
+    r = IngestReducer()
+    assert [r.admit("u", "hr", ts, 70) for ts in (1.0, 2.0, 1.0, 3.0, 2.0)] == [True, True, False, True, False]
+    assert r.admit("u", "hr", None, 70) and r.admit("u", "hr", None, 70)  # no ts: never a duplicate
+    assert r.admit("v", "hr", 1.0, 70)
+    stats = r.stats()
+    assert (stats.received, stats.forwarded, stats.duplicates) == (8, 6, 2)
+
+def test_dedup_window_bounds_the_memory():
+    r = IngestReducer(dedup_window=2)
+    for ts in (1.0, 2.0, 3.0):
+        r.admit("u", "hr", ts, 70)
+    assert r.admit("u", "hr", 1.0, 70)
+    assert not r.admit("u", "hr", 3.0, 70)
+
+def test_coalesce_emits_one_aggregate_per_interval():
+    r = IngestReducer({"hr": StreamPolicy(coalesce=60.0)})
+    assert not any(r.admit("u", "hr", ts, v, "bpm") for ts, v in [(0.0, 60), (30.0, 80), (59.0, 70)])
+    assert r.drain() == []
+    r.admit("u", "hr", 61.0, 90, "bpm")
+    (agg,) = r.drain()
+    assert agg == {"user_id": "u", "stream_id": "hr", "ts": 59.0, "value": 70.0, "unit": "bpm",
+                   "count": 3, "first_ts": 0.0}
+    stats = r.stats()
+    assert (stats.aggregates, stats.coalesced, stats.pending, stats.published) == (1, 2, 1, 1)
+    (last,) = r.flush()
+    assert (last["value"], last["count"]) == (90, 1)
+    assert r.stats().reduction == pytest.approx(0.5)
+
+@pytest.mark.parametrize("aggregate, expected", [("min", 60), ("max", 80), ("first", 60), ("last", 70)])
+def test_coalesce_aggregates(aggregate, expected):
+    r = IngestReducer(default=StreamPolicy(coalesce=60.0, aggregate=aggregate))
+    for ts, v in [(0.0, 60), (1.0, 80), (2.0, 70)]:
+        r.admit("u", "hr", ts, v)
+    assert r.flush()[0]["value"] == expected
+
+def test_min_interval_downsamples():
+    r = IngestReducer({"hr": StreamPolicy(min_interval=10.0)})
+    assert [r.admit("u", "hr", ts, 70) for ts in (0.0, 5.0, 10.0, 19.0, 25.0)] == [True, False, True, False, True]
+    assert r.stats().downsampled == 2
+
+def test_close_idle_closes_quiet_series_only(clock):
+    r = IngestReducer({"hr": StreamPolicy(coalesce=60.0)}, clock=clock)
+    r.admit("quiet", "hr", 0.0, 70)
+    clock.now = 50.0
+    r.admit("busy", "hr", 0.0, 80)
+    clock.now = 70.0
+    assert [a["user_id"] for a in r.close_idle(60.0)] == ["quiet"]
+    assert r.close_idle(60.0) == []
+    clock.now = 110.0
+    assert [a["user_id"] for a in r.close_idle(60.0)] == ["busy"]
+    assert r.stats().pending == 0
+
+def test_max_keys_evicts_and_emits_open_aggregates():
+    r = IngestReducer(default=StreamPolicy(coalesce=60.0), max_keys=1)
+    r.admit("a", "hr", 0.0, 70)
+    r.admit("b", "hr", 0.0, 80)
+    assert [a["user_id"] for a in r.drain()] == ["a"]
+
+def test_invalid_policies():
+    with pytest.raises(ValueError):
+        StreamPolicy(coalesce=1.0, min_interval=1.0)
+    with pytest.raises(ValueError):
+        StreamPolicy(coalesce=1.0, aggregate="median")
+
+def test_ingestion_node_reduction_is_opt_in(make_node):
+    bus = InMemoryBus()
+    sink = make_node("sink", bus, inputs=[Topic.RAW_SENSORS])
+    node = IngestionNode("ingestion", bus)
+    for _ in range(2):
+        node.ingest_sensor_packet(packet(1.0, 70))
+    bus.route()
+    assert len(sink.received) == 2
+
+def test_ingestion_node_publishes_idle_aggregates_on_tick(make_node, clock):
+    bus = InMemoryBus()
+    sink = make_node("sink", bus, inputs=[Topic.RAW_SENSORS])
+    node = IngestionNode("ingestion", bus, IngestReducer({"hr": StreamPolicy(coalesce=60.0)}, clock=clock),
+                         idle_close=30.0)
+    node.ingest_sensor_packet(packet(1.0, 70))
+    node.ingest_sensor_packet(packet(1.0, 70))
+    node.on_tick()
+    bus.route()
+    assert sink.received == []
+    clock.now = 30.0
+    node.on_tick()
+    bus.route()
+    (msg,) = sink.received
+    assert (msg.payload["count"], msg.provenance["coalesced"]) == (1, True)
+
+class OverlapReducer(IngestReducer):
+    """Records whether close_idle ever ran while an admit was in progress."""
+    admitting = overlapped = False
+
+    def admit(self, *args, **kw):
+        self.admitting = True
+        time.sleep(0.001)
+        try:
+            return super().admit(*args, **kw)
+        finally:
+            self.admitting = False
+
+    def close_idle(self, idle, now=None):
+        self.overlapped |= self.admitting
+        return super().close_idle(idle, now)
+
+def test_ingestion_node_ticks_safely_beside_a_producer_thread(make_node):
+    bus = AsyncioBus()
+    sink = make_node("sink", bus, inputs=[Topic.RAW_SENSORS])
+    node = IngestionNode("ingestion", bus, OverlapReducer(default=StreamPolicy(coalesce=1.0)), idle_close=0.0)
+    system = PCUSystem(bus, {"ingestion": node, "sink": sink})
+    system.start()
+    n = 200
+    producer = threading.Thread(target=lambda: [node.ingest_sensor_packet(packet(i / 4, 70)) for i in range(n)])
+    try:
+        producer.start()
+        while producer.is_alive():
+            system.tick()
+        producer.join()
+        node.flush()
+        system.tick()
+    finally:
+        system.stop()
+    assert not node.reducer.overlapped
+    assert sum(m.payload["count"] for m in sink.received) == n
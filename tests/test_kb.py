@@ -0,0 +1,81 @@
+import pytest
+
+from pcu.core import InMemoryBus, LRUCache, Message, Topic
+from pcu.core.cache import freeze
+from pcu.nodes.kb import KBNode
+
+class CountingKB(KBNode):
+    def __init__(self, name, bus, **kw):
+        super().__init__(name, bus, **kw)
+        self.retrievals = 0
+
+    def retrieve(self, **query):
+        self.retrievals += 1
+        return {"results": [{"topic": query.get("topic")}]}
+
+def query(topic="sleep", **extra):
+    return Message(topic=Topic.KB_QUERY, payload={"topic": topic, **extra})
+
+def test_lru_cache_bounds_and_expires(clock):
+    cache = LRUCache(maxsize=2, ttl=10.0, clock=clock)
+    calls = []
+    compute = lambda key: lambda: calls.append(key) or key.upper()
+    assert cache.get_or_compute("a", compute("a")) == "A"
+    assert cache.get_or_compute("a", compute("a")) == "A"
+    cache.get_or_compute("b", compute("b"))
+    cache.get_or_compute("c", compute("c"))  # evicts "a"
+    cache.get_or_compute("a", compute("a"))
+    clock.now = 11.0
+    cache.get_or_compute("a", compute("a"))
+    assert calls == ["a", "b", "c", "a", "a"]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.expirations) == (1, 5, 2, 1)
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+def test_freeze_ignores_dict_order_and_rejects_unhashable_leaves():
+    assert freeze({"a": [1, {"b": 2}], "c": 3}) == freeze({"c": 3, "a": (1, {"b": 2})})
+    with pytest.raises(TypeError):
+        freeze({"a": bytearray(b"x")})
+
+def test_lookup_caches_and_returns_copies():
+    kb = CountingKB("kb", InMemoryBus())
+    first = kb.lookup({"topic": "sleep"})
+    first["results"].append("mutated")
+    assert kb.lookup({"topic": "sleep"}) == {"results": [{"topic": "sleep"}]}
+    assert kb.retrievals == 1 and kb.cache_stats().hits == 1
+    kb.invalidate({"topic": "sleep"})
+    kb.lookup({"topic": "sleep"})
+    assert kb.retrievals == 2
+
+def test_unhashable_queries_bypass_the_cache():
+    kb = CountingKB("kb", InMemoryBus())
+    kb.lookup({"topic": bytearray(b"x")})
+    kb.lookup({"topic": bytearray(b"x")})
+    kb.invalidate({"topic": bytearray(b"x")})
+    assert kb.retrievals == 2 and len(kb.cache) == 0
+
+@pytest.mark.parametrize("batch_size", [None, 16])
+def test_identical_queries_in_one_pass_are_coalesced(make_node, batch_size):
+    bus = InMemoryBus(batch_size=batch_size)
+    kb = CountingKB("kb", bus)
+    kb.start()
+    sink = make_node("sink", bus, [Topic.KB_RESULT])
+    asks = [query(), query(), query("diet"), query()]
+    for msg in asks:
+        bus.publish(msg)
+    bus.route()
+    results = {m.payload["query"]["topic"]: m for m in sink.received}
+    assert len(sink.received) == 2 and kb.retrievals == 2 and kb.coalesced == 2
+    sleep = results["sleep"]
+    assert sleep.payload["requests"] == [asks[0].correlation_id, asks[1].correlation_id, asks[3].correlation_id]
+    assert sleep.parent_id == asks[3].correlation_id
+    assert results["diet"].payload["results"] == [{"topic": "diet"}]
+
+def test_queries_from_outside_route_are_answered_immediately(make_node):
+    bus = InMemoryBus()
+    kb = CountingKB("kb", bus)
+    sink = make_node("sink", bus, [Topic.KB_RESULT])
+    kb.on_message(query())
+    bus.route()
+    assert len(sink.received) == 1 and kb.call("retrieve", topic="sleep")["results"]
@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from pcu.core import InMemoryBus, KeyedStateStore, Message, Topic
+from pcu.nodes.personicle import GLUCOSE, HR
+from pcu.nodes.state import StateNode
+
+def test_slots_start_at_defaults_and_write_through():
+    store = KeyedStateStore({"hr": math.nan, "count": 0.0})
+    state = store.get("u1")
+    assert math.isnan(state.hr) and state.count == 0.0
+    state.count += 2
+    assert store.get("u1").count == 2.0 and store.get("u2").count == 0.0
+    assert len(store) == 2 and "u1" in store
+
+def test_peek_neither_creates_nor_refreshes(clock):
+    store = KeyedStateStore({"x": 0.0}, idle_ttl=10.0, clock=clock)
+    assert store.peek("u") is None and "u" not in store
+    store.get("u").x = 1.0
+    clock.now = 8.0
+    assert store.peek("u").x == 1.0
+    clock.now = 11.0
+    assert store.sweep() == 1 and store.peek("u") is None
+
+def test_max_keys_evicts_least_recently_used_and_recycles_slots():
+    store = KeyedStateStore({"x": -1.0}, max_keys=2)
+    store.get("a").x = 1.0
+    store.get("b").x = 2.0
+    store.get("a")
+    store.get("c")
+    assert "b" not in store and store.evictions == 1
+    assert store.get("c").x == -1.0  # the recycled slot was reset to the default
+    assert store.get("a").x == 1.0
+
+def test_idle_keys_expire_on_access(clock):
+    store = KeyedStateStore({"x": 0.0}, idle_ttl=5.0, clock=clock)
+    store.get("old")
+    clock.now = 3.0
+    store.get("recent")
+    clock.now = 6.0
+    store.get("new")
+    assert "old" not in store and "recent" in store
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        KeyedStateStore({})
+    with pytest.raises(ValueError):
+        KeyedStateStore({"x": 0.0}, max_keys=0)
+
+def test_state_node_keeps_per_user_readings():
+    bus = InMemoryBus()
+    node = StateNode("state", bus)
+    node.start()
+    for user, stream, value in [("a", HR, 72), ("a", GLUCOSE, 100), ("b", GLUCOSE, 150),
+                                ("a", GLUCOSE, 130), ("a", HR, 500), ("c", "other", 1)]:
+        bus.publish(Message(topic=Topic.RAW_SENSORS, payload={"user_id": user, "stream_id": stream, "value": value}))
+    bus.route()
+    assert node.snapshot("a") == {"heart_rate": 72.0, "glucose": 130.0, "previous_glucose": 100.0}
+    b = node.snapshot("b")
+    assert b["glucose"] == 150.0 and math.isnan(b["heart_rate"]) and math.isnan(b["previous_glucose"])
+    assert node.snapshot("c") is None
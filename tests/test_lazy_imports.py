@@ -0,0 +1,20 @@
+import subprocess, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def loaded_after(statement):
+    code = f"import sys\n{statement}\nprint(' '.join(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+    return set(out.stdout.split())
+
+def test_importing_the_system_skips_storage_and_multiprocessing():
+    loaded = loaded_after("import pcu.system")
+    assert "multiprocessing" not in loaded
+    assert not {"pcu.storage.audit", "pcu.storage.history", "pcu.storage.wal"} & loaded
+
+def test_storage_backends_load_on_first_use():
+    loaded = loaded_after("from pcu.storage import MessageLog")
+    assert "pcu.storage.wal" in loaded
+    assert not {"pcu.storage.audit", "pcu.storage.history"} & loaded
+    assert "multiprocessing" in loaded_after("from pcu.system import ShardedRuntime")
@@ -0,0 +1,51 @@
+import copy
+import pickle
+import time
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from pcu.core import Message, Topic
+from pcu.core.message import EMPTY_PROVENANCE
+
+def test_message_is_slotted_and_frozen():
+    msg = Message(topic=Topic.RAW_SENSORS, payload={"value": 1})
+    assert not hasattr(msg, "__dict__")
+    with pytest.raises(FrozenInstanceError):
+        msg.payload = {}
+    with pytest.raises(FrozenInstanceError):
+        del msg.topic
+
+def test_bare_message_allocates_no_ids_or_provenance():
+    before = time.monotonic_ns()
+    msg = Message(topic=Topic.RAW_SENSORS, payload={})
+    assert msg._correlation_id is None
+    assert msg.provenance is EMPTY_PROVENANCE
+    assert isinstance(msg.ts, int) and before <= msg.ts <= time.monotonic_ns()
+    assert msg.priority is None
+
+def test_correlation_id_is_generated_once_on_first_read():
+    msg = Message(topic=Topic.RAW_SENSORS, payload={})
+    cid = msg.correlation_id
+    assert cid and msg.correlation_id == cid
+    assert Message(topic=Topic.RAW_SENSORS, payload={}).correlation_id != cid
+    assert Message(topic=Topic.RAW_SENSORS, payload={}, correlation_id="given").correlation_id == "given"
+
+def test_root_message_is_its_own_trace():
+    msg = Message(topic=Topic.RAW_SENSORS, payload={})
+    assert msg.trace_id == msg.correlation_id and msg.parent_id is None
+
+def test_equality_and_hash_follow_the_fields():
+    a = Message(topic=Topic.STATE, payload={"x": 1}, ts=5, correlation_id="c")
+    b = Message(topic=Topic.STATE, payload={"x": 1}, ts=5, correlation_id="c")
+    assert a == b and hash(a) == hash(b)
+    assert a != Message(topic=Topic.STATE, payload={"x": 2}, ts=5, correlation_id="c")
+
+def test_pickle_and_copy_keep_every_field():
+    msg = Message(topic=Topic.FEEDBACK, payload={"x": 1}, provenance={"node": "n"},
+                  trace_id="t", parent_id="p", priority=1)
+    for clone in (pickle.loads(pickle.dumps(msg)), copy.copy(msg)):
+        assert clone == msg
+        assert (clone.trace_id, clone.parent_id, clone.priority) == ("t", "p", 1)
+    bare = pickle.loads(pickle.dumps(Message(topic=Topic.FEEDBACK, payload={})))
+    assert bare.provenance is EMPTY_PROVENANCE
@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+import orche_skeleton
+from orche_skeleton import EVENT_LABELS, PersonicleEngine
+
+HR = [72.0, 90.0, 200.0, math.nan]
+GLUCOSE = [100.0, 150.0, 120.0, 600.0]
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(orche_skeleton, "np", None)
+    return PersonicleEngine()
+
+def test_batch_verdicts_match_extract(engine):
+    result = engine.extract_batch(hr=HR, glucose=GLUCOSE)
+    scalar = PersonicleEngine()
+    for i, (h, g) in enumerate(zip(HR, GLUCOSE)):
+        sample = {"glucose": g} if math.isnan(h) else {"hr": h, "glucose": g}
+        assert EVENT_LABELS[result["events"][i]] == scalar.extract(sample)["events"]
+        assert bool(result["noise"][i]) == scalar.extract(sample)["noise"]
+
+@pytest.mark.parametrize("user_id", [42, "u42", None])
+def test_one_shared_user_id(engine, user_id):
+    engine.extract_batch(hr=[72, 90], glucose=[100, 150], user_id=user_id)
+    assert engine.glucose_state.peek(user_id).previous_glucose == 150.0
+    # extract() accepts the same id.
+    engine.extract({"glucose": 160, "user_id": user_id})
+    assert engine.glucose_state.peek(user_id).previous_glucose == 160.0
+
+@pytest.mark.parametrize("make", [list, tuple])
+def test_per_sample_user_ids(engine, make):
+    engine.extract_batch(glucose=[100, 150, 600, 90], user_id=make([1, 2, 1, 1]))
+    assert engine.glucose_state.peek(1).previous_glucose == 90.0
+    assert engine.glucose_state.peek(2).previous_glucose == 150.0
+
+def test_numpy_user_id_column():
+    np = pytest.importorskip("numpy")
+    engine = PersonicleEngine()
+    engine.extract_batch(glucose=[100, 150], user_id=np.array([7, 8]))
+    assert engine.glucose_state.peek(7).previous_glucose == 100.0
+    assert engine.glucose_state.peek(8).previous_glucose == 150.0
+
+def test_batch_needs_a_reading():
+    with pytest.raises(ValueError):
+        PersonicleEngine().extract_batch()
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from pcu.core import DEFAULT_BLOCK_TIMEOUT, Message, OverflowPolicy, Priority, PriorityQueue, QueueFullError, Topic
+
+def msg(value, topic=Topic.RAW_SENSORS, priority=None):
+    return Message(topic=topic, payload={"value": value}, priority=priority)
+
+def drain(q):
+    out = []
+    while q:
+        out.append(q.get().payload["value"])
+    return out
+
+def test_priority_queue_serves_urgent_lanes_first_and_fifo_within_a_lane():
+    q = PriorityQueue()
+    q.put(msg("audit", Topic.AUDIT))
+    q.put(msg("raw1"))
+    q.put(msg("decision", Topic.ORCH_DECISION))
+    q.put(msg("raw2"))
+    q.put(msg("urgent raw", priority=Priority.CRITICAL))
+    assert drain(q) == ["decision", "urgent raw", "raw1", "raw2", "audit"]
+
+def test_priority_out_of_range_is_clamped():
+    q = PriorityQueue(levels=2)
+    q.put(msg("low", priority=99))
+    q.put(msg("high", priority=-5))
+    assert drain(q) == ["high", "low"]
+
+def test_starvation_limit_rescues_lower_lanes():
+    q = PriorityQueue(starvation_limit=2)
+    q.put(msg("low", Topic.AUDIT))
+    for i in range(5):
+        q.put(msg(i, Topic.CONTROL))
+    assert drain(q) == [0, 1, "low", 2, 3, 4]
+    assert q.rescued == 1
+
+def test_priority_drop_oldest_evicts_least_urgent_lane():
+    q = PriorityQueue(capacity=2, overflow=OverflowPolicy.DROP_OLDEST)
+    q.put(msg("audit", Topic.AUDIT))
+    q.put(msg("raw"))
+    assert q.put(msg("decision", Topic.ORCH_DECISION))
+    assert drain(q) == ["decision", "raw"]
+    assert q.stats().dropped_oldest == 1
+
+def test_priority_drop_oldest_never_evicts_more_urgent_messages():
+    q = PriorityQueue(capacity=2, overflow=OverflowPolicy.DROP_OLDEST)
+    q.put(msg("d1", Topic.ORCH_DECISION))
+    q.put(msg("d2", Topic.ORCH_DECISION))
+    assert not q.put(msg("audit", Topic.AUDIT))
+    # Same level: the oldest of that lane makes room.
+    assert q.put(msg("d3", Topic.ORCH_DECISION))
+    assert drain(q) == ["d2", "d3"]
+    stats = q.stats()
+    assert (stats.dropped_oldest, stats.dropped_newest) == (1, 1)
+
+def test_priority_block_times_out_by_default_and_resumes_on_get():
+    assert PriorityQueue(capacity=1, overflow=OverflowPolicy.BLOCK).block_timeout == DEFAULT_BLOCK_TIMEOUT
+    q = PriorityQueue(capacity=1, overflow=OverflowPolicy.BLOCK, block_timeout=0.01)
+    q.put(msg("raw"))
+    with pytest.raises(QueueFullError):
+        q.put(msg("audit", Topic.AUDIT))
+    q.block_timeout = 5.0
+    consumer = threading.Timer(0.05, q.get)
+    consumer.start()
+    assert q.put(msg("decision", Topic.ORCH_DECISION))
+    consumer.join()
+    assert drain(q) == ["decision"]
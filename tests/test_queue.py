@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from pcu.core import BoundedQueue, DEFAULT_BLOCK_TIMEOUT, Message, OverflowPolicy, QueueFullError, Topic
+
+def msg(value, topic=Topic.RAW_SENSORS, priority=None):
+    return Message(topic=topic, payload={"value": value}, priority=priority)
+
+def drain(q):
+    out = []
+    while q:
+        out.append(q.get().payload["value"])
+    return out
+
+def test_unbounded_queue_is_fifo():
+    q = BoundedQueue()
+    for i in range(5):
+        assert q.put(msg(i))
+    assert drain(q) == [0, 1, 2, 3, 4]
+    stats = q.stats()
+    assert (stats.enqueued, stats.dequeued, stats.high_watermark, stats.dropped) == (5, 5, 5, 0)
+
+def test_drop_oldest_evicts_head():
+    q = BoundedQueue(capacity=2, overflow=OverflowPolicy.DROP_OLDEST)
+    for i in range(4):
+        assert q.put(msg(i))
+    assert drain(q) == [2, 3]
+    assert q.stats().dropped_oldest == 2
+
+def test_drop_newest_rejects_incoming():
+    q = BoundedQueue(capacity=2, overflow=OverflowPolicy.DROP_NEWEST)
+    assert [q.put(msg(i)) for i in range(3)] == [True, True, False]
+    assert drain(q) == [0, 1]
+    assert q.stats().dropped_newest == 1
+
+def test_raise_policy():
+    q = BoundedQueue(capacity=1, overflow=OverflowPolicy.RAISE)
+    q.put(msg(0))
+    with pytest.raises(QueueFullError):
+        q.put(msg(1))
+    assert len(q) == 1
+
+def test_block_times_out_and_nonblocking_put_is_admitted():
+    q = BoundedQueue(capacity=1, overflow=OverflowPolicy.BLOCK, block_timeout=0.01)
+    q.put(msg(0))
+    with pytest.raises(QueueFullError):
+        q.put(msg(1))
+    # The router itself publishing must not wait on itself.
+    assert q.put(msg(2), block=False)
+    assert drain(q) == [0, 2]
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        BoundedQueue(capacity=0)
+
+def test_block_waits_for_a_bounded_time_by_default():
+    assert BoundedQueue(capacity=1, overflow=OverflowPolicy.BLOCK).block_timeout == DEFAULT_BLOCK_TIMEOUT
+    assert DEFAULT_BLOCK_TIMEOUT is not None
+
+def test_block_resumes_when_a_consumer_frees_a_slot():
+    q = BoundedQueue(capacity=1, overflow=OverflowPolicy.BLOCK, block_timeout=5.0)
+    q.put(msg(0))
+    consumer = threading.Timer(0.05, q.get)
+    consumer.start()
+    assert q.put(msg(1))
+    consumer.join()
+    assert drain(q) == [1]
+
+def test_concurrent_producers_never_overshoot_capacity():
+    q = BoundedQueue(capacity=8, overflow=OverflowPolicy.DROP_NEWEST)
+    def produce():
+        for i in range(2000):
+            q.put(msg(i))
+            if i % 3 == 0 and q:
+                q.get()
+    threads = [threading.Thread(target=produce) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = q.stats()
+    assert stats.high_watermark <= 8
+    assert stats.enqueued - stats.dequeued == len(q)
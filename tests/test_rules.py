@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from orche_skeleton import Condition, KnowledgeBase, StateRecord
+from pcu.core import RuleIndex
+
+def naive(patterns, text):
+    return [i for i, p in enumerate(patterns) if p in text]
+
+def test_matches_every_occurring_pattern_in_priority_order():
+    index = RuleIndex(["he", "she", "his", "hers", "e"])
+    assert index.match("ushers") == [0, 1, 3, 4]
+    assert index.match("xyz") == [] and len(index) == 5
+
+def test_agrees_with_naive_substring_search():
+    rng = random.Random(7)
+    patterns = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    index = RuleIndex(patterns)
+    for _ in range(200):
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 30)))
+        assert index.match(text) == naive(patterns, text)
+
+def test_duplicate_patterns_both_match():
+    assert RuleIndex(["low", "low"]).match("too low") == [0, 1]
+
+def test_empty_pattern_is_rejected():
+    with pytest.raises(ValueError):
+        RuleIndex(["ok", ""])
+
+def test_knowledge_base_picks_the_first_matching_rule():
+    kb = KnowledgeBase()
+    record = kb.retrieve({"state": "glucose too high; heart rate too low"})
+    assert record.matched_rules == ["heart rate too low", "glucose too high"]
+    assert record.guidance.startswith("Knowledge: Low heart rate")
+    assert kb.retrieve("all fine").guidance is None
+
+def test_knowledge_base_matches_state_records_on_condition_codes():
+    kb = KnowledgeBase()
+    record = kb.retrieve(StateRecord(Condition.GLUCOSE_SPIKE_INITIAL | Condition.HR_HIGH))
+    assert record.matched_rules == ["heart rate too high", "glucose spike"]
+    assert kb.retrieve(StateRecord(Condition.EXERCISING)).matched_rules == []
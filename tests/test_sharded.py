@@ -0,0 +1,131 @@
+import os
+
+import pytest
+
+from pcu.core import InMemoryBus, Message, Node, NodeRole, SensorFrame, Topic
+from pcu.nodes.ingestion import IngestionNode
+from pcu.system import PCUSystem, ShardedRuntime
+
+class Echo(Node):
+    """Reports every RAW_SENSORS row back on AUDIT, tagged with the worker pid."""
+    def __init__(self, name, bus):
+        super().__init__(name, NodeRole.OBSERVABILITY, bus)
+
+    @property
+    def inputs(self):
+        return [Topic.RAW_SENSORS]
+
+    @property
+    def outputs(self):
+        return [Topic.AUDIT]
+
+    def on_message(self, msg):
+        frame = msg.payload.get("frame")
+        rows = list(frame.rows()) if frame is not None else [msg.payload]
+        for row in rows:
+            if row["value"] < 0:
+                raise ValueError("negative sample")
+            self.bus.publish(Message(topic=Topic.AUDIT, payload={
+                "user_id": row["user_id"], "seq": row["value"], "pid": os.getpid()}))
+
+class Collector(Node):
+    def __init__(self):
+        super().__init__("collector", NodeRole.OBSERVABILITY, InMemoryBus())
+        self.received = []
+
+    @property
+    def inputs(self):
+        return [Topic.AUDIT]
+
+    @property
+    def outputs(self):
+        return []
+
+    def on_message(self, msg):
+        self.received.append(msg.payload)
+
+def echo_system():
+    bus = InMemoryBus()
+    return PCUSystem(bus, {"ingestion": IngestionNode("ingestion", bus), "echo": Echo("echo", bus)})
+
+def broken_system():
+    raise ImportError("missing model weights")
+
+def runtime(builder=echo_system, workers=2):
+    return ShardedRuntime(workers=workers, builder=builder, batch_size=4,
+                          observability=Collector(), mp_context="fork")
+
+def by_user(records):
+    out = {}
+    for r in records:
+        out.setdefault(r["user_id"], []).append(r)
+    return out
+
+def test_users_stay_on_one_shard_in_submission_order():
+    rt = runtime()
+    rt.start()
+    try:
+        for seq in range(20):
+            for user in ("a", "b", "c", "d"):
+                rt.ingest_sensor_packet({"user_id": user, "stream_id": "hr", "ts": float(seq), "value": float(seq)})
+        rt.ingest_sensor_batch(SensorFrame(["a", "b", "a"], "hr", [20.0, 20.0, 21.0], [20.0, 20.0, 21.0]))
+        rt.drain(timeout=30)
+    finally:
+        rt.stop()
+    users = by_user(rt.observability.received)
+    assert sorted(users) == ["a", "b", "c", "d"]
+    for user, records in users.items():
+        seqs = [r["seq"] for r in records]
+        assert seqs == sorted(seqs) and len(seqs) == (22 if user == "a" else 21 if user == "b" else 20)
+        assert {r["pid"] for r in records} == {r["pid"] for r in users[user]}
+        assert len({r["pid"] for r in records}) == 1
+
+def test_shard_for_is_stable():
+    rt = ShardedRuntime(workers=3)
+    assert rt.shard_for("user-1") == ShardedRuntime(workers=3).shard_for("user-1")
+    assert 0 <= rt.shard_for(12345) < 3
+
+def test_requires_start():
+    rt = runtime()
+    with pytest.raises(RuntimeError, match="start"):
+        rt.ingest_sensor_packet({"user_id": "a", "value": 1.0})
+    with pytest.raises(RuntimeError, match="start"):
+        rt.drain(timeout=30)
+    rt.stop()  # no-op
+
+def test_handler_errors_are_reported_by_drain():
+    rt = runtime()
+    rt.start()
+    try:
+        rt.ingest_sensor_packet({"user_id": "a", "stream_id": "hr", "ts": 0.0, "value": -1.0})
+        with pytest.raises(RuntimeError, match="negative sample"):
+            rt.drain(timeout=30)
+        rt.drain(timeout=30)  # the worker survives a failing batch
+    finally:
+        rt.stop()
+
+def test_builder_failure_raises_and_stop_still_shuts_down():
+    rt = runtime(broken_system)
+    rt.start()
+    with pytest.raises(RuntimeError, match="missing model weights"):
+        rt.drain(timeout=30)
+    rt.stop()
+    assert not rt._procs
+
+def test_killed_worker_raises_and_stop_still_shuts_down():
+    rt = runtime()
+    rt.start()
+    rt.drain(timeout=30)
+    victim = rt._procs[0]
+    victim.kill()
+    victim.join()
+    with pytest.raises(RuntimeError, match="exitcode"):
+        rt.drain(timeout=30)
+    rt.stop()
+    assert not rt._procs
+    rt.start()  # restartable after a failure
+    try:
+        rt.ingest_sensor_packet({"user_id": "a", "stream_id": "hr", "ts": 0.0, "value": 1.0})
+        rt.drain(timeout=30)
+    finally:
+        rt.stop()
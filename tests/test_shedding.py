@@ -0,0 +1,87 @@
+import pytest
+
+from pcu.core import InMemoryBus, Message, OverflowPolicy, ShedAction, ShedRule, SheddingPolicy, Topic
+
+SECOND = 1_000_000_000
+
+def sample(ts, user="u1", stream="hr", topic=Topic.RAW_SENSORS):
+    return Message(topic=topic, payload={"user_id": user, "stream_id": stream}, ts=ts)
+
+def policy(action, **kw):
+    rule = ShedRule(1.0, action, **kw)
+    return SheddingPolicy({Topic.RAW_SENSORS: rule}, max_depth=100, clock=lambda: 10 * SECOND)
+
+def test_fresh_and_unruled_messages_are_delivered():
+    p = policy(ShedAction.DROP)
+    assert p.admit(sample(10 * SECOND), depth=0)
+    assert p.admit(sample(0, topic=Topic.FEEDBACK), depth=0)
+    assert p.stats().checked == 1 and p.stats().shed == 0
+
+def test_drop_sheds_stale_messages():
+    p = policy(ShedAction.DROP)
+    assert not p.admit(sample(0), depth=0)
+    stats = p.stats()
+    assert (stats.stale, stats.dropped, stats.by_topic) == (1, 1, {Topic.RAW_SENSORS.value: 1})
+
+def test_overload_makes_fresh_messages_eligible():
+    p = policy(ShedAction.DROP)
+    assert not p.admit(sample(10 * SECOND), depth=100)
+    assert p.stats().overloaded == 1
+
+def test_collapse_keeps_only_the_newest_sample_per_stream():
+    p = policy(ShedAction.COLLAPSE)
+    old, new, other = sample(0), sample(1), sample(0, stream="glucose")
+    for m in (old, new, other):
+        p.published(m)
+    assert not p.admit(old, depth=2)
+    assert p.admit(new, depth=1)
+    assert p.admit(other, depth=0)
+    assert p.stats().collapsed == 1
+
+def test_sample_delivers_one_in_sample_every():
+    p = policy(ShedAction.SAMPLE, sample_every=3)
+    admitted = [p.admit(sample(0), depth=0) for _ in range(6)]
+    assert admitted == [False, False, True, False, False, True]
+    assert p.stats().sampled_out == 4
+
+def test_never_shed_topics_cannot_get_a_rule():
+    with pytest.raises(ValueError):
+        SheddingPolicy({Topic.ORCH_DECISION: ShedRule(1.0)})
+
+def test_bus_sheds_stale_backlog(make_node):
+    bus = InMemoryBus(shedding=SheddingPolicy({Topic.RAW_SENSORS: ShedRule(1.0, ShedAction.COLLAPSE)},
+                                              clock=lambda: 10 * SECOND))
+    sink = make_node("sink", bus, inputs=[Topic.RAW_SENSORS])
+    for ts in range(3):
+        bus.publish(sample(ts))
+    bus.route()
+    assert [m.ts for m in sink.received] == [2]
+
+def test_collapse_forgets_streams_once_dequeued():
+    p = policy(ShedAction.COLLAPSE)
+    m = sample(10 * SECOND)
+    p.published(m)
+    assert p.admit(m, depth=0)
+    assert not p._latest
+
+def test_collapse_forgets_messages_evicted_from_the_queue(make_node):
+    shedding = SheddingPolicy({Topic.RAW_SENSORS: ShedRule(1.0, ShedAction.COLLAPSE)}, clock=lambda: 10 * SECOND)
+    bus = InMemoryBus(capacity=1, overflow=OverflowPolicy.DROP_OLDEST, shedding=shedding)
+    sink = make_node("sink", bus, inputs=[Topic.RAW_SENSORS])
+    bus.publish(sample(0, stream="evicted"))
+    bus.publish(sample(1))
+    assert len(shedding._latest) == 2
+    bus.route()
+    assert [m.ts for m in sink.received] == [1]
+    assert not shedding._latest
+
+def test_collapse_remembers_at_most_max_streams():
+    p = SheddingPolicy({Topic.RAW_SENSORS: ShedRule(1.0, ShedAction.COLLAPSE)}, clock=lambda: 10 * SECOND,
+                       max_streams=2)
+    old = sample(0, user="a")
+    for m in (old, sample(1, user="a"), sample(0, user="b"), sample(0, user="c")):
+        p.published(m)
+    assert list(p._latest) == [("b", "hr"), ("c", "hr")]
+    assert p.admit(old, depth=3)  # its stream was forgotten, so the sample is kept
+    with pytest.raises(ValueError):
+        SheddingPolicy(max_streams=0)
@@ -0,0 +1,76 @@
+import pytest
+
+from pcu.core import InMemoryBus, Message, SpanCollector, Topic
+
+def forward(topic):
+    def react(node, msg):
+        node.bus.publish(Message(topic=topic, payload=msg.payload))
+    return react
+
+@pytest.fixture(params=[None, 8], ids=["routed", "batched"])
+def chain(request, make_node):
+    bus = InMemoryBus(batch_size=request.param)
+    nodes = {
+        "personicle": make_node("personicle", bus, [Topic.RAW_SENSORS], [Topic.EVENTS], forward(Topic.EVENTS)),
+        "state": make_node("state", bus, [Topic.EVENTS], [Topic.STATE], forward(Topic.STATE)),
+        "interface": make_node("interface", bus, [Topic.STATE]),
+    }
+    return bus, nodes
+
+def raw(value=1):
+    return Message(topic=Topic.RAW_SENSORS, payload={"value": value})
+
+def test_handler_output_inherits_the_trace(chain):
+    bus, nodes = chain
+    root = raw()
+    bus.publish(root)
+    bus.route()
+    (event,) = nodes["state"].received
+    (state,) = nodes["interface"].received
+    assert event.trace_id == state.trace_id == root.trace_id == root.correlation_id
+    assert event.parent_id == root.correlation_id and state.parent_id == event.correlation_id
+
+def test_explicit_ids_and_messages_outside_handlers_start_their_own_trace():
+    outside = Message(topic=Topic.STATE, payload={})
+    assert outside.parent_id is None and outside.trace_id == outside.correlation_id
+    given = Message(topic=Topic.STATE, payload={}, trace_id="t", parent_id="p")
+    assert (given.trace_id, given.parent_id) == ("t", "p")
+
+def test_collector_reconstructs_the_causal_path(chain):
+    bus, nodes = chain
+    collector = SpanCollector()
+    collector.attach(nodes)
+    roots = [raw(i) for i in range(3)]
+    for msg in roots:
+        bus.publish(msg)
+        bus.route()
+    assert collector.traces() == [m.trace_id for m in roots]
+    path = collector.path(roots[1].trace_id)
+    assert [(s.topic, s.node) for s in path] == [(Topic.RAW_SENSORS, "personicle"), (Topic.EVENTS, "state"),
+                                                 (Topic.STATE, "interface")]
+    assert all(s.queued >= 0 and s.duration >= 0 for s in path)
+    hops = collector.hops(roots[1].trace_id)
+    assert [h["node"] for h in hops] == ["personicle", "state", "interface"]
+    summary = collector.end_to_end()
+    assert summary["total"]["count"] == 3 and len(summary["hops"]) == 3
+    assert collector.path(roots[1].trace_id, node="nobody") == []
+
+def test_collector_keeps_the_newest_traces(chain):
+    bus, nodes = chain
+    collector = SpanCollector(max_traces=2)
+    collector.attach(nodes)
+    roots = [raw(i) for i in range(3)]
+    for msg in roots:
+        bus.publish(msg)
+        bus.route()
+    assert collector.traces() == [roots[1].trace_id, roots[2].trace_id]
+
+def test_batched_outputs_belong_to_the_newest_message_of_the_batch(make_node):
+    bus = InMemoryBus(batch_size=8)
+    make_node("personicle", bus, [Topic.RAW_SENSORS], [Topic.EVENTS], forward(Topic.EVENTS))
+    sink = make_node("state", bus, [Topic.EVENTS])
+    roots = [raw(i) for i in range(3)]
+    for msg in roots:
+        bus.publish(msg)
+    bus.route()
+    assert {m.parent_id for m in sink.received} == {roots[-1].correlation_id}
@@ -0,0 +1,48 @@
+from pcu.core import DataflowValidator, InMemoryBus, Topic
+from pcu.system import build_pcu_system
+
+def codes(report, level=None):
+    return sorted(i.code for i in report.issues if level is None or i.level == level)
+
+def test_default_system_has_no_errors():
+    system = build_pcu_system()
+    report = DataflowValidator(system.nodes, system.bus).analyze()
+    assert codes(report, "ERROR") == []
+    assert report.unreachable == []
+    assert sorted(report.order) == sorted(system.nodes)
+    assert report.order[0] == "ingestion"
+    system.validate()
+
+def test_missing_subscription_and_dead_end_output(make_node):
+    bus = InMemoryBus()
+    source = make_node("source", bus, outputs=[Topic.RAW_SENSORS])
+    lazy = make_node("lazy", bus, outputs=[Topic.EVENTS])
+    lazy._inputs = [Topic.RAW_SENSORS]  # declared after start(): never subscribed
+    report = DataflowValidator({"source": source, "lazy": lazy}, bus).analyze()
+    assert codes(report, "ERROR") == ["MISSING_SUBSCRIPTION", "UNSUBSCRIBED_OUTPUT", "UNSUBSCRIBED_OUTPUT"]
+
+def test_cycles_order_and_fanout(make_node):
+    bus = InMemoryBus()
+    nodes = {
+        "source": make_node("source", bus, outputs=[Topic.RAW_SENSORS]),
+        "a": make_node("a", bus, [Topic.RAW_SENSORS, Topic.FEEDBACK], [Topic.EVENTS]),
+        "b": make_node("b", bus, [Topic.EVENTS], [Topic.FEEDBACK]),
+        "c": make_node("c", bus, [Topic.EVENTS]),
+    }
+    report = DataflowValidator(nodes, bus, max_fanout=1).analyze()
+    assert report.cycles == [["a", "b"]]
+    assert report.order == ["source", "a", "b", "c"]
+    assert report.fanout[Topic.EVENTS] == 2
+    assert "CYCLE" in codes(report, "INFO")
+    assert "HIGH_FANOUT" in codes(report, "WARN")
+
+def test_unreachable_node(make_node):
+    bus = InMemoryBus()
+    nodes = {
+        "source": make_node("source", bus, outputs=[Topic.RAW_SENSORS]),
+        "sink": make_node("sink", bus, [Topic.RAW_SENSORS]),
+        "island": make_node("island", bus, [Topic.STATE], [Topic.STATE]),
+    }
+    report = DataflowValidator(nodes, bus).analyze()
+    assert report.unreachable == ["island"]
+    assert "UNREACHABLE_NODE" in codes(report, "WARN")
@@ -0,0 +1,94 @@
+import time
+
+from pcu.core import Message, Topic
+from pcu.storage import MessageLog
+from pcu.storage.wal import SUFFIX
+
+def open_log(path, **kw):
+    return MessageLog(path, sync_interval=None, **kw)
+
+def append(log, *values, topic=Topic.RAW_SENSORS):
+    return [log.append(Message(topic=topic, payload={"value": v})) for v in values]
+
+def values(log, **kw):
+    return [m.payload["value"] for _, m in log.replay(**kw)]
+
+def test_replay_round_trips_messages_in_order(tmp_path):
+    log = open_log(tmp_path)
+    assert append(log, 1, 2) == [1, 2]
+    log.append(Message(topic=Topic.FEEDBACK, payload={"value": 3}, correlation_id="c", priority=0))
+    records = list(log.replay())
+    assert [seq for seq, _ in records] == [1, 2, 3]
+    msg = records[-1][1]
+    assert (msg.topic, msg.payload, msg.correlation_id, msg.priority) == (Topic.FEEDBACK, {"value": 3}, "c", 0)
+    assert values(log, topics=[Topic.RAW_SENSORS]) == [1, 2]
+    log.close()
+
+def test_reopen_continues_the_sequence(tmp_path):
+    log = open_log(tmp_path, segment_bytes=64)
+    append(log, *range(5))
+    log.close()
+    log = open_log(tmp_path, segment_bytes=64)
+    assert log.last_seq == 5
+    assert append(log, 5) == [6]
+    assert values(log) == list(range(6))
+    log.close()
+
+def test_checkpoint_skips_covered_records_and_survives_reopen(tmp_path):
+    log = open_log(tmp_path)
+    append(log, 1, 2)
+    append(log, "f", topic=Topic.FEEDBACK)
+    log.checkpoint(Topic.RAW_SENSORS)
+    append(log, 4)
+    assert values(log) == ["f", 4]
+    assert values(log, skip_checkpointed=False) == [1, 2, "f", 4]
+    log.close()
+    log = open_log(tmp_path)
+    assert log.checkpoints == {Topic.RAW_SENSORS: 3}
+    assert values(log) == ["f", 4]
+    log.close()
+
+def test_sequence_never_reused_below_a_checkpoint(tmp_path):
+    log = open_log(tmp_path)
+    append(log, 1)
+    log.checkpoint(Topic.RAW_SENSORS, seq=10)
+    log.close()
+    log = open_log(tmp_path)
+    assert append(log, 2) == [11]
+    assert values(log) == [2]
+    log.close()
+
+def test_torn_tail_is_truncated_on_reopen(tmp_path):
+    log = open_log(tmp_path)
+    append(log, 1, 2)
+    log.close()
+    (segment,) = tmp_path.glob("*" + SUFFIX)
+    with open(segment, "ab") as f:
+        f.write(b"\x05\x00\x00")
+    log = open_log(tmp_path)
+    assert values(log) == [1, 2]
+    assert append(log, 3) == [3]
+    assert values(log) == [1, 2, 3]
+    log.close()
+
+def test_replay_stops_at_a_corrupt_record(tmp_path):
+    log = open_log(tmp_path, segment_bytes=1)  # one record per segment
+    append(log, 1, 2, 3)
+    log.close()
+    second = sorted(tmp_path.glob("*" + SUFFIX))[1]
+    data = bytearray(second.read_bytes())
+    data[-1] ^= 0xFF
+    second.write_bytes(bytes(data))
+    log = open_log(tmp_path, segment_bytes=1)
+    assert values(log) == [1]
+    log.close()
+
+def test_sync_interval_flushes_without_further_appends(tmp_path):
+    log = MessageLog(tmp_path, sync_every=1000, sync_interval=0.01)
+    append(log, 1)
+    (segment,) = tmp_path.glob("*" + SUFFIX)
+    deadline = time.monotonic() + 5
+    while not segment.stat().st_size and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert segment.stat().st_size > 0
+    log.close()
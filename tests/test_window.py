@@ -0,0 +1,148 @@
+import math
+import statistics
+import threading
+
+import pytest
+
+from pcu.core import (AsyncioBus, Message, Node, NodeRole, SlidingWindow, Topic, TumblingWindow,
+                      WindowEngine, WindowPredicate, WindowSpec)
+from pcu.system import PCUSystem
+
+def slope(points):
+    ts = [t for t, _ in points]
+    vs = [v for _, v in points]
+    mt, mv = statistics.fmean(ts), statistics.fmean(vs)
+    return sum((t - mt) * (v - mv) for t, v in points) / sum((t - mt) ** 2 for t in ts)
+
+def assert_stats(stats, points):
+    vs = [v for _, v in points]
+    assert stats.count == len(points)
+    assert stats.mean == pytest.approx(statistics.fmean(vs))
+    assert stats.std == pytest.approx(statistics.stdev(vs))
+    assert (stats.min, stats.max) == (min(vs), max(vs))
+    assert stats.slope == pytest.approx(slope(points))
+    assert (stats.start, stats.end) == (points[0][0], points[-1][0])
+
+def test_sliding_window_matches_recomputation_as_samples_expire():
+    points = [(1_700_000_000.0 + 7 * i, float((i * 37) % 11)) for i in range(200)]
+    w = SlidingWindow(60.0, capacity=2)
+    for i, (ts, v) in enumerate(points):
+        w.add(ts, v)
+        held = [p for p in points[:i + 1] if p[0] > ts - 60.0]
+        if len(held) > 1:
+            assert_stats(w, held)
+    assert w.last == points[-1][1]
+
+def test_empty_and_single_sample_windows():
+    w = SlidingWindow(10.0)
+    assert (w.count, w.variance, w.slope, w.min, w.max) == (0, 0.0, 0.0, math.inf, -math.inf)
+    assert math.isnan(w.last)
+    w.add(5.0, 3.0)
+    assert (w.mean, w.variance, w.slope, w.duration) == (3.0, 0.0, 0.0, 0.0)
+
+def test_tumbling_window_closes_on_boundaries_and_flush():
+    w = TumblingWindow(10.0)
+    assert w.add(1.0, 1.0) is None
+    assert w.add(9.0, 3.0) is None
+    closed = w.add(12.0, 5.0)
+    assert (closed.count, closed.mean, closed.min, closed.max) == (2, 2.0, 1.0, 3.0)
+    flushed = w.flush()
+    assert (flushed.count, flushed.mean) == (1, 5.0)
+    assert w.flush() is None
+    assert w.add(13.0, 1.0) is None  # a new window opens at the next sample
+
+def engine(clock=None):
+    windows = [WindowSpec("hr_1m", "hr", 60.0), WindowSpec("hr_10m", "hr", 600.0, kind="tumbling")]
+    predicates = [WindowPredicate("high", "hr_1m", lambda s: s.mean > 100),
+                  WindowPredicate("busy", "hr_10m", lambda s: s.count >= 2)]
+    kw = {} if clock is None else {"clock": clock}
+    return WindowEngine(windows, predicates, **kw)
+
+def test_engine_predicates_are_edge_triggered():
+    e = engine()
+    fired = [[ev["event"] for ev in e.add("u", "hr", float(t), v)]
+             for t, v in enumerate([90, 120, 130, 60, 60, 60, 200])]
+    assert fired == [[], ["high"], [], [], [], [], ["high"]]
+    assert e.fired == 2
+    assert e.add("u", "other", 0.0, 1.0) == []
+
+def test_engine_skips_late_samples():
+    e = engine()
+    e.add("u", "hr", 10.0, 80.0)
+    assert e.add("u", "hr", 5.0, 200.0) == []
+    assert e.late == 1 and e.series("u", "hr")["hr_1m"].count == 1
+
+def test_engine_flush_closes_idle_tumbling_windows(clock):
+    e = engine(clock)
+    e.add("u", "hr", 0.0, 70.0)
+    e.add("u", "hr", 30.0, 70.0)
+    clock.now = 100.0
+    assert e.flush(idle=300.0) == []
+    clock.now = 400.0
+    (event,) = e.flush(idle=300.0)
+    assert (event["event"], event["window"], event["ts"], event["stats"]["count"]) == ("busy", "hr_10m", 30.0, 2)
+    assert e.flushed == 1 and e.flush(idle=300.0) == []
+
+def test_engine_rejects_bad_specs():
+    with pytest.raises(ValueError):
+        WindowEngine([WindowSpec("w", "hr", 1.0), WindowSpec("w", "hr", 2.0)])
+    with pytest.raises(ValueError):
+        WindowEngine([WindowSpec("w", "hr", 1.0)], [WindowPredicate("e", "missing", bool)])
+
+class WindowNode(Node):
+    """Feeds RAW_SENSORS into a WindowEngine and flushes idle windows on tick."""
+    def __init__(self, name, bus, engine):
+        super().__init__(name, NodeRole.PERSONICLE, bus)
+        self.engine = engine
+        self.tick_threads = []
+
+    @property
+    def inputs(self):
+        return [Topic.RAW_SENSORS]
+
+    @property
+    def outputs(self):
+        return [Topic.EVENTS]
+
+    def on_message(self, msg):
+        p = msg.payload
+        self.engine.add(p["user_id"], "hr", p["ts"], p["value"])
+
+    def on_tick(self):
+        self.tick_threads.append(threading.get_ident())
+        for event in self.engine.flush(idle=300.0):
+            self.bus.publish(Message(topic=Topic.EVENTS, payload=event))
+
+def test_on_tick_runs_on_the_asyncio_bus_loop_thread(make_node, clock):
+    bus = AsyncioBus()
+    windows = WindowNode("windows", bus, engine(clock))
+    windows.start()
+    sink = make_node("sink", bus, [Topic.EVENTS])
+    system = PCUSystem(bus, {"windows": windows, "sink": sink})
+    system.start()
+    try:
+        for ts in (0.0, 30.0):
+            bus.publish(Message(topic=Topic.RAW_SENSORS, payload={"user_id": "u", "ts": ts, "value": 70.0}))
+        system.tick()
+        clock.now = 400.0
+        system.tick()
+        assert set(windows.tick_threads) == {bus._thread.ident}
+        assert [m.payload["event"] for m in sink.received] == ["busy"]
+    finally:
+        system.stop()
+
+def test_call_in_loop_propagates_errors_and_runs_inline_when_stopped():
+    bus = AsyncioBus()
+    ran = []
+    bus.call_in_loop(lambda: ran.append(threading.get_ident()))
+    assert ran == [threading.get_ident()]
+
+    def fail():
+        raise ValueError("boom")
+
+    bus.start()
+    try:
+        with pytest.raises(ValueError, match="boom"):
+            bus.call_in_loop(fail)
+    finally:
+        bus.stop()